@@ -8,6 +8,13 @@ from .exceptions import *
 from .utils import resolve_resource_path
 
 from .driver_scripts import DriverScript, OpeningDriverScript, OpenGoogle, OpenWhatIsMyIP, GrabTempMail
+from .driver_pool import DriverPool
+from .circuit_breaker import ProxyCircuitBreaker, CircuitBreakerMetrics
+from .wait_policy import WaitPolicy
+from .typing_engine import TypingEngine, Keystroke
+from .mouse_engine import MouseEngine
+from .macro import DriverMacro, MacroStepResult
+from .tab_scheduler import TabScheduler, Load, WaitFor, Sleep
 
 from .subpackages.PyProxies.proxy import ProtectedProxy, Proxy, RankedProxies, FetchedProxy
 
@@ -16,6 +23,19 @@ __all__ = [
     "OutputManager",
     "DefaultOutputManager",
     "WebDriver",
+    "DriverPool",
+    "ProxyCircuitBreaker",
+    "CircuitBreakerMetrics",
+    "WaitPolicy",
+    "TypingEngine",
+    "Keystroke",
+    "MouseEngine",
+    "DriverMacro",
+    "MacroStepResult",
+    "TabScheduler",
+    "Load",
+    "WaitFor",
+    "Sleep",
     "DriverScript",
     "OpeningDriverScript",
     "OpenGoogle",
@@ -28,6 +48,8 @@ __all__ = [
     "DriverRequestsException",
     "WindowRecorderException",
     "DriverStillRunningException",
+    "DriverPoolException",
+    "DriverMacroException",
     "InvalidDriverConfiguration",
     "Proxy",
     "ProtectedProxy",
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, asdict
+from threading import Lock
+from typing import Callable, TypeVar, TYPE_CHECKING
+from weakref import WeakKeyDictionary
+
+from selenium.common import WebDriverException, TimeoutException
+
+from .subpackages.PyProxies import Proxy, RankedProxies
+from .subpackages.PyProxies.thread_manager import ThreadManager
+from .exceptions import DriverProxyException
+
+if TYPE_CHECKING:
+    from .driver import WebDriver
+
+
+T = TypeVar("T")
+
+
+@dataclass
+class CircuitBreakerMetrics:
+    proxy_errors: int = 0
+    """Proxy-level failures detected (navigation errors and waits timing out on a proxy error page)"""
+    failovers: int = 0
+    """Switches to a standby proxy"""
+    retries: int = 0
+    """Retried navigations or waits"""
+    recovered: int = 0
+    """Calls, which succeeded after at least one retry"""
+    exhausted: int = 0
+    """Calls, which still failed after max_failovers failovers"""
+    rejected_standbys: int = 0
+    """Standby proxies, which failed their validation"""
+
+
+class ProxyCircuitBreaker:
+    """
+    Protects WebDriver.get() and the wait helpers against dead proxies.
+
+    When a navigation fails with a proxy-level error (e.g. ERR_PROXY_CONNECTION_FAILED), or a wait times out on
+    Chrome's error page for such an error, the failure is counted against the active proxy. After failure_threshold
+    consecutive failures the circuit of the proxy opens: It is demoted in the driver's proxy_scoreboard, the driver
+    switches to a standby proxy validated in the background beforehand and the navigation (and wait) is retried.
+
+    One breaker may be shared by several drivers (e.g. via DriverPool); the metrics are aggregated then.
+    """
+
+    def __init__(self,
+                 failure_threshold: int = 1,
+                 max_failovers: int = 3,
+                 validate_standby: bool = True,
+                 standby_test_num: int = 1,
+                 standby_timeout: float = 15):
+        """
+        :param failure_threshold: The number of consecutive proxy failures (retried on the same proxy in between)
+            after which the driver fails over to the standby proxy
+        :param max_failovers: The maximum number of failovers per call before the error is raised
+        :param validate_standby: Whether to test the standby proxy (RankedProxies.check_proxy()) before it is needed
+        :param standby_test_num: The number of test requests to validate a standby proxy with
+        :param standby_timeout: The maximum time in seconds to wait for a pending standby validation on failover
+        """
+        if failure_threshold < 1 or max_failovers < 0:
+            raise DriverProxyException(f"Invalid circuit breaker configuration: failure_threshold={failure_threshold}, "
+                                       f"max_failovers={max_failovers}")
+
+        self.failure_threshold = failure_threshold
+        self.max_failovers = max_failovers
+        self.validate_standby = validate_standby
+        self.standby_test_num = standby_test_num
+        self.standby_timeout = standby_timeout
+
+        self.metrics = CircuitBreakerMetrics()
+
+        self._lock = Lock()
+        self._standbys: WeakKeyDictionary[WebDriver, tuple[Proxy, Future | None]] = WeakKeyDictionary()
+
+    def _count(self, metric: str) -> None:
+        with self._lock:
+            setattr(self.metrics, metric, getattr(self.metrics, metric) + 1)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return asdict(self.metrics)
+
+    def prepare_standby(self, driver: WebDriver) -> None:
+        """
+        :param driver: The driver to pick (and validate in the background) the next standby proxy for
+        """
+        if driver.proxy_scoreboard is None or len(driver.proxy_scoreboard) < 2:
+            return
+
+        # Only peeked, such that rotation does not skip the standby if no failover happens
+        standby = driver.proxy_scoreboard.peek(exclude=driver.proxy)
+        check = ThreadManager.shared_executor().submit(RankedProxies.check_proxy, standby, self.standby_test_num) \
+            if self.validate_standby else None
+
+        with self._lock:
+            self._standbys[driver] = (standby, check)
+
+    def _take_standby(self, driver: WebDriver) -> Proxy | None:
+        with self._lock:
+            standby, check = self._standbys.pop(driver, (None, None))
+
+        for _ in range(len(driver.proxy_scoreboard)):
+            if standby is None or standby == driver.proxy:
+                standby = driver.proxy_scoreboard.next(exclude=driver.proxy)
+                check = None
+
+            if standby == driver.proxy:
+                # The active proxy is the only one left
+                return None
+
+            if not self.validate_standby:
+                return standby
+
+            try:
+                score = (check.result(timeout=self.standby_timeout) if check is not None
+                         else RankedProxies.check_proxy(standby, self.standby_test_num))
+            except FutureTimeoutError:
+                score = None
+
+            if score is not None:
+                return standby
+
+            self._count("rejected_standbys")
+            driver.proxy_scoreboard.report_failure(standby)
+            standby = None
+
+        return None
+
+    def _failover(self, driver: WebDriver) -> bool:
+        failed = driver.proxy
+        driver.proxy_scoreboard.demote(failed)
+
+        standby = self._take_standby(driver)
+        if standby is None:
+            driver.output.log(f"Circuit breaker: No working standby proxy for {failed}", "ERROR")
+            return False
+
+        driver.output.log(f"Circuit breaker: Failing over from {failed} to {standby}", "CONFIG")
+        driver.proxy_scoreboard.mark_used(standby)
+        driver.rotate_proxy(proxy=standby)
+        self._count("failovers")
+
+        with self._lock:
+            # A restarting rotation already prepared the next standby in init()
+            prepared = driver in self._standbys
+        if not prepared:
+            self.prepare_standby(driver)
+        return True
+
+    def call(self, driver: WebDriver, action: Callable[[], T], detect: Callable[[Exception], bool],
+             recover: Callable[[], object] | None = None) -> T:
+        """
+        :param driver: The driver running the action
+        :param action: The action to run (and retry)
+        :param detect: Returns whether an exception raised by the action is a proxy-level failure
+        :param recover: Called before every retry (e.g. to repeat the last navigation)
+        :return: The result of the action
+        """
+        failures = 0
+        failovers = 0
+
+        while True:
+            try:
+                result = action()
+            except WebDriverException as e:
+                if driver.proxy_scoreboard is None or not detect(e):
+                    raise
+
+                self._count("proxy_errors")
+                failures += 1
+
+                if failures >= self.failure_threshold:
+                    if failovers >= self.max_failovers or not self._failover(driver):
+                        self._count("exhausted")
+                        raise
+
+                    failovers += 1
+                    failures = 0
+
+                self._count("retries")
+
+                if recover is not None:
+                    try:
+                        recover()
+                    except WebDriverException as recover_error:
+                        # Detected again by the retried action
+                        if not driver.is_proxy_error(recover_error):
+                            raise
+                continue
+
+            if failures or failovers:
+                self._count("recovered")
+            return result
+
+    def guard_navigation(self, driver: WebDriver, navigate: Callable[[], T]) -> T:
+        return self.call(driver, navigate, driver.is_proxy_error)
+
+    def guard_wait(self, driver: WebDriver, wait: Callable[[], T]) -> T:
+        """
+        A wait timing out is only considered a proxy failure if the current page is Chrome's error page for a
+        proxy-level error. The last navigation is repeated before the wait is retried.
+        """
+        return self.call(
+            driver,
+            wait,
+            lambda e: isinstance(e, TimeoutException) and driver.detect_proxy_error_page() is not None,
+            recover=driver.reload_last_navigation
+        )
@@ -1,12 +1,10 @@
-import string
 import json
 import time
 import subprocess
 
 from datetime import timedelta, datetime
-from itertools import cycle
-from random import uniform, randint, choice
-from threading import Thread
+from random import uniform
+from threading import Thread, RLock
 from os.path import join, abspath, basename, dirname, splitext
 from typing import Callable, Self, Any, NoReturn
 from urllib.request import urlopen, urlretrieve
@@ -15,25 +13,31 @@ from urllib.error import URLError, HTTPError
 import requests
 
 from selenium import webdriver
-from selenium.common import WebDriverException
-from selenium.webdriver import Keys
+from selenium.common import WebDriverException, NoSuchElementException, StaleElementReferenceException, TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webelement import WebElement
-from selenium.webdriver.support.wait import WebDriverWait
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.window import WindowTypes
 
-from .subpackages.PyProxies import load_proxies_list, RankedProxies, Proxy
+from .subpackages.PyProxies import (load_proxies_list, RankedProxies, Proxy, ProxyGateway, ProxyScoreboard, ProxyStore,
+                                    ProxyRefresher, ProxyRoutes)
 
 from .output_manager import OutputManager, DefaultOutputManager, NoOutput
+from .circuit_breaker import ProxyCircuitBreaker
+from .wait_policy import WaitPolicy
+from .typing_engine import TypingEngine
+from .mouse_engine import MouseEngine
+from .macro import DriverMacro
 
 from .subpackages.PyProxies.proxy import ProtectedProxy
 from .utils import (extract_from_zip, extract_all_from_zip, ensure_exists, check_file_exists, force_delete, read_content,
                     file_name_gen, find_files_with_extension, resolve_resource_path, is_authenticated_proxy_string, dump,
-                    read_template_content)
-from .exceptions import WindowRecorderException, DriverStillRunningException, DriverProxyException, DriverRequestsException
+                    read_template_content, read_script, compile_tag_locator, compile_in_page_locator,
+                    compile_extraction_field)
+from .exceptions import (WindowRecorderException, DriverStillRunningException, DriverProxyException, DriverRequestsException,
+                         DriverException)
 
 
 class WebDriver(webdriver.Chrome):
@@ -44,6 +48,14 @@ class WebDriver(webdriver.Chrome):
     automatic installation of an ad blocker and many other useful utilities.
     """
 
+    # Fixed by the "key" in extensions/proxy_auth/manifest.json
+    proxy_extension_id = "dempnabgphmplgpfmaddhlkhbmdachel"
+
+    # Chrome network errors caused by the proxy rather than the requested page
+    proxy_error_codes = ("ERR_PROXY_CONNECTION_FAILED", "ERR_TUNNEL_CONNECTION_FAILED", "ERR_SOCKS_CONNECTION_FAILED",
+                         "ERR_SOCKS_CONNECTION_HOST_UNREACHABLE", "ERR_PROXY_AUTH_UNSUPPORTED", "ERR_PROXY_CERTIFICATE_INVALID",
+                         "ERR_NO_SUPPORTED_PROXIES", "ERR_PROXY_HTTP_1_1_REQUIRED", "ERR_MANDATORY_PROXY_CONFIGURATION_FAILED")
+
     def __init__(self,
                  chromedriver_path: str | None = None,
                  chrome_binary_path: str | None = None,
@@ -67,10 +79,21 @@ class WebDriver(webdriver.Chrome):
                  recording_buffer_js: float = 0.05,
                  try_spoofing: bool = True,
                  keyboard_spoofing: bool = True,
+                 mouse_spoofing: bool = True,
                  avg_char_write_spoofing_delay: float = 0.2,
+                 typing_engine: TypingEngine | None = None,
+                 mouse_engine: MouseEngine | None = None,
+                 event_driven_waits: bool = True,
+                 wait_policy: WaitPolicy | None = None,
                  proxies: list[Proxy] | Proxy | list[str] | str | None = None,
                  proxy_auto_search_size: int = 50,
                  proxy_auto_rotation_size: int = 50,
+                 proxy_rotation_mode: str = "restart",
+                 proxy_gateway: bool = False,
+                 proxy_gateway_per_connection: bool = False,
+                 proxy_store: ProxyStore | None = None,
+                 proxy_refresher: ProxyRefresher | None = None,
+                 proxy_circuit_breaker: ProxyCircuitBreaker | None = None,
                  late_init: bool = False,
                  clear_temp_dir: bool = True,
                  additional_driver_arguments: tuple[str, ...] = ("--disable-search-engine-choice-screen",),
@@ -122,6 +145,20 @@ class WebDriver(webdriver.Chrome):
         :param try_spoofing: Whether to attempt to look more like a normal browser and less like automated software by
             for instance changing user agent and passing some specific arguments to the Chromedriver
         :param avg_char_write_spoofing_delay: The average delay per character written by the send_keys() method of this class
+        :param typing_engine: The TypingEngine used by send_keys() with keyboard spoofing. None for one using
+            avg_char_write_spoofing_delay. Pass TypingEngine(seed=...) for reproducible keystroke schedules
+        :param mouse_spoofing: Only takes effect when try_spoofing is True: Whether click() and click_js() should move the
+            mouse to the element along a humanized path (and click() should click at the end of it) instead of
+            clicking without any mouse movement
+        :param mouse_engine: The MouseEngine computing the mouse paths. None for one with default settings.
+            Pass MouseEngine(seed=...) for reproducible paths
+        :param event_driven_waits: Whether the element waits (wait_and_find(), wait_until_clickable(), ...) should wait
+            inside the page via a MutationObserver, which resolves as soon as the element appears, instead of
+            polling the Chromedriver every 0.5 seconds. Locators, which cannot be evaluated by page scripts
+            (e.g. link texts), are always polled
+        :param wait_policy: The WaitPolicy deciding the timeouts (if none are given explicitly) and poll intervals of
+            all waits. None for a WaitPolicy with default settings, which starts polling every 50ms and backs off,
+            and learns per-locator timeouts from how long locators took to appear before
         :param additional_driver_arguments: Any additional arguments directly supplied using the Options() class and .add_argument()
         :param disable_password_manager_popups: Whether to disable password manager popups
         :param proxies: Whether to use Proxies. Provide either a list of proxies to use as rotating proxies,
@@ -136,6 +173,23 @@ class WebDriver(webdriver.Chrome):
                 should be gathered and tested. Is always at least proxy_auto_rotation_size
         :param proxy_auto_rotation_size: Only takes effect when proxies is set to "auto": Defines how many
                 of the best found proxies should be used in the rotation pool.
+        :param proxy_rotation_mode: How rotate_proxy() switches the active proxy by default.
+            "restart" quits and restarts the browser with the next proxy.
+            "hot" always loads the proxy_auth extension and switches the proxy inside the running browser,
+            which keeps the session, tabs and cookies and only takes a few milliseconds.
+        :param proxy_gateway: Whether to route the browser through a local forwarding proxy (ProxyGateway) instead of
+            pointing it at the active proxy directly. The gateway injects the credentials of protected proxies,
+            fails over to the next proxy on connection errors and rotating proxies needs no browser restart.
+            Takes precedence over proxy_rotation_mode.
+        :param proxy_gateway_per_connection: Only takes effect when proxy_gateway is True: Whether the gateway should
+            use the next proxy of the pool for every new connection instead of the active proxy
+        :param proxy_store: An optional ProxyStore, from which "auto" proxies are loaded (instead of the JSON file) and
+            in which the outcome of every navigation through a proxy is recorded
+        :param proxy_refresher: Only takes effect when proxies is set to "auto": A (possibly shared) ProxyRefresher,
+            which serves cached proxies at startup (even outdated ones, so startup only blocks if nothing is cached)
+            and swaps every refreshed pool into the running driver via set_proxy_pool()
+        :param proxy_circuit_breaker: An optional (possibly shared) ProxyCircuitBreaker, which detects proxy-level
+            failures in get() and the wait helpers, fails over to a pre-validated standby proxy and retries
         :param ignore_certificate_errors: Ignore any SSL certificate errors. (not recommended)
         :param late_init: Whether to initialize later. If set to True, initialization of the webdriver
             (webdriver.Chrome superclass) has to be done later manually via the init() method.
@@ -174,6 +228,19 @@ class WebDriver(webdriver.Chrome):
 
         self.output.log("Starting driver...", "STARTUP")
 
+        if proxy_rotation_mode not in ("restart", "hot"):
+            raise DriverProxyException(f"Invalid proxy rotation mode: {proxy_rotation_mode}")
+        self.proxy_rotation_mode = proxy_rotation_mode
+        self.proxy_store = proxy_store
+        self.proxy_refresher = proxy_refresher if proxies == "auto" else None
+        self.proxy_circuit_breaker = proxy_circuit_breaker
+        self._last_url: str | None = None
+        # Element handles found on the current page by their resolved (by, value) locator
+        self._element_cache: dict[tuple[str, str], WebElement] = {}
+        self._proxy_pool_size = proxy_auto_rotation_size
+        # Guards the active proxy and the proxy pool, which are swapped by ProxyRefresher threads
+        self._proxy_lock = RLock()
+
         self._proxy_init_config(proxies, proxy_auto_rotation_size, proxy_auto_search_size)
 
         self._extensions = set()
@@ -185,7 +252,15 @@ class WebDriver(webdriver.Chrome):
         self.download_directory = download_directory
         self.try_spoofing = try_spoofing
         self.keyboard_spoofing = keyboard_spoofing
+        self.mouse_spoofing = mouse_spoofing
+        self.mouse_engine = mouse_engine if mouse_engine is not None else MouseEngine()
+        # The last known mouse position in viewport pixels
+        self._mouse_position: tuple[int, int] | None = None
         self.avg_char_write_spoofing_delay = avg_char_write_spoofing_delay
+        self.typing_engine = typing_engine if typing_engine is not None else TypingEngine(avg_char_write_spoofing_delay)
+        self.event_driven_waits = event_driven_waits
+        self.wait_policy = wait_policy if wait_policy is not None else WaitPolicy()
+        self._script_timeout: float | None = None
 
         self.recording_js_script = recording_script_js
         self.prevent_fullscreen_js_script = prevent_fullscreen_js_script
@@ -231,16 +306,22 @@ class WebDriver(webdriver.Chrome):
         chrome_options.add_experimental_option("prefs", prefs)
 
         self.proxy_extension: str | None = None
+        self.proxy_gateway: ProxyGateway | None = None
+        self.proxy_scoreboard: ProxyScoreboard | None = None
 
         if self.proxy_pool is not None:
             self.uses_proxy = True
-            self._proxy_idx = 0
-            self.proxy = self.proxy_pool[self._proxy_idx]
+            self.proxy_scoreboard = ProxyScoreboard(self.proxy_pool)
+            self.proxy = self.proxy_scoreboard.next()
 
             self.output.log(f"Initial proxy configuration ({'protected' if self.uses_protected_proxy else 'unprotected'}): {self.proxy}", "CONFIG")
 
-            if self.uses_protected_proxy:
-                self.proxy_extension = self._configure_protected_proxy_extension()
+            if proxy_gateway:
+                # The gateway is started (and the --proxy-server argument registered) by init()
+                self.proxy_gateway = ProxyGateway(self.proxy_pool, per_connection=proxy_gateway_per_connection,
+                                                  on_failure=self.proxy_scoreboard.report_failure)
+            elif self.uses_protected_proxy or proxy_rotation_mode == "hot":
+                self.proxy_extension = self._configure_proxy_extension()
                 self._extensions.add(self.proxy_extension)
             else:
                 chrome_options.add_argument(f"--proxy-server={self.proxy.protocol}://{self.proxy.ip}")
@@ -310,28 +391,52 @@ class WebDriver(webdriver.Chrome):
             self.output.log(f"Registered additional kwargs for superclass: {self._init_kwargs}", "CONFIG")
 
         extensions = ','.join(self._extensions)
-        self._init_options.add_argument(f"--load-extension={extensions}")
+        self._replace_init_argument("--load-extension=", f"--load-extension={extensions}" if extensions else None)
         self.output.log(f"Registered extensions: {extensions}", "CONFIG")
 
+        if self.proxy_gateway is not None and not self.proxy_gateway.running:
+            self.proxy_gateway.use(self.proxy).start()
+            self._replace_init_argument("--proxy-server=", f"--proxy-server={self.proxy_gateway.url}")
+            self.output.log(f"Started proxy gateway at {self.proxy_gateway.url}", "CONFIG")
+
         self.running = True
+        self._script_timeout = None
+        self._mouse_position = None
         super().__init__(service=self._init_service, options=self._init_options, **self._init_kwargs)
 
         self.output.log("Driver initialized!", "STARTUP")
 
+        if self.proxy_refresher is not None and self.proxy_pool is not None:
+            self.proxy_refresher.subscribe(self.set_proxy_pool)
+        if self.proxy_circuit_breaker is not None:
+            self.proxy_circuit_breaker.prepare_standby(self)
+
         if self.try_spoofing:
             self.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
         return self
 
+    def _replace_init_argument(self, prefix: str, argument: str | None) -> None:
+        """
+        Removes all previously registered arguments starting with prefix and registers the given argument instead
+        (if it is not None), such that repeated calls of init() do not accumulate stale arguments.
+        """
+        self._init_options.arguments[:] = [arg for arg in self._init_options.arguments if not arg.startswith(prefix)]
+
+        if argument is not None:
+            self._init_options.add_argument(argument)
 
     def _proxy_init_config(self, proxies: list[Proxy] | Proxy | list[str] | str | None,
                            proxy_auto_rotation_size: int, proxy_auto_search_size: int) -> Self:
         if isinstance(proxies, list):
             self.output.log("Received proxy pool configuration...", "CONFIG")
 
-            auth_proxies = [p for p in proxies if isinstance(p, ProtectedProxy) or
-                            (isinstance(p, str) and is_authenticated_proxy_string(p))]
+            auth_proxies, unauth_proxies = [], []
+            for p in proxies:
+                is_auth = isinstance(p, ProtectedProxy) or (isinstance(p, str) and is_authenticated_proxy_string(p))
+                (auth_proxies if is_auth else unauth_proxies).append(p)
+
             rproxies = RankedProxies.from_trusted_protected(auth_proxies)
-            rproxies.update_trusted_unprotected([p for p in proxies if p not in set(auth_proxies)])
+            rproxies.update_trusted_unprotected(unauth_proxies)
 
             self.proxy_pool = rproxies.get_n_best(proxy_auto_rotation_size)
         elif isinstance(proxies, str):
@@ -340,12 +445,23 @@ class WebDriver(webdriver.Chrome):
 
                 proxy_auto_search_size = max(proxy_auto_search_size, proxy_auto_rotation_size)
 
-                loaded = load_proxies_list(n=proxy_auto_search_size)
+                if self.proxy_refresher is not None:
+                    # Refreshing outdated proxies is left to the refresher
+                    loaded = self.proxy_refresher.start().wait()
+                    self.output.log(
+                        f"Received proxies from refresher ({loaded.data_from.strftime(RankedProxies.saved_date_format)})...",
+                        "CONFIG"
+                    )
+                    self.proxy_pool = loaded.get_n_best(proxy_auto_rotation_size)
+                    return self
+
+                loaded = load_proxies_list(n=proxy_auto_search_size, required=proxy_auto_rotation_size,
+                                           store=self.proxy_store)
 
-                if datetime.now() - loaded.data_from > timedelta(hours=12):
+                if self.proxy_store is None and datetime.now() - loaded.data_from > timedelta(hours=12):
                     self.output.log("Found outdated proxies...", "CONFIG")
                     self.output.log("Fetching new proxies...", "CONFIG")
-                    loaded = load_proxies_list(force_load=True, n=proxy_auto_search_size)
+                    loaded = load_proxies_list(force_load=True, n=proxy_auto_search_size, required=proxy_auto_rotation_size)
                 else:
                     self.output.log(
                         f"Found cached proxies from "
@@ -373,6 +489,41 @@ class WebDriver(webdriver.Chrome):
             self.proxy_pool = None
         return self
 
+    def set_proxy_pool(self, proxies: list[Proxy] | RankedProxies) -> Self:
+        """
+        Swaps the proxy pool of the (possibly running) driver, e.g. with a pool from a ProxyRefresher.
+        The swap is atomic with respect to rotate_proxy(), since both hold the proxy lock of the driver.
+        Proxies kept in the pool keep their health in the proxy_scoreboard.
+
+        The active proxy is only replaced immediately when the proxy gateway is used and the active proxy is no longer
+        part of the pool. Otherwise the next rotate_proxy() picks from the new pool.
+
+        :param proxies: The new proxies. A RankedProxies object is cut to its proxy_auto_rotation_size best proxies
+        :return: The driver itself
+        """
+        with self._proxy_lock:
+            if self.proxy_pool is None:
+                raise DriverProxyException("Received no proxy configuration: Unable to swap the proxy pool!")
+
+            if isinstance(proxies, RankedProxies):
+                proxies = proxies.get_n_best(self._proxy_pool_size)
+
+            if not proxies:
+                raise DriverProxyException("Unable to swap the proxy pool: The new pool is empty!")
+
+            self.proxy_scoreboard.replace(proxies)
+            self.proxy_pool = list(proxies)
+
+            if self.proxy_gateway is not None:
+                self.proxy_gateway.set_upstreams(self.proxy_pool)
+
+                if self.proxy not in self.proxy_scoreboard:
+                    self._refresh_proxy()
+                self.proxy_gateway.use(self.proxy)
+
+        self.output.log(f"Swapped proxy pool ({len(self.proxy_pool)} proxies)", "CONFIG")
+        return self
+
     @property
     def uses_protected_proxy(self) -> bool:
         return isinstance(self.proxy, ProtectedProxy)
@@ -381,23 +532,42 @@ class WebDriver(webdriver.Chrome):
         if not self.uses_protected_proxy:
             raise DriverProxyException("ProtectedProxy was expected but non-protected one was selected as active proxy!")
 
+        return self._configure_proxy_extension(extension_location)
+
+    def _configure_proxy_extension(self, extension_location: str = resolve_resource_path("./extensions/proxy_auth")) -> str:
         background_js_template = join(extension_location, "templates", "background.js")
-        proxy_host, proxy_port = self.proxy.ip.rsplit(":", maxsplit=1)
+        config = self._proxy_extension_config()
 
         background_js_content = read_template_content(
             background_js_template,
             {
-                "!__::HOST_TEMPLATE_DUMMY::__!": proxy_host,
-                "!__::PORT_TEMPLATE_DUMMY::__!": proxy_port,
-                "!__::SCHEME_TEMPLATE_DUMMY::__!": self.proxy.protocol,
-                "!__::PASSWORD_TEMPLATE_DUMMY::__!": self.proxy.password,
-                "!__::USERNAME_TEMPLATE_DUMMY::__!": self.proxy.username
+                "!__::HOST_TEMPLATE_DUMMY::__!": config["host"],
+                "!__::PORT_TEMPLATE_DUMMY::__!": config["port"],
+                "!__::SCHEME_TEMPLATE_DUMMY::__!": config["scheme"],
+                "!__::PASSWORD_TEMPLATE_DUMMY::__!": config["password"],
+                "!__::USERNAME_TEMPLATE_DUMMY::__!": config["username"]
             }
         )
 
         dump(background_js_content, join(extension_location, "background.js"), mode="w")
         return extension_location
 
+    def _proxy_extension_config(self, proxy: Proxy | None = None) -> dict[str, str]:
+        """
+        :param proxy: The proxy to configure. None for the active proxy
+        """
+        proxy = self.proxy if proxy is None else proxy
+        proxy_host, proxy_port = proxy.ip.rsplit(":", maxsplit=1)
+        is_protected = isinstance(proxy, ProtectedProxy)
+
+        return {
+            "scheme": proxy.protocol,
+            "host": proxy_host,
+            "port": proxy_port,
+            "username": proxy.username if is_protected else "",
+            "password": proxy.password if is_protected else ""
+        }
+
     @staticmethod
     def _ensure_internal_base_dirs_exists() -> None:
         internal_dirs = [
@@ -417,37 +587,131 @@ class WebDriver(webdriver.Chrome):
         for internal_dir in internal_dirs:
             ensure_exists(internal_dir)
 
-    def _refresh_proxy(self) -> str | None:
-        self._proxy_idx = (self._proxy_idx + 1) % len(self.proxy_pool)
-        self.proxy = self.proxy_pool[self._proxy_idx]
+    def _next_proxy(self, proxy: Proxy | None = None) -> Proxy:
+        # The healthiest proxy (except for the current one), see ProxyScoreboard
+        return proxy if proxy is not None else self.proxy_scoreboard.next(exclude=self.proxy)
 
-        proxy_extension = self._configure_protected_proxy_extension() if self.uses_protected_proxy else None
+    def _refresh_proxy(self, proxy: Proxy | None = None) -> None:
+        self.proxy = self._next_proxy(proxy)
 
         self.output.log(f"New proxy configuration ({'protected' if self.uses_protected_proxy else 'unprotected'}): {self.proxy}", "CONFIG")
 
-        return proxy_extension
+    def rotate_proxy(self, hot: bool | None = None, proxy: Proxy | None = None) -> Self:
+        """
+        :param hot: Whether to switch the proxy inside the running browser instead of restarting it.
+            If None, the proxy_rotation_mode passed to the constructor decides.
+            Hot rotation requires the proxy_auth extension, i.e. proxy_rotation_mode="hot" or a protected initial proxy.
+            When the proxy gateway is used, this is ignored, since the gateway switches proxies without any restart.
+        :param proxy: The proxy to switch to. If None, the healthiest other proxy of the pool is used
+        :return: Rotates the current proxy. Note that this will quit and restart the driver, unless hot rotation is used!
+        """
+        with self._proxy_lock:
+            if self.proxy_pool is None:
+                raise DriverProxyException("Received no proxy configuration: Unable to rotate proxies!")
+
+            if self.proxy_gateway is not None and self.proxy_gateway.running:
+                self._refresh_proxy(proxy)
+                self.proxy_gateway.use(self.proxy)
+                return self
+
+            if hot is None:
+                hot = self.proxy_rotation_mode == "hot"
+
+            if hot:
+                return self._hot_rotate_proxy(proxy)
 
-    def rotate_proxy(self) -> Self:
+            self.quit()
+
+            if self.proxy_extension is not None:
+                # Remove old proxy extension
+                self._extensions.remove(self.proxy_extension)
+                self.proxy_extension = None
+
+            self._refresh_proxy(proxy)
+
+            if self.uses_protected_proxy:
+                # Add new proxy extension
+                self.proxy_extension = self._configure_protected_proxy_extension()
+                self._extensions.add(self.proxy_extension)
+                self._replace_init_argument("--proxy-server=", None)
+            else:
+                self._replace_init_argument("--proxy-server=", f"--proxy-server={self.proxy.protocol}://{self.proxy.ip}")
+
+            return self.init()
+
+    def _hot_rotate_proxy(self, proxy: Proxy | None = None) -> Self:
+        if self.proxy_extension is None or not self.running:
+            raise DriverProxyException("Unable to hot rotate proxies: The proxy_auth extension is not loaded "
+                                       "(use proxy_rotation_mode=\"hot\") or the driver is not running!")
+
+        # The active proxy is only replaced once the browser uses the new one
+        proxy = self._next_proxy(proxy)
+        self.apply_proxy_settings({"type": "setProxy", "config": self._proxy_extension_config(proxy)})
+        self._refresh_proxy(proxy)
+
+        # Keep the extension files in sync, such that a later restart uses the same proxy
+        self._configure_proxy_extension()
+        return self
+
+    def apply_proxy_routes(self, routes: ProxyRoutes) -> Self:
         """
-        :return: Rotates the current proxy. Note that this will quit and restart the driver!
+        Routes different hosts through different proxies inside the running browser by applying the PAC script of the
+        routes via the proxy_auth extension. Credentials of protected proxies are answered by the extension.
+
+        The routes replace the active proxy until clear_proxy_routes() or rotate_proxy() is called and are not kept
+        across browser restarts.
+
+        :param routes: The routes to apply
+        :return: The driver itself
         """
-        if self.proxy_pool is None:
-            raise DriverProxyException("Received no proxy configuration: Unable to rotate proxies!")
-        self.quit()
+        if self.proxy_extension is None or not self.running:
+            raise DriverProxyException("Unable to apply proxy routes: The proxy_auth extension is not loaded "
+                                       "(use proxy_rotation_mode=\"hot\") or the driver is not running!")
 
-        if self.proxy_extension is not None:
-            # Remove old proxy extension
-            self._extensions.remove(self.proxy_extension)
+        self.apply_proxy_settings({"type": "setPac", "pac": routes.script(), "credentials": routes.credentials()})
+        self.output.log(f"Applied proxy routes ({len(routes.groups)} groups, {len(routes.rules)} rules)", "CONFIG")
+        return self
 
-        self.proxy_extension = self._refresh_proxy()
+    def clear_proxy_routes(self) -> Self:
+        """
+        :return: Routes all hosts through the active proxy again
+        """
+        if self.proxy_extension is None or not self.running:
+            raise DriverProxyException("Unable to clear proxy routes: The proxy_auth extension is not loaded "
+                                       "or the driver is not running!")
 
-        if self.proxy_extension is None:
-            self._init_options.add_argument(f"--proxy-server={self.proxy.protocol}://{self.proxy.ip}")
-        else:
-            # Add new proxy extension
-            self._extensions.add(self.proxy_extension)
+        self.apply_proxy_settings({"type": "setProxy", "config": self._proxy_extension_config()})
+        return self
 
-        return self.init()
+    def apply_proxy_settings(self, message: dict[str, Any]) -> Any:
+        """
+        Sends a message to the background page of the running proxy_auth extension using its control page.
+        The message is opened in a temporary tab, which is closed again afterward.
+
+        :param message: The message to send, e.g. {"type": "setProxy", "config": {...}}
+        :return: The response of the extension
+        """
+        original_handle = self.current_window_handle
+        self.switch_to.new_window(WindowTypes.TAB)
+
+        try:
+            super().get(f"chrome-extension://{self.proxy_extension_id}/control.html")
+            response = self.execute_async_script(
+                "const done = arguments[arguments.length - 1];"
+                "chrome.runtime.sendMessage(arguments[0], (response) => done(response || null));",
+                message
+            )
+        finally:
+            self.close()
+            self.switch_to.window(original_handle)
+
+        if not response or not response.get("ok"):
+            error = response.get("error") if response else "No response"
+            self.output.log(f"Failed to apply proxy settings: {error}", "ERROR")
+            raise DriverProxyException(f"The proxy_auth extension failed to apply the proxy settings: {error}")
+
+        self.output.log(f"Applied proxy settings via proxy_auth extension: {message.get('type')}", "CONFIG")
+        return response
 
     def clear_downloads(self, chrome_binaries: bool = True, chromedriver: bool = True, temp_dir: bool = True, ad_blocker: bool = True) -> Self:
         self.output.log("Clearing downloads...", "CLEAR")
@@ -542,9 +806,59 @@ class WebDriver(webdriver.Chrome):
     def quit(self) -> Self:
         super().quit()
         self.running = False
+        self.invalidate_element_cache()
+
+        if self.proxy_gateway is not None:
+            self.proxy_gateway.stop()
+        if self.proxy_refresher is not None:
+            self.proxy_refresher.unsubscribe(self.set_proxy_pool)
         self.output.log("Quit driver session!", "SHUTDOWN")
         return self
 
+    @property
+    def is_alive(self) -> bool:
+        """
+        :return: Whether the driver is running and the browser still responds to commands
+        """
+        if not self.running:
+            return False
+
+        try:
+            self.window_handles
+        except WebDriverException:
+            return False
+        return True
+
+    def reset_session(self) -> Self:
+        """
+        Resets the browser state without restarting the browser:
+        Closes all tabs except one, clears the stored data of all origins (cookies, local storage, IndexedDB,
+        cache storage and service workers), the session storage of the open tabs and the HTTP cache
+        and navigates the remaining tab to "about:blank".
+
+        :return: The driver itself
+        """
+        self.output.log("Resetting driver session...", "RESET")
+        self.invalidate_element_cache()
+
+        handles = self.window_handles
+        for handle in handles:
+            self.switch_to.window(handle)
+            # Session storage belongs to the tab, which Storage.clearDataForOrigin does not cover
+            self.execute_script("try { sessionStorage.clear(); } catch (e) {}")
+
+            if handle != handles[0]:
+                self.close()
+
+        self.switch_to.window(handles[0])
+        self.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": "*", "storageTypes": "all"})
+        self.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        self.execute_cdp_cmd("Network.clearBrowserCache", {})
+        super().get("about:blank")
+
+        self.output.log("Driver session reset!", "RESET")
+        return self
+
     def download_chromedriver_file(self, output_dir: str = resolve_resource_path("."),
                                    check_binary_versions: bool = True) -> str:
         if check_file_exists("chromedriver.exe", output_dir):
@@ -763,15 +1077,81 @@ class WebDriver(webdriver.Chrome):
             case _:
                 return getattr(By, by.upper()) if hasattr(By, by.upper()) else by
 
+    @classmethod
+    def resolve_by(cls, by: str) -> str:
+        """
+        :return: The By constant of a locator strategy name (e.g. "class" -> By.CLASS_NAME)
+        """
+        return cls.__resolve_by(by)
+
     def find(self, value: str, by: str = "id") -> WebElement:
         self.output.log(f"Finding ({by} = {value})...")
-        return self.find_element(by=self.__resolve_by(by), value=value)
+        element = self.find_element(by=self.__resolve_by(by), value=value)
+        self._element_cache[(self.__resolve_by(by), value)] = element
+        return element
+
+    def find_cached(self, value: str, by: str = "id") -> WebElement:
+        """
+        The cache is cleared on navigation (get(), back(), forward(), refresh(), click(), submitting) and when switching
+        tabs. Within a page a cached handle is reused as long as it is attached, even if the locator matches a different
+        element first by now (e.g. a re-sorted list or a view re-rendered by a single-page app next to the old one).
+        Use find() or invalidate_element_cache() for locators, which are not unique over time.
+
+        :return: The element located by (by, value), reusing the handle found last on the current page if available.
+            Note that the handle may be stale; use _with_element() to re-find stale handles transparently
+        """
+        element = self._element_cache.get((self.__resolve_by(by), value))
+        return element if element is not None else self.find(value, by)
+
+    def cache_element(self, element: WebElement, value: str, by: str = "id") -> WebElement:
+        """
+        :param element: The element located by (by, value) on the current page, e.g. found by a page script
+        :return: Caches the handle for find_cached() and returns it
+        """
+        self._element_cache[(self.__resolve_by(by), value)] = element
+        return element
+
+    def invalidate_element_cache(self) -> Self:
+        """
+        :return: Forgets all cached element handles (done automatically on navigation and when switching tabs)
+        """
+        self._element_cache.clear()
+        return self
+
+    def _with_element(self, value: str, by: str, action: Callable[[WebElement], Any],
+                      element: WebElement | None = None) -> WebElement:
+        """
+        Runs the action on the (cached) element located by (by, value). If the handle turned stale, the element is
+        found again and the action is retried once.
+
+        :param element: The handle to use instead of the cached one (e.g. the result of a wait)
+        :return: The handle the action was run on
+        """
+        element = element if element is not None else self.find_cached(value, by)
+
+        try:
+            action(element)
+        except StaleElementReferenceException:
+            self.output.log(f"Element ({by} = {value}) turned stale, finding it again...")
+            self._element_cache.pop((self.__resolve_by(by), value), None)
+
+            element = self.find(value, by)
+            action(element)
+        return element
 
     def find_all(self, value: str = None, by: str = "id") -> list[WebElement]:
         self.output.log(f"Finding all ({by} = {value})...")
         return self.find_elements(by=self.__resolve_by(by), value=value)
 
     def find_by_many(self, value_by_entries: dict[str, str] | tuple[dict[str, str], Callable[[WebElement], bool]]) -> list[WebElement]:
+        """
+        Finds all elements matching the first entry and filters them by the attributes of the remaining entries
+        inside the page (a single command instead of one command per element and attribute).
+
+        :param value_by_entries: Either {value: by, value: attribute, ...} or ({by: value, attribute: value, ...}, filter_func),
+            where filter_func is applied to the remaining elements afterward
+        :return: The matching elements
+        """
         if isinstance(value_by_entries, dict):
             items = list(value_by_entries.items())
             if not items:
@@ -779,12 +1159,8 @@ class WebDriver(webdriver.Chrome):
 
             items, (first_value, first_by) = items[1:], items[0]
 
-            left = self.find_all(first_value, first_by)
-
-            for value, by in items:
-                left = [element for element in left if element.get_attribute(by) == value]
-
-            return left
+            return self._filter_by_attributes(self.find_all(first_value, first_by),
+                                              [(by, value) for value, by in items])
         elif (isinstance(value_by_entries, tuple) and len(value_by_entries) > 1
               and isinstance(value_by_entries[0], dict) and callable(value_by_entries[1])):
             items, filter_func = value_by_entries
@@ -794,10 +1170,7 @@ class WebDriver(webdriver.Chrome):
 
             items, (first_by, first_value) = items[1:], items[0]
 
-            left = self.find_all(first_value, first_by)
-
-            for by, value in items:
-                left = [element for element in left if element.get_attribute(by) == value]
+            left = self._filter_by_attributes(self.find_all(first_value, first_by), items)
 
             filtered_elements = list(filter(filter_func, left))
 
@@ -805,18 +1178,89 @@ class WebDriver(webdriver.Chrome):
         else:
             raise WebDriverException("Invalid arguments passed to find_by_many!")
 
+    def _filter_by_attributes(self, elements: list[WebElement], predicates: list[tuple[str, Any]]) -> list[WebElement]:
+        """
+        :param predicates: (attribute, expected value) pairs, which all have to match (compared like get_attribute())
+        :return: The elements matching all predicates, filtered inside the page using a single script
+        """
+        if not elements or not predicates:
+            return elements
+
+        return self.execute_script(
+            read_script("filterByAttributes.js"),
+            elements,
+            [[attribute, None if value is None else str(value)] for attribute, value in predicates]
+        )
+
+    default_extraction_fields = {"text": "::text", "href": "::attr(href)", "attributes": "::attrs"}
+
+    def extract(self, selector: str, fields: dict[str, str | list | dict] | None = None, by: str = "css",
+                chunk_size: int = 500) -> list[dict[str, Any]]:
+        """
+        Extracts structured records from all elements matching the selector inside the page, instead of one command
+        per field of every element. Large results are transferred in chunks of chunk_size records.
+
+        Example:
+            driver.extract("div.product", fields={
+                "name": "h2",                           # The text of the first h2 inside the record
+                "url": "a::attr(href)",                 # The (absolute) href of the first link
+                "id": "::attr(data-id)",                # An attribute of the record element itself
+                "tags": [".tag"],                       # The texts of all matches
+                "offers": {"selector": ".offer", "all": True, "fields": {"price": ".price"}}  # Nested records
+            })
+
+        :param selector: The selector of the record elements
+        :param fields: The fields of every record by name (see utils.compile_extraction_field() for the format).
+            Missing elements result in None. None for default_extraction_fields (text, href and all attributes)
+        :param by: The locator strategy of the selector (css, xpath, id, name, class or tag)
+        :param chunk_size: The maximum number of records transferred per command
+        :return: The records in document order
+        """
+        compiled_selector = compile_in_page_locator(self.__resolve_by(by), selector)
+        if compiled_selector is None:
+            raise ValueError(f"Cannot extract records located by {by}; use css, xpath, id, name, class or tag")
+
+        fields = self.default_extraction_fields if fields is None else fields
+        compiled_fields = {name: compile_extraction_field(field) for name, field in fields.items()}
+
+        self.output.log(f"Extracting records ({by} = {selector}) with fields {list(fields)}...")
+        script = read_script("extractRecords.js")
+        result = self.execute_script(script, "extract", *compiled_selector, compiled_fields, chunk_size)
+        records = result["rows"]
+
+        while len(records) < result["total"]:
+            chunk = self.execute_script(script, "chunk", result["token"], len(records), chunk_size)
+
+            if not chunk:
+                raise DriverException(f"Lost the extracted records after {len(records)} of {result['total']} records "
+                                      f"(the page navigated or reloaded)")
+            records.extend(chunk)
+
+        return records
+
     def find_with_tag(self, tag: str, value: str, by: str = "id") -> WebElement:
         tag = tag.lower()
 
         self.output.log(f"Finding with tag {tag} ({by} = {value})...")
 
-        return next(element for element in self.find_all(value, by) if element.tag_name.lower() == tag)
+        compiled = compile_tag_locator(tag, self.__resolve_by(by), value)
+        if compiled is not None:
+            return self.find_element(*compiled)
+
+        element = next((element for element in self.find_all(value, by) if element.tag_name.lower() == tag), None)
+        if element is None:
+            raise NoSuchElementException(f"No element with tag {tag} found for ({by} = {value})")
+        return element
 
     def find_all_with_tag(self, tag: str, value: str, by: str = "id") -> list[WebElement]:
         tag = tag.lower()
 
         self.output.log(f"Finding all with tag {tag} ({by} = {value})...")
 
+        compiled = compile_tag_locator(tag, self.__resolve_by(by), value)
+        if compiled is not None:
+            return self.find_elements(*compiled)
+
         return [element for element in self.find_all(value, by) if element.tag_name.lower() == tag]
 
     def wait(self, amount: float) -> Self:
@@ -824,57 +1268,235 @@ class WebDriver(webdriver.Chrome):
         time.sleep(amount)
         return self
 
-    def wait_until(self, condition: Callable[[Self | WebElement], bool | WebElement | list[WebElement]], timeout: float = 6,
-                   reverse: bool = False) -> Self:
-        if reverse:
-            WebDriverWait(self, timeout).until_not(condition)
-        else:
-            WebDriverWait(self, timeout).until(condition)
+    def wait_until(self, condition: Callable[[Self | WebElement], bool | WebElement | list[WebElement]],
+                   timeout: float | None = None, reverse: bool = False) -> Self:
+        """
+        :param timeout: The timeout in seconds. None for the default timeout of the wait_policy
+        """
+        self._wait_for(condition, timeout, reverse)
         return self
 
-    def wait_and_find(self, value: str, by: str = "id", timeout: float = 6) -> WebElement:
-        self.wait_until_located(value, by, timeout)
-        return self.find(value, by)
+    def _wait_for(self, condition: Callable[[Self], Any], timeout: float | None = None, reverse: bool = False,
+                  key: tuple | None = None, description: str | None = None) -> Any:
+        """
+        :return: Waits until the condition holds (or no longer holds if reverse is True) and returns its last value.
+            Polls according to the wait_policy and is guarded by the proxy_circuit_breaker if one is configured
+        """
+        return self._wait_with_policy(
+            key, timeout, lambda t: self.wait_policy.until(self, condition, t, reverse), description)
+
+    def _wait_with_policy(self, key: tuple | None, timeout: float | None, wait: Callable[[float], Any],
+                          description: str | None = None) -> Any:
+        """
+        :param key: The key under which the wait_policy learns the time the wait takes (e.g. the resolved locator)
+        :param timeout: The explicit timeout or None for the timeout of the wait_policy
+        :param wait: Waits with the given timeout in seconds
+        :param description: Logged together with the timeout, if given
+        :return: The result of the wait
+        """
+        timeout = self.wait_policy.timeout(key, timeout)
+        if description is not None:
+            self.output.log(f"{description} with timeout {timeout:.2f}...")
+
+        def _attempt() -> Any:
+            start = time.monotonic()
+            result = wait(timeout)
+            self.wait_policy.record(key, time.monotonic() - start)
+            return result
+
+        return self._guard_wait(_attempt)
+
+    def _guard_wait(self, wait: Callable[[], Any]) -> Any:
+        if self.proxy_circuit_breaker is None or self.proxy_scoreboard is None:
+            return wait()
+        return self.proxy_circuit_breaker.guard_wait(self, wait)
 
-    def wait_and_find_all(self, value: str, by: str = "id", timeout: float = 6) -> list[WebElement]:
-        self.output.log(f"Waiting and finding all ({by} = {value}) with timeout {timeout}...")
-        return WebDriverWait(self, timeout).until(lambda *_: self.find_all(value, by))
+    def wait_and_find(self, value: str, by: str = "id", timeout: float | None = None) -> WebElement:
+        return self._wait_for_element("present", value, by, timeout)
 
-    def wait_find_with_tag(self, tag: str, value: str, by: str = "id", timeout: float = 6) -> WebElement:
+    def wait_and_find_all(self, value: str, by: str = "id", timeout: float | None = None) -> list[WebElement]:
+        locator = (self.__resolve_by(by), value)
+        return self._wait_with_policy(("all", *locator), timeout, lambda t: self._wait_in_page("all", locator, t),
+                                      f"Waiting and finding all ({by} = {value})")
+
+    def wait_find_with_tag(self, tag: str, value: str, by: str = "id", timeout: float | None = None) -> WebElement:
         self.wait_until_located(value, by, timeout)
 
         def _predicate(driver) -> WebElement:
             return driver.find_with_tag(tag, value, by)
 
-        return WebDriverWait(self, timeout).until(_predicate)
-
-    def wait_find_all_with_tag(self, tag: str, value: str, by: str = "id", timeout: float = 6) -> list[WebElement]:
-        self.output.log(f"Waiting and finding all with tag {tag} ({by} = {value}) with timeout {timeout}...")
+        return self._wait_for(_predicate, timeout, key=("tag", tag, self.__resolve_by(by), value))
 
+    def wait_find_all_with_tag(self, tag: str, value: str, by: str = "id", timeout: float | None = None) -> list[WebElement]:
         def _predicate(driver) -> list[WebElement]:
             return driver.find_all_with_tag(tag, value, by)
 
-        return WebDriverWait(self, timeout).until(_predicate)
+        return self._wait_for(_predicate, timeout, key=("all_tag", tag, self.__resolve_by(by), value),
+                              description=f"Waiting and finding all with tag {tag} ({by} = {value})")
 
-    def wait_clickable_and_find(self, value: str, by: str = "id", timeout: float = 6) -> WebElement:
-        self.wait_until_clickable(value, by, timeout)
-        return self.find(value, by)
+    def wait_clickable_and_find(self, value: str, by: str = "id", timeout: float | None = None) -> WebElement:
+        return self._wait_for_element("clickable", value, by, timeout)
+
+    def _wait_for_element(self, condition: str, value: str, by: str, timeout: float | None) -> WebElement:
+        """
+        :param condition: "present" or "clickable"
+        :return: The located element, which is also cached for the fluent helpers
+        """
+        locator = (self.__resolve_by(by), value)
+        element = self._wait_with_policy((condition, *locator), timeout,
+                                         lambda t: self._wait_in_page(condition, locator, t),
+                                         f"Waiting for {'PRESENCE' if condition == 'present' else 'CLICKABLE'} ({by} = {value})")
+        self._element_cache[locator] = element
+        return element
+
+    _element_conditions = {
+        "present": EC.presence_of_element_located,
+        "clickable": EC.element_to_be_clickable,
+        "all": EC.presence_of_all_elements_located
+    }
+
+    def wait_any(self, *conditions: tuple[str, str] | tuple[str, str, str] | str,
+                 timeout: float | None = None) -> tuple[int, WebElement | list[WebElement] | Any]:
+        """
+        Waits until any of the conditions holds, checking all of them together in a single in-page check per tick
+        (e.g. "success message OR error banner OR captcha"). Earlier conditions win if several hold at once.
+
+        :param conditions: Locators as (value, by) for the presence of an element or (value, by, condition) with
+            condition "present", "clickable" or "all", and JS conditions as strings containing the body of a function,
+            which returns a truthy value once met (e.g. "return document.title.includes('Welcome')")
+        :param timeout: The maximum time in seconds to wait for any of the conditions. None for the wait_policy's timeout
+        :return: The index of the first condition holding and its value (the element(s) for locators,
+            the returned value for JS conditions)
+        """
+        resolved = self._resolve_conditions(conditions)
+        index, result = self._wait_with_policy(tuple(resolved), timeout, lambda t: self._race(resolved, t),
+                                               f"Waiting for ANY of {len(resolved)} conditions")
+
+        if resolved[index][0] in ("present", "clickable"):
+            self._element_cache[resolved[index][1]] = result
+        return index, result
+
+    def check_any(self, *conditions: tuple[str, str] | tuple[str, str, str] | str) \
+            -> tuple[int, WebElement | list[WebElement] | Any] | None:
+        """
+        Like wait_any(), but checks the conditions only once without waiting.
 
-    def wait_until_located(self, value: str = None, by: str = "id", timeout: float = 6) -> Self:
-        self.output.log(f"Waiting for PRESENCE ({by} = {value}) with timeout {timeout}...")
-        self.wait_until(EC.presence_of_element_located((self.__resolve_by(by), value)), timeout=timeout)
+        :return: The index and value of the first condition holding or None if none holds
+        """
+        resolved = self._resolve_conditions(conditions)
+
+        try:
+            index, result = self._race(resolved, 0)
+        except TimeoutException:
+            return None
+
+        if resolved[index][0] in ("present", "clickable"):
+            self._element_cache[resolved[index][1]] = result
+        return index, result
+
+    def _resolve_conditions(self, conditions: tuple[tuple[str, str] | tuple[str, str, str] | str, ...]) \
+            -> list[tuple[str, tuple[str, str] | str]]:
+        if not conditions:
+            raise ValueError("At least one condition is required")
+
+        resolved = []
+        for condition in conditions:
+            if isinstance(condition, str):
+                resolved.append(("script", condition))
+            else:
+                value, by, *rest = condition
+                resolved.append((rest[0] if rest else "present", (self.__resolve_by(by), value)))
+        return resolved
+
+    def _wait_in_page(self, condition: str, locator: tuple[str, str], timeout: float) -> WebElement | list[WebElement]:
+        """
+        :param condition: "present", "clickable" or "all"
+        :param locator: The resolved (by, value) locator
+        :return: The located element (or all located elements for "all")
+        """
+        return self._race([(condition, locator)], timeout)[1]
+
+    def _race(self, conditions: list[tuple[str, tuple[str, str] | str]], timeout: float) -> tuple[int, Any]:
+        """
+        Waits with a MutationObserver inside the page (see scripts/waitForAny.js), which costs a single Chromedriver
+        round trip instead of one per poll. Falls back to polling via the wait_policy if event driven waits are disabled,
+        a locator cannot be evaluated by page scripts or the script fails (e.g. because the page navigated while waiting).
+
+        :param conditions: (condition, target) pairs: ("present" | "clickable" | "all", resolved locator) or
+            ("script", JS function body)
+        :return: The index and value of the first condition holding
+        """
+        deadline = time.monotonic() + timeout
+        compiled = []
+
+        for condition, target in conditions if self.event_driven_waits else ():
+            in_page = ("script", target) if condition == "script" else compile_in_page_locator(*target)
+            if in_page is None:
+                break
+            compiled.append([*in_page, condition])
+
+        if compiled and len(compiled) == len(conditions):
+            # The script timeout must not cut the wait short
+            self.ensure_script_timeout(timeout + 5)
+
+            try:
+                result = self.execute_async_script(read_script("waitForAny.js"), compiled, int(timeout * 1000))
+            except WebDriverException as e:
+                self.output.log(f"In-page wait failed, falling back to polling: {e.msg}", "WARNING")
+            else:
+                if result is None:
+                    raise TimeoutException(f"Timed out after {timeout}s waiting for {self._describe_conditions(conditions)}")
+                if not isinstance(result, dict):
+                    return result[0], result[1]
+                self.output.log(f"In-page wait failed, falling back to polling: {result.get('error')}", "WARNING")
+
+        def _check(driver) -> tuple[int, Any] | bool:
+            for i, (condition, target) in enumerate(conditions):
+                try:
+                    value = driver.execute_script(target) if condition == "script" \
+                        else self._element_conditions[condition](target)(driver)
+                except (NoSuchElementException, StaleElementReferenceException):
+                    continue
+
+                if value:
+                    return i, value
+            return False
+
+        return self.wait_policy.until(self, _check, max(deadline - time.monotonic(), 0),
+                                      message=f"Timed out after {timeout}s waiting for {self._describe_conditions(conditions)}")
+
+    def ensure_script_timeout(self, seconds: float) -> None:
+        """
+        :param seconds: The minimum script timeout needed by the next execute_async_script() call
+        """
+        if self._script_timeout is None or self._script_timeout < seconds:
+            self._script_timeout = seconds
+            self.set_script_timeout(seconds)
+
+    @staticmethod
+    def _describe_conditions(conditions: list[tuple[str, tuple[str, str] | str]]) -> str:
+        return " OR ".join(f"script ({target})" if condition == "script" else f"{condition} ({target[0]} = {target[1]})"
+                           for condition, target in conditions)
+
+    def wait_until_located(self, value: str = None, by: str = "id", timeout: float | None = None) -> Self:
+        self.wait_and_find(value, by, timeout)
         return self
 
-    def wait_until_all_located(self, value: str = None, by: str = "id", timeout: float = 6) -> Self:
-        self.output.log(f"Waiting for PRESENCE ({by} = {value}) with timeout {timeout}...")
-        self.wait_until(EC.presence_of_all_elements_located((self.__resolve_by(by), value)), timeout=timeout)
+    def wait_until_all_located(self, value: str = None, by: str = "id", timeout: float | None = None) -> Self:
+        self.wait_and_find_all(value, by, timeout)
         return self
 
-    def wait_until_clickable(self, value: str = None, by: str = "id", timeout: float = 6) -> Self:
-        self.output.log(f"Waiting for CLICKABLE ({by} = {value}) with timeout {timeout}...")
-        self.wait_until(EC.element_to_be_clickable((self.__resolve_by(by), value)), timeout=timeout)
+    def wait_until_clickable(self, value: str = None, by: str = "id", timeout: float | None = None) -> Self:
+        self.wait_clickable_and_find(value, by, timeout)
         return self
 
+    def macro(self, trusted_input: bool | None = None) -> DriverMacro:
+        """
+        :param trusted_input: Whether clicks and writes must use native input (see DriverMacro)
+        :return: A new DriverMacro recording steps to run on this driver with as few commands as possible
+        """
+        return DriverMacro(self, trusted_input)
+
     def wait_for_user_input(self, message: str = "Press Enter to proceed...") -> Self:
         print()
         input(message)
@@ -901,57 +1523,71 @@ class WebDriver(webdriver.Chrome):
         return self.find("body", "tag")
 
     def click(self, value: str = None, by: str = "id") -> Self:
+        """
+        :return: Clicks the element. Clicks may navigate or re-render the page, so the element cache is cleared afterward
+        """
         self.output.log(f"Clicking ({by} = {value})...")
-        self.find(value, by).click()
+
+        def _click(element: WebElement) -> None:
+            if not self.move_mouse_to(element, click=True):
+                element.click()
+
+        self._with_element(value, by, _click)
+        self.invalidate_element_cache()
         return self
 
     def click_js(self, value: str = None, by: str = "id") -> Self:
+        """
+        :return: Clicks the element via Javascript. The element cache is cleared afterward, like by click()
+        """
         self.output.log(f"Clicking using Javascript ({by} = {value})...")
-        self.execute_script("arguments[0].click()", self.find(value, by))
-        return self
 
-    def send_keys(self, element: WebElement, text: str, may_miss_spoofing: bool = True) -> Self:
-        avg_wait = self.avg_char_write_spoofing_delay * 2
-        acc_factor = 1.5
-        min_avg_wait = self.avg_char_write_spoofing_delay * 0.5
+        def _click(element: WebElement) -> None:
+            self.move_mouse_to(element)
+            self.execute_script("arguments[0].click()", element)
 
-        chance_state = cycle([15, 5, 22])
-        chance_to_mistype = next(chance_state)
-
-        if self.try_spoofing and self.keyboard_spoofing:
-            for char in text:
-                if may_miss_spoofing and char in string.ascii_letters and randint(1, chance_to_mistype) == 1:
-                    element.send_keys(choice(string.ascii_letters))
-                    time.sleep(avg_wait * 0.8)
-                    element.send_keys(Keys.BACKSPACE)
-                    time.sleep(avg_wait / 2)
-
-                    # Accelerate once
-                    acc_factor = min(acc_factor + 0.125, 2.5)
-                    chance_to_mistype = next(chance_state)
+        self._with_element(value, by, _click)
+        self.invalidate_element_cache()
+        return self
 
-                element.send_keys(char)
+    def move_mouse_to(self, element: WebElement, click: bool = False, force: bool = False) -> bool:
+        """
+        :param element: The element to move the mouse to along a humanized path (see MouseEngine)
+        :param click: Whether to click at the end of the movement
+        :param force: Whether to move the mouse even if mouse spoofing is disabled
+        :return: Whether the mouse was moved. Not moving happens if mouse spoofing is disabled or the element has no size
+        """
+        if not force and not (self.try_spoofing and self.mouse_spoofing):
+            return False
 
-                s_time = uniform(avg_wait / acc_factor, avg_wait * (3.25 - acc_factor))
+        position = self.mouse_engine.move_to(self, element, self._mouse_position, click)
+        if position is None:
+            return False
 
-                acc_factor = min(acc_factor + 0.125, 2.5)
-                if s_time > self.avg_char_write_spoofing_delay:
-                    avg_wait = max(avg_wait - s_time + self.avg_char_write_spoofing_delay, min_avg_wait)
+        self._mouse_position = position
+        return True
 
-                time.sleep(max(s_time, min_avg_wait))
+    def send_keys(self, element: WebElement, text: str, may_miss_spoofing: bool = True) -> Self:
+        """
+        :param may_miss_spoofing: Whether to occasionally mistype letters (and correct them) when keyboard spoofing is on
+        :return: Types the text into the element. With keyboard spoofing the typing_engine replays a humanized
+            keystroke schedule in a single command instead of sending every character separately
+        """
+        if self.try_spoofing and self.keyboard_spoofing:
+            self.typing_engine.type(self, element, text, may_miss_spoofing)
         else:
             element.send_keys(text)
         return self
 
-    def wait_click_write(self, text: str, value: str, by: str = "id", timeout: float = 6) -> WebElement:
-        self.wait_clickable_and_find(value, by, timeout).click()
-        self.send_keys(self.wait_clickable_and_find(value, by, timeout), text)
+    def wait_click_write(self, text: str, value: str, by: str = "id", timeout: float | None = None) -> WebElement:
+        element = self._with_element(value, by, lambda e: e.click(), self.wait_clickable_and_find(value, by, timeout))
+        element = self._with_element(value, by, lambda e: self.send_keys(e, text), element)
         if self.try_spoofing and self.keyboard_spoofing:
             time.sleep(uniform(0.15, 0.65))
-        return self.wait_clickable_and_find(value, by, timeout)
+        return element
 
     def wait_click_write_submit(self, text: str, value: str, by: str = "id",
-                                submit_value: str | None = None, submit_by: str | None = None,  timeout: float = 6) -> Self:
+                                submit_value: str | None = None, submit_by: str | None = None, timeout: float | None = None) -> Self:
         self.wait_click_write(text, value, by, timeout)
         if submit_value is not None:
             if submit_by is None:
@@ -963,47 +1599,53 @@ class WebDriver(webdriver.Chrome):
 
     def write_to(self, text: str, value: str, by: str = "id") -> WebElement:
         self.output.log(f"Writing '{text}' to ({by} = {value})...")
-        self.send_keys(self.find(value, by), text)
-        return self.find(value, by)
+        return self._with_element(value, by, lambda element: self.send_keys(element, text))
 
     def submit_element(self, value: str, by: str = "id") -> WebElement:
+        """
+        :return: The submitted element. Submitting usually navigates, so the element cache is cleared afterward
+        """
         self.output.log(f"Submitting ({by} = {value})...")
-        self.find(value, by).submit()
-        return self.find(value, by)
+        element = self._with_element(value, by, lambda e: e.submit())
+        self.invalidate_element_cache()
+        return element
 
-    def wait_and_click_js(self, value: str = None, by: str = "id", timeout: float = 6) -> Self:
-        self.output.log(f"Waiting and clicking ({by} = {value}) with timeout {timeout}...")
+    def wait_and_click_js(self, value: str = None, by: str = "id", timeout: float | None = None) -> Self:
+        self.output.log(f"Waiting and clicking ({by} = {value})...")
         self.wait_until_clickable(value, by, timeout)
         self.click_js(value, by)
         return self
 
-    def wait_and_click(self, value: str = None, by: str = "id", timeout: float = 6) -> Self:
-        self.output.log(f"Waiting and clicking ({by} = {value}) with timeout {timeout}...")
+    def wait_and_click(self, value: str = None, by: str = "id", timeout: float | None = None) -> Self:
+        self.output.log(f"Waiting and clicking ({by} = {value})...")
         self.wait_until_clickable(value, by, timeout)
         self.click(value, by)
         return self
 
-    def wait_and_write_to(self, text: str, value: str = None, by: str = "id", timeout: float = 6) -> WebElement:
-        self.output.log(f"Waiting and writing '{text}' to ({by} = {value}) with timeout {timeout}...")
+    def wait_and_write_to(self, text: str, value: str = None, by: str = "id", timeout: float | None = None) -> WebElement:
+        self.output.log(f"Waiting and writing '{text}' to ({by} = {value})...")
         self.wait_until_clickable(value, by, timeout)
         return self.write_to(text, value, by)
 
-    def wait_and_submit_element(self, value: str = None, by: str = "id", timeout: float = 6) -> WebElement:
-        self.output.log(f"Waiting and submitting ({by} = {value}) with timeout {timeout}...")
+    def wait_and_submit_element(self, value: str = None, by: str = "id", timeout: float | None = None) -> WebElement:
+        self.output.log(f"Waiting and submitting ({by} = {value})...")
         self.wait_until_clickable(value, by, timeout)
         return self.submit_element(value, by)
 
     def close_tab(self) -> Self:
         self.close()
+        self.invalidate_element_cache()
         return self
 
     def switch_to_tab(self, name: str) -> Self:
         self.switch_to.window(name)
+        self.invalidate_element_cache()
         return self
 
     def open_new_tab(self, url: str | None = None) -> Self:
         self.output.log("Opening new Tab...")
         self.switch_to.new_window(WindowTypes.TAB)
+        self.invalidate_element_cache()
 
         if url is not None:
             self.get(url)
@@ -1013,6 +1655,7 @@ class WebDriver(webdriver.Chrome):
     def open_new_window(self) -> Self:
         self.output.log("Opening new Window...")
         self.switch_to.new_window(WindowTypes.WINDOW)
+        self.invalidate_element_cache()
         return self
 
     def fullscreen(self) -> Self:
@@ -1133,9 +1776,112 @@ class WebDriver(webdriver.Chrome):
         return resolve_resource_path(resource)
 
     def get(self, url: str) -> Self:
-        super().get(url)
+        self._last_url = url
+
+        if self.proxy_circuit_breaker is not None and self.proxy_scoreboard is not None:
+            self.proxy_circuit_breaker.guard_navigation(self, lambda: self._navigate(url))
+        else:
+            self._navigate(url)
         return self
 
+    def start_loading(self, url: str) -> Self:
+        """
+        Starts navigating the current tab to the url without waiting for the page to load (unlike get()), such that
+        other tabs can be used meanwhile. Use is_page_loaded() to check whether the page finished loading.
+        Note that the next command sent to this tab may still block until the page loaded.
+        """
+        self.output.log(f"Start loading {url}...")
+        self._last_url = url
+        self.invalidate_element_cache()
+        # Marks the current document, such that it is not mistaken for the loaded page until it is replaced
+        self.execute_script(
+            "window.__webDriverPyLeaving = true;"
+            "window.addEventListener('hashchange', function () { window.__webDriverPyLeaving = false; });"
+            "window.location.href = arguments[0];",
+            url
+        )
+        return self
+
+    def is_page_loaded(self) -> bool:
+        """
+        :return: Whether the page of the current tab finished loading (after start_loading() the new page)
+        """
+        return self.execute_script("return document.readyState === 'complete' && !window.__webDriverPyLeaving;")
+
+    def back(self) -> Self:
+        self.invalidate_element_cache()
+        super().back()
+        return self
+
+    def forward(self) -> Self:
+        self.invalidate_element_cache()
+        super().forward()
+        return self
+
+    def refresh(self) -> Self:
+        self.invalidate_element_cache()
+        super().refresh()
+        return self
+
+    def reload_last_navigation(self) -> Self:
+        """
+        :return: Repeats the last navigation of get() (e.g. after switching the proxy)
+        """
+        if self._last_url is not None:
+            self._navigate(self._last_url)
+        return self
+
+    def _navigate(self, url: str) -> None:
+        self.invalidate_element_cache()
+
+        if self.proxy_scoreboard is None or (self.proxy_gateway is not None and self.proxy_gateway.per_connection):
+            # Without a single active proxy, navigation outcomes cannot be attributed to a proxy
+            super().get(url)
+            return
+
+        # Waits for a rotation or pool swap in progress
+        with self._proxy_lock:
+            proxy = self.proxy
+        start = time.perf_counter()
+
+        try:
+            super().get(url)
+        except WebDriverException as e:
+            if self.is_proxy_error(e):
+                self.proxy_scoreboard.report_failure(proxy)
+                if self.proxy_store is not None:
+                    self.proxy_store.record(proxy, success=False)
+                self.output.log(f"Navigation to {url} failed due to proxy {proxy}: {e.msg}", "ERROR")
+            raise
+
+        latency = time.perf_counter() - start
+        self.proxy_scoreboard.report_success(proxy, latency)
+        if self.proxy_store is not None:
+            self.proxy_store.record(proxy, latency=latency)
+
+    @classmethod
+    def is_proxy_error(cls, exception: WebDriverException) -> bool:
+        """
+        :return: Whether the exception was caused by the proxy (e.g. net::ERR_PROXY_CONNECTION_FAILED)
+        """
+        message = exception.msg or ""
+        return any(code in message for code in cls.proxy_error_codes)
+
+    def detect_proxy_error_page(self) -> str | None:
+        """
+        :return: The error code if the current tab shows Chrome's network error page for a proxy-level error, else None
+        """
+        try:
+            code = self.execute_script(
+                "if (!document.body || !document.body.classList.contains('neterror')) return null;"
+                "const element = document.querySelector('.error-code');"
+                "return element ? element.textContent.trim() : null;"
+            )
+        except WebDriverException:
+            return None
+
+        return code if code and any(proxy_code in code for proxy_code in self.proxy_error_codes) else None
+
     def __raise_not_implemented(self, message: str) -> NoReturn:
         self.output.log(f"Encountered NotImplementedError:\n{message}", "ERROR")
         raise NotImplementedError(message)
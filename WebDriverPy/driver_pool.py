@@ -0,0 +1,338 @@
+import time
+
+from contextlib import contextmanager
+from threading import Condition, Thread, Event
+from typing import Callable, Self, Any, Iterator
+from warnings import warn
+
+from selenium.common import WebDriverException
+
+from .driver import WebDriver
+from .driver_scripts import DriverScript
+from .exceptions import DriverPoolException
+
+
+class DriverPool:
+    """
+    Keeps a number of started WebDrivers warm and leases them to DriverScripts.
+
+    Starting a WebDriver is expensive (directory setup, binary discovery, version checks and the browser launch itself).
+    The pool pays this cost once per browser: Drivers are created with late_init=True, started via init() and then
+    reused. When a lease ends, the driver is reset via WebDriver.reset_session() instead of being quit.
+
+    Usage:
+        with DriverPool(min_size=2, max_size=4, no_cookies=True) as pool:
+            pool.run(OpenGoogle)
+
+            with pool.lease() as driver:
+                driver.get("https://google.com")
+
+    Note: Do not keep references to a leased driver after its lease ended (e.g. the driver returned by OpenGoogle.run()),
+    as it may already be leased to someone else.
+    """
+
+    def __init__(self,
+                 min_size: int = 1,
+                 max_size: int = 4,
+                 max_idle: float | None = 300,
+                 maintenance_interval: float | None = 30,
+                 driver_factory: Callable[[], WebDriver] | None = None,
+                 warm_up: bool = True,
+                 **driver_kwargs) -> None:
+        """
+        :param min_size: The number of drivers, which are always kept started (even when idle)
+        :param max_size: The maximum number of drivers started at the same time
+        :param max_idle: The time in seconds after which idle drivers exceeding min_size are quit. None to never evict idle drivers
+        :param maintenance_interval: The interval in seconds in which a background thread evicts idle drivers and
+            replaces dead ones. None to only do so when drivers are acquired or released
+        :param driver_factory: A callable creating a new (not yet initialized) WebDriver. The pool calls init() on it
+            if it is not running yet. If None, WebDriver(late_init=True, **driver_kwargs) is used
+        :param warm_up: Whether to start min_size drivers immediately
+        :param driver_kwargs: Keyword arguments for the default driver factory
+        """
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise DriverPoolException(f"Invalid pool size configuration: min_size={min_size}, max_size={max_size}")
+
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_idle = max_idle
+
+        self._driver_factory = driver_factory
+        self._driver_kwargs = driver_kwargs
+
+        self._idle: list[tuple[WebDriver, float]] = []
+        self._leased: set[WebDriver] = set()
+        self._starting = 0
+        self._closed = False
+        self._condition = Condition()
+
+        self._stop_maintenance = Event()
+        self._maintenance_thread: Thread | None = None
+
+        if warm_up:
+            self.fill()
+
+        if maintenance_interval is not None:
+            self._maintenance_thread = Thread(target=self._maintenance_loop, args=(maintenance_interval,), daemon=True)
+            self._maintenance_thread.start()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    @property
+    def size(self) -> int:
+        """
+        :return: The number of drivers currently started or starting (idle and leased)
+        """
+        with self._condition:
+            return len(self._idle) + len(self._leased) + self._starting
+
+    @property
+    def idle_count(self) -> int:
+        with self._condition:
+            return len(self._idle)
+
+    def _create_driver(self) -> WebDriver:
+        if self._driver_factory is not None:
+            driver = self._driver_factory()
+        else:
+            kwargs = {"clear_temp_dir": False, **self._driver_kwargs, "late_init": True}
+            driver = WebDriver(**kwargs)
+
+            # Reuse the discovered binaries for all further drivers of this pool
+            self._driver_kwargs.setdefault("chromedriver_path", driver.chromedriver_path)
+            self._driver_kwargs.setdefault("chrome_binary_path", driver.chrome_binary)
+
+        if not driver.running:
+            driver.init()
+
+        return driver
+
+    def _start_driver(self) -> WebDriver:
+        """
+        Starts a new driver for a slot already reserved via self._starting
+        """
+        try:
+            driver = self._create_driver()
+        except BaseException:
+            with self._condition:
+                self._starting -= 1
+                self._condition.notify()
+            raise
+
+        with self._condition:
+            self._starting -= 1
+        return driver
+
+    @staticmethod
+    def _discard(driver: WebDriver) -> None:
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
+
+    def fill(self) -> Self:
+        """
+        :return: Starts drivers until at least min_size drivers are started
+        """
+        with self._condition:
+            missing = max(self.min_size - (len(self._idle) + len(self._leased) + self._starting), 0)
+            self._starting += missing
+
+        for i in range(missing):
+            try:
+                driver = self._start_driver()
+            except BaseException:
+                # Release the slots reserved for the remaining drivers
+                with self._condition:
+                    self._starting -= missing - i - 1
+                raise
+
+            with self._condition:
+                self._idle.append((driver, time.monotonic()))
+                self._condition.notify()
+
+        return self
+
+    def evict_idle(self) -> Self:
+        """
+        :return: Quits all idle drivers exceeding min_size, which have been idle for longer than max_idle seconds
+        """
+        if self.max_idle is None:
+            return self
+
+        evicted = []
+        now = time.monotonic()
+
+        with self._condition:
+            excess = len(self._idle) + len(self._leased) + self._starting - self.min_size
+
+            # The oldest idle drivers are at the front of the list
+            while excess > 0 and self._idle and now - self._idle[0][1] > self.max_idle:
+                evicted.append(self._idle.pop(0)[0])
+                excess -= 1
+
+        for driver in evicted:
+            driver.output.log("Evicting idle driver from pool...", "POOL")
+            self._discard(driver)
+
+        return self
+
+    def acquire(self, timeout: float | None = None) -> WebDriver:
+        """
+        Leases a driver from the pool. Every acquired driver has to be returned via release().
+        Prefer using lease() instead.
+
+        :param timeout: The maximum time in seconds to wait for a driver to become available. None to wait indefinitely
+        :return: A started and healthy driver
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            self.evict_idle()
+
+            with self._condition:
+                while True:
+                    if self._closed:
+                        raise DriverPoolException("Unable to acquire driver: The pool has been closed!")
+
+                    if self._idle:
+                        # Most recently used drivers first, such that the oldest ones can be evicted
+                        driver = self._idle.pop()[0]
+                        self._leased.add(driver)
+                        start_new = False
+                        break
+
+                    if len(self._leased) + self._starting < self.max_size:
+                        self._starting += 1
+                        start_new = True
+                        break
+
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise DriverPoolException(f"Unable to acquire driver: No driver became available within {timeout}s!")
+
+                    self._condition.wait(remaining)
+
+            if start_new:
+                driver = self._start_driver()
+
+                with self._condition:
+                    self._leased.add(driver)
+                return driver
+
+            if driver.is_alive:
+                return driver
+
+            # Dead driver: Drop it and try again
+            with self._condition:
+                self._leased.discard(driver)
+                self._condition.notify()
+            self._discard(driver)
+
+    def release(self, driver: WebDriver) -> Self:
+        """
+        Returns a leased driver to the pool. The driver is reset via WebDriver.reset_session() or quit if resetting fails.
+
+        :param driver: The driver to return
+        :return: The pool itself
+        """
+        with self._condition:
+            if driver not in self._leased:
+                raise DriverPoolException("Unable to release driver: The driver is not leased from this pool!")
+
+        reusable = not self._closed and driver.is_alive
+
+        if reusable:
+            try:
+                driver.reset_session()
+            except WebDriverException:
+                reusable = False
+
+        with self._condition:
+            self._leased.discard(driver)
+
+            # The pool may have been closed while resetting, after which no driver may become idle again
+            reusable = reusable and not self._closed
+            if reusable:
+                self._idle.append((driver, time.monotonic()))
+            self._condition.notify()
+
+        if not reusable:
+            self._discard(driver)
+
+        return self
+
+    @contextmanager
+    def lease(self, timeout: float | None = None) -> Iterator[WebDriver]:
+        """
+        :param timeout: The maximum time in seconds to wait for a driver to become available. None to wait indefinitely
+        :return: A context manager leasing a driver and returning it to the pool on exit
+        """
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def run(self, script_type: type[DriverScript], *args, timeout: float | None = None, **kwargs) -> Any:
+        """
+        :param script_type: The DriverScript subclass to run
+        :param args: Any additional positional arguments for the constructor of the script (after the driver)
+        :param timeout: The maximum time in seconds to wait for a driver to become available. None to wait indefinitely
+        :param kwargs: Any additional keyword arguments for the constructor of the script
+        :return: Leases a driver, runs the script on it, returns the driver to the pool and returns the result of the script
+        """
+        with self.lease(timeout) as driver:
+            return script_type(driver, *args, **kwargs).run()
+
+    def _maintenance_loop(self, interval: float) -> None:
+        while not self._stop_maintenance.wait(interval):
+            try:
+                self.maintain()
+            except Exception as e:
+                # E.g. the browser failed to start: Keep the thread alive and try again in the next interval
+                warn(f"[DriverPool]: Maintenance failed: {e}", RuntimeWarning)
+
+    def maintain(self) -> Self:
+        """
+        :return: Evicts idle drivers, replaces dead ones and starts drivers until at least min_size drivers are started
+        """
+        self.evict_idle()
+
+        with self._condition:
+            idle = list(self._idle)
+
+        dead = [driver for driver, _ in idle if not driver.is_alive]
+
+        if dead:
+            with self._condition:
+                # Drivers leased in the meantime are checked again by acquire()
+                removed = [driver for driver, _ in self._idle if driver in dead]
+                self._idle = [entry for entry in self._idle if entry[0] not in dead]
+                self._condition.notify_all()
+
+            for driver in removed:
+                self._discard(driver)
+
+        if not self._closed:
+            self.fill()
+
+        return self
+
+    def close(self) -> None:
+        """
+        Quits all idle drivers and prevents further leases. Leased drivers are quit once they are released.
+        """
+        self._stop_maintenance.set()
+
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._condition.notify_all()
+
+        for driver, _ in idle:
+            self._discard(driver)
@@ -1,8 +1,26 @@
 from abc import ABC
-from typing import Any
+from functools import wraps
+from typing import Any, Callable, Generator
 
 from .driver import WebDriver
 from .exceptions import InvalidDriverConfiguration
+from .tab_scheduler import Load, Sleep, WaitFor, WaitPoint
+
+
+def _within_wait_budget(run: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Runs run() within the script's wait budget. The budget of the outermost run() also limits super().run() calls,
+    since nested budgets can only shorten it
+    """
+    @wraps(run)
+    def wrapper(self: "DriverScript", *args, **kwargs) -> Any:
+        if self.wait_budget is None:
+            return run(self, *args, **kwargs)
+
+        with self.driver.wait_policy.budget(self.wait_budget):
+            return run(self, *args, **kwargs)
+
+    return wrapper
 
 
 class DriverScript(ABC):
@@ -21,7 +39,26 @@ class DriverScript(ABC):
     check_driver_config() should return None if there are no problems.
     It is automatically called when super().__init__() is called and raises the InvalidDriverConfiguration exception
     if the configuration is invalid
+
+    Set wait_budget (class attribute or in __init__) to limit the total time all waits of one run() may take
+    (see WaitPolicy.budget())
+
+    To support the TabScheduler without writing the logic twice, put it in wait point steps shared by run_steps()
+    and run() (via run_blocking()), like OpenGoogle does
     """
+
+    wait_budget: float | None = None
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+
+        if "run" in cls.__dict__:
+            cls.run = _within_wait_budget(cls.run)
+
+            # The run_steps() of a base class does not know the logic of this run(), so run it without interleaving
+            if "run_steps" not in cls.__dict__:
+                cls.run_steps = DriverScript.run_steps
+
     def __init__(self, driver: WebDriver):
         """
         :param driver: The webdriver to use
@@ -42,6 +79,51 @@ class DriverScript(ABC):
         if not self.driver.is_on_empty_tab:
             self.driver.open_new_tab()
 
+    run = _within_wait_budget(run)
+
+    def run_steps(self, *args, **kwargs) -> Generator[WaitPoint, Any, Any]:
+        """
+        The interleavable version of run() used by the TabScheduler: A generator yielding Load, WaitFor and Sleep
+        points (see tab_scheduler.py) wherever the script would block, which returns the result of the script.
+        The scheduler resumes the script in its own tab once the point is ready.
+
+        By default, run() is called without any wait points (the script blocks the scheduler while running).
+        This also applies to subclasses overriding run() without overriding run_steps()
+        """
+        return self.run(*args, **kwargs)
+        yield
+
+    def run_blocking(self, steps: Generator[WaitPoint, Any, Any]) -> Any:
+        """
+        Runs wait point steps (e.g. shared with run_steps()) without a TabScheduler, blocking at every point
+        until it is ready. Errors at a point are thrown into the steps like the scheduler does
+
+        :return: The value returned by the steps
+        """
+        value, error = None, None
+
+        while True:
+            try:
+                point = steps.throw(error) if error is not None else steps.send(value)
+            except StopIteration as stop:
+                return stop.value
+
+            try:
+                value, error = self._block_at(point), None
+            except Exception as e:
+                value, error = None, e
+
+    def _block_at(self, point: WaitPoint) -> Any:
+        match point:
+            case Load():
+                self.driver.get(point.url)
+            case Sleep():
+                self.driver.wait(point.seconds)
+            case WaitFor():
+                return self.driver.wait_any(*point.conditions, timeout=point.timeout)
+            case _:
+                raise TypeError(f"{type(self).__name__} yielded {point!r}, expected Load, WaitFor or Sleep")
+
     def check_driver_config(self) -> None | str:
         """
         Checks the driver configuration
@@ -67,6 +149,9 @@ class OpeningDriverScript(DriverScript):
         super().run()
         self.driver.get(self.address)
 
+    def run_steps(self, *args, **kwargs) -> Generator[WaitPoint, Any, Any]:
+        yield Load(self.address)
+
 
 class OpenGoogle(OpeningDriverScript):
     """
@@ -80,7 +165,14 @@ class OpenGoogle(OpeningDriverScript):
 
     def run(self) -> WebDriver:
         super().run()
-        self.driver.wait_until_clickable("q", by="name")
+        return self.run_blocking(self._search_ready())
+
+    def run_steps(self, *args, **kwargs) -> Generator[WaitPoint, Any, WebDriver]:
+        yield from super().run_steps()
+        return (yield from self._search_ready())
+
+    def _search_ready(self) -> Generator[WaitPoint, Any, WebDriver]:
+        yield WaitFor(("q", "name", "clickable"))
         return self.driver
 
 
@@ -96,6 +188,10 @@ class OpenWhatIsMyIP(OpeningDriverScript):
         super().run()
         return self.driver
 
+    def run_steps(self, *args, **kwargs) -> Generator[WaitPoint, Any, WebDriver]:
+        yield from super().run_steps()
+        return self.driver
+
 
 class GrabTempMail(OpeningDriverScript):
     """
@@ -109,20 +205,22 @@ class GrabTempMail(OpeningDriverScript):
 
     def run(self, open_new_tab_at_end: bool = False, new_tab_url: str | None = None) -> str:
         super().run()
-
-        def find_mail() -> str | None:
-            value = self.driver.wait_and_find("email").get_attribute("value").strip()
-
-            if not value or "@" not in value:
-                return None
-
-            return value
-
-        self.driver.wait_until(lambda _: find_mail() is not None, timeout=12)
-        mail = find_mail()
+        mail = self.run_blocking(self._grab_mail())
 
         if open_new_tab_at_end:
             self.driver.open_new_tab(new_tab_url)
 
         return mail
 
+    def run_steps(self, *args, **kwargs) -> Generator[WaitPoint, Any, str]:
+        yield from super().run_steps()
+        return (yield from self._grab_mail())
+
+    def _grab_mail(self) -> Generator[WaitPoint, Any, str]:
+        _, mail = yield WaitFor(
+            "const element = document.getElementById('email');"
+            "return element && element.value.includes('@') ? element.value.trim() : null;",
+            timeout=12
+        )
+        return mail
+
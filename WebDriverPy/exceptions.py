@@ -28,3 +28,14 @@ class DriverScriptException(WebDriverException):
 
 class InvalidDriverConfiguration(DriverScriptException):
     pass
+
+
+class DriverPoolException(DriverException):
+    pass
+
+
+class DriverMacroException(DriverException):
+    def __init__(self, msg: str, results: list | None = None):
+        super().__init__(msg)
+        self.results = results if results is not None else []
+        """The results of all steps run so far (the last one failed)"""
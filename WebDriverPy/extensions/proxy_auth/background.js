@@ -1,63 +1,102 @@
-chrome.proxy.settings.set(
-  {
-    value: {
-      mode: "fixed_servers",
-      rules: {
-        singleProxy: {
-          scheme: "http",
-          host: "204.44.69.89",
-          port: parseInt(6634)
-        },
-        bypassList: ["localhost"]
-      }
-    },
-    scope: "regular"
-  },
-  function () {}
-);
+var proxyConfig = {
+  scheme: "!__::SCHEME_TEMPLATE_DUMMY::__!",
+  host: "!__::HOST_TEMPLATE_DUMMY::__!",
+  port: parseInt("!__::PORT_TEMPLATE_DUMMY::__!"),
+  username: "!__::USERNAME_TEMPLATE_DUMMY::__!",
+  password: "!__::PASSWORD_TEMPLATE_DUMMY::__!"
+};
 
-function callbackFn(details) {
-  return {
-    authCredentials: {
-      username: "onutajva",
-      password: "g07dy4jkg8at"
-    }
-  };
+// Credentials of the proxies of an applied PAC script by "host:port"
+var pacCredentials = {};
+
+function applyProxyConfig(config, callback) {
+  proxyConfig = config;
+  pacCredentials = {};
+
+  chrome.proxy.settings.set(
+    {
+      value: {
+        mode: "fixed_servers",
+        rules: {
+          singleProxy: {
+            scheme: config.scheme,
+            host: config.host,
+            port: parseInt(config.port)
+          },
+          bypassList: ["localhost"]
+        }
+      },
+      scope: "regular"
+    },
+    callback || function () {}
+  );
 }
 
-chrome.webRequest.onAuthRequired.addListener(
-  callbackFn,
-  { urls: ["<all_urls>"] },
-  ["blocking"]
-);chrome.proxy.settings.set(
-  {
-    value: {
-      mode: "fixed_servers",
-      rules: {
-        singleProxy: {
-          scheme: "http",
-          host: "204.44.69.89",
-          port: parseInt(6634)
-        },
-        bypassList: ["localhost"]
-      }
+function applyPacScript(pac, credentials, callback) {
+  pacCredentials = credentials || {};
+
+  chrome.proxy.settings.set(
+    {
+      value: {
+        mode: "pac_script",
+        pacScript: { data: pac, mandatory: true }
+      },
+      scope: "regular"
     },
-    scope: "regular"
-  },
-  function () {}
-);
+    callback || function () {}
+  );
+}
 
 function callbackFn(details) {
+  if (details.isProxy && details.challenger) {
+    var credentials = pacCredentials[details.challenger.host + ":" + details.challenger.port];
+
+    if (credentials) {
+      return {
+        authCredentials: {
+          username: credentials.username,
+          password: credentials.password
+        }
+      };
+    }
+  }
+
+  if (!proxyConfig.username) {
+    return {};
+  }
+
   return {
     authCredentials: {
-      username: "onutajva",
-      password: "g07dy4jkg8at"
+      username: proxyConfig.username,
+      password: proxyConfig.password
     }
   };
 }
 
+// Allows switching the active proxy of the running browser (used by WebDriver.rotate_proxy(hot=True))
+// and routing hosts through different proxies via a PAC script (used by WebDriver.apply_proxy_routes())
+chrome.runtime.onMessage.addListener(function (message, sender, sendResponse) {
+  if (!message || (message.type !== "setProxy" && message.type !== "setPac")) {
+    return false;
+  }
+
+  var respond = function () {
+    var error = chrome.runtime.lastError;
+    sendResponse({ ok: !error, error: error ? error.message : null });
+  };
+
+  if (message.type === "setPac") {
+    applyPacScript(message.pac, message.credentials, respond);
+  } else {
+    applyProxyConfig(message.config, respond);
+  }
+  return true;
+});
+
+applyProxyConfig(proxyConfig);
+
 chrome.webRequest.onAuthRequired.addListener(
   callbackFn,
   { urls: ["<all_urls>"] },
   ["blocking"]
-);
\ No newline at end of file
+);
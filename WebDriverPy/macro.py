@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import time
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Self, TYPE_CHECKING
+
+from selenium.common import WebDriverException
+
+from .exceptions import DriverMacroException
+from .utils import compile_in_page_locator, read_script
+
+if TYPE_CHECKING:
+    from .driver import WebDriver
+
+
+@dataclass(slots=True)
+class MacroStep:
+    name: str
+    program: dict[str, Any] | None = None
+    """The step of the in-page program (see scripts/runMacro.js) or None for native steps"""
+    native: Callable[[], Any] | None = None
+    """Runs the step via native WebDriver commands"""
+    navigates: bool = False
+    """Whether the step may leave the page, which ends the in-page program"""
+    locator: tuple[str, str] | None = None
+    timeout: float | None = None
+
+
+@dataclass(slots=True)
+class MacroStepResult:
+    name: str
+    duration: float
+    """The time in seconds the step took"""
+    in_page: bool
+    """Whether the step ran inside the page (or via native commands)"""
+    value: Any = None
+    error: str | None = None
+
+
+@dataclass(slots=True)
+class _Segment:
+    steps: list[MacroStep] = field(default_factory=list)
+    in_page: bool = True
+
+
+class DriverMacro:
+    """
+    Records a chain of fluent WebDriver steps and runs them with as few WebDriver commands as possible:
+    Consecutive steps, which can run inside the page (waits, JS clicks, value writes, submits, sleeps), are compiled
+    into a single execute_async_script program. Steps needing native commands (navigation, trusted input, locators
+    page scripts cannot evaluate) run between those programs. Steps, which may leave the page (clicks and submits),
+    end a program, since the program cannot report its results once the page unloads.
+
+    Clicks and writes need trusted input (real input events) whenever the driver spoofs mouse or keyboard input,
+    so they only run inside the page if spoofing is off or trusted_input is False.
+
+    Usage:
+        results = driver.macro() \\
+            .get("https://google.com") \\
+            .wait_click_write_submit("Hello World!", "q", by="name") \\
+            .run()
+    """
+
+    def __init__(self, driver: WebDriver, trusted_input: bool | None = None):
+        """
+        :param driver: The driver to run the macro with
+        :param trusted_input: Whether clicks and writes must use native input. None to decide per step from the
+            driver's mouse_spoofing and keyboard_spoofing settings
+        """
+        self.driver = driver
+        self.trusted_input = trusted_input
+        self.steps: list[MacroStep] = []
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def _needs_trusted(self, spoofing: bool) -> bool:
+        if self.trusted_input is not None:
+            return self.trusted_input
+        return self.driver.try_spoofing and spoofing
+
+    def _element_step(self, name: str, op: str, value: str, by: str, native: Callable[[], Any],
+                      trusted: bool = False, **program) -> Self:
+        locator = (self.driver.resolve_by(by), value)
+        compiled = None if trusted else compile_in_page_locator(*locator)
+
+        self.steps.append(MacroStep(
+            f"{name} ({by} = {value})",
+            program={"op": op, "kind": compiled[0], "selector": compiled[1], **program} if compiled else None,
+            native=native,
+            navigates=op in ("click", "submit"),
+            locator=locator
+        ))
+        return self
+
+    def get(self, url: str) -> Self:
+        self.steps.append(MacroStep(f"get {url}", native=lambda: self.driver.get(url), navigates=True))
+        return self
+
+    def wait(self, amount: float) -> Self:
+        self.steps.append(MacroStep(f"wait {amount}s", program={"op": "sleep", "ms": int(amount * 1000)},
+                                    native=lambda: time.sleep(amount)))
+        return self
+
+    def _wait_step(self, condition: str, value: str, by: str, timeout: float | None) -> Self:
+        native = self.driver.wait_and_find if condition == "present" else self.driver.wait_clickable_and_find
+        self._element_step(f"wait until {condition}", "wait", value, by,
+                           lambda: native(value, by, timeout), condition=condition)
+        self.steps[-1].timeout = timeout
+        return self
+
+    def wait_until_located(self, value: str, by: str = "id", timeout: float | None = None) -> Self:
+        return self._wait_step("present", value, by, timeout)
+
+    def wait_until_clickable(self, value: str, by: str = "id", timeout: float | None = None) -> Self:
+        return self._wait_step("clickable", value, by, timeout)
+
+    def wait_and_find(self, value: str, by: str = "id", timeout: float | None = None) -> Self:
+        """
+        The element is the value of the step's result
+        """
+        return self._wait_step("present", value, by, timeout)
+
+    def click(self, value: str, by: str = "id") -> Self:
+        return self._element_step("click", "click", value, by, lambda: self.driver.click(value, by),
+                                  trusted=self._needs_trusted(self.driver.mouse_spoofing))
+
+    def click_js(self, value: str, by: str = "id") -> Self:
+        return self._element_step("click_js", "click", value, by, lambda: self.driver.click_js(value, by),
+                                  trusted=self._needs_trusted(self.driver.mouse_spoofing))
+
+    def write_to(self, text: str, value: str, by: str = "id") -> Self:
+        return self._element_step("write", "write", value, by, lambda: self.driver.write_to(text, value, by),
+                                  trusted=self._needs_trusted(self.driver.keyboard_spoofing), text=text)
+
+    def submit_element(self, value: str, by: str = "id") -> Self:
+        return self._element_step("submit", "submit", value, by, lambda: self.driver.submit_element(value, by))
+
+    def wait_click_write(self, text: str, value: str, by: str = "id", timeout: float | None = None) -> Self:
+        return self.wait_until_clickable(value, by, timeout).click(value, by).write_to(text, value, by)
+
+    def wait_click_write_submit(self, text: str, value: str, by: str = "id",
+                                submit_value: str | None = None, submit_by: str | None = None,
+                                timeout: float | None = None) -> Self:
+        self.wait_click_write(text, value, by, timeout)
+
+        if submit_value is not None:
+            submit_by = "id" if submit_by is None else submit_by
+            return self.wait_until_clickable(submit_value, submit_by, timeout).submit_element(submit_value, submit_by)
+        if submit_by is None:
+            return self.submit_element(value, by)
+        return self
+
+    def segments(self) -> list[_Segment]:
+        """
+        :return: The steps grouped into in-page programs and single native steps
+        """
+        segments: list[_Segment] = []
+
+        for step in self.steps:
+            if step.program is None:
+                segments.append(_Segment([step], in_page=False))
+                continue
+
+            if not segments or not segments[-1].in_page or segments[-1].steps[-1].navigates:
+                segments.append(_Segment())
+            segments[-1].steps.append(step)
+
+        return segments
+
+    def _run_native(self, step: MacroStep) -> MacroStepResult:
+        start = time.monotonic()
+
+        try:
+            value = step.native()
+        except WebDriverException as e:
+            return MacroStepResult(step.name, time.monotonic() - start, False, error=e.msg or type(e).__name__)
+
+        return MacroStepResult(step.name, time.monotonic() - start, False,
+                               value=None if value is self.driver else value)
+
+    def _run_in_page(self, steps: list[MacroStep]) -> list[MacroStepResult]:
+        program = []
+        total = 0.0
+
+        for step in steps:
+            if step.program["op"] == "wait":
+                timeout = self.driver.wait_policy.timeout((step.program["condition"], *step.locator), step.timeout)
+                program.append(step.program | {"timeout": int(timeout * 1000)})
+                total += timeout
+            else:
+                program.append(step.program)
+                total += step.program.get("ms", 0) / 1000
+
+        self.driver.ensure_script_timeout(total + 5)
+        start = time.monotonic()
+
+        try:
+            outcomes = self.driver.execute_async_script(read_script("runMacro.js"), program)
+        except WebDriverException as e:
+            # E.g. the page unloaded before the program finished: The outcome of its single steps is unknown
+            error = f"{e.msg or type(e).__name__} (in-page program of {len(steps)} steps)"
+            return [MacroStepResult(steps[0].name, time.monotonic() - start, True, error=error)]
+
+        results = []
+        for step, outcome in zip(steps, outcomes):
+            result = MacroStepResult(step.name, outcome["duration"] / 1000, True, outcome["value"], outcome["error"])
+            results.append(result)
+
+            if result.error is None and step.program["op"] == "wait":
+                self.driver.wait_policy.record((step.program["condition"], *step.locator), result.duration)
+                self.driver.cache_element(result.value, step.locator[1], step.locator[0])
+
+        return results
+
+    def run(self) -> list[MacroStepResult]:
+        """
+        :return: The results of all steps. Raises a DriverMacroException (with the results so far) at the first failing step
+        """
+        results: list[MacroStepResult] = []
+        self.driver.output.log(f"Running macro with {len(self.steps)} steps...")
+
+        for segment in self.segments():
+            if segment.in_page:
+                results.extend(self._run_in_page(segment.steps))
+            else:
+                results.append(self._run_native(segment.steps[0]))
+
+            if results and results[-1].error is not None:
+                failed = results[-1]
+                raise DriverMacroException(f"Macro step {len(results)} ({failed.name}) failed: {failed.error}", results)
+
+            if segment.steps[-1].navigates:
+                self.driver.invalidate_element_cache()
+
+        return results
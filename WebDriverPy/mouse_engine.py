@@ -0,0 +1,196 @@
+import math
+
+from random import Random
+
+from selenium.webdriver.common.actions.action_builder import ActionBuilder
+from selenium.webdriver.remote.webdriver import WebDriver as RemoteWebDriver
+from selenium.webdriver.remote.webelement import WebElement
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+LOCATE_SCRIPT = """
+var element = arguments[0];
+var rect = element.getBoundingClientRect();
+
+if (rect.top < 0 || rect.left < 0 || rect.bottom > window.innerHeight || rect.right > window.innerWidth) {
+    element.scrollIntoView({ block: "center", inline: "center" });
+    rect = element.getBoundingClientRect();
+}
+return [rect.left, rect.top, rect.width, rect.height, window.innerWidth, window.innerHeight];
+"""
+
+
+class MouseEngine:
+    """
+    Moves the mouse like a human: Paths are cubic Bezier curves with randomly bent control points, traversed with
+    a minimum-jerk velocity profile (slow start, fast middle, slow end) and small jitter, which vanishes at both ends.
+    The duration of a movement grows with the distance relative to the target size (Fitts's law).
+
+    All points of a path are computed at once (with NumPy if it is installed) and dispatched as W3C pointer actions
+    in a single perform() command per movement (including the click).
+
+    Pass a seed for reproducible paths.
+    """
+
+    def __init__(self,
+                 step_interval: float = 0.016,
+                 min_duration: float = 0.12,
+                 duration_per_bit: float = 0.09,
+                 curvature: float = 0.2,
+                 jitter: float = 1.0,
+                 hold_range: tuple[float, float] = (0.05, 0.12),
+                 seed: int | None = None):
+        """
+        :param step_interval: The time in seconds between two points of a path (0.016 is about 60 mouse events per second)
+        :param min_duration: The minimum duration of a movement in seconds
+        :param duration_per_bit: The additional duration in seconds per bit of difficulty (log2(1 + distance / size))
+        :param curvature: The standard deviation of the bend of a path relative to its length
+        :param jitter: The standard deviation of the jitter in pixels
+        :param hold_range: The range of the time in seconds the mouse button is held down when clicking
+        :param seed: The seed of the random number generator. None for a random seed
+        """
+        self.step_interval = step_interval
+        self.min_duration = min_duration
+        self.duration_per_bit = duration_per_bit
+        self.curvature = curvature
+        self.jitter = jitter
+        self.hold_range = hold_range
+        self.random = Random(seed)
+
+    def seed(self, seed: int | None) -> None:
+        self.random.seed(seed)
+
+    def duration(self, distance: float, target_size: float) -> float:
+        """
+        :return: The duration of a movement in seconds over the distance to a target of the given size (in pixels)
+        """
+        bits = math.log2(1 + distance / max(target_size, 1))
+        return (self.min_duration + self.duration_per_bit * bits) * self.random.uniform(0.85, 1.15)
+
+    @staticmethod
+    def clamp(point: tuple[float, float], bounds: tuple[float, float]) -> tuple[float, float]:
+        """
+        :param point: The point in viewport pixels
+        :param bounds: The (width, height) of the viewport
+        :return: The nearest point inside the viewport
+        """
+        return min(max(point[0], 0), int(bounds[0]) - 1), min(max(point[1], 0), int(bounds[1]) - 1)
+
+    def path(self, start: tuple[float, float], end: tuple[float, float], target_size: float = 20,
+             bounds: tuple[float, float] | None = None) -> list[tuple[int, int, int]]:
+        """
+        :param start: The start point in viewport pixels
+        :param end: The end point in viewport pixels
+        :param target_size: The size of the target in pixels (smaller targets are approached more slowly)
+        :param bounds: The (width, height) of the viewport, which all points of the path are kept inside
+            (pointer moves outside the viewport fail). None for no limits
+        :return: The points of the path as (x, y, duration in ms to reach the point from the previous one)
+        """
+        (x0, y0), (x3, y3) = start, end
+        dx, dy = x3 - x0, y3 - y0
+        distance = math.hypot(dx, dy)
+
+        duration = self.duration(distance, target_size)
+        steps = max(int(duration / self.step_interval), 2)
+        step_ms = max(int(duration * 1000 / steps), 1)
+
+        # Control points at about 1/3 and 2/3 of the way, bent along the normal of the straight line
+        bend_1 = self.random.gauss(0, self.curvature) * distance
+        bend_2 = self.random.gauss(0, self.curvature) * distance
+        nx, ny = (-dy / distance, dx / distance) if distance else (0, 0)
+
+        u1, u2 = self.random.uniform(0.2, 0.4), self.random.uniform(0.6, 0.8)
+        x1, y1 = x0 + dx * u1 + nx * bend_1, y0 + dy * u1 + ny * bend_1
+        x2, y2 = x0 + dx * u2 + nx * bend_2, y0 + dy * u2 + ny * bend_2
+
+        if bounds is not None:
+            # The curve stays inside the hull of its control points, only the jitter is clamped below
+            (x1, y1), (x2, y2) = self.clamp((x1, y1), bounds), self.clamp((x2, y2), bounds)
+        controls = ((x0, y0), (x1, y1), (x2, y2), (x3, y3))
+
+        if np is not None:
+            xs, ys = self._bezier_numpy(controls, steps)
+        else:
+            xs, ys = self._bezier_python(controls, steps)
+
+        # The last point is exact, such that the movement ends on the target
+        xs[-1], ys[-1] = round(x3), round(y3)
+
+        if bounds is not None:
+            return [(*map(round, self.clamp((x, y), bounds)), step_ms) for x, y in zip(xs, ys)]
+        return [(x, y, step_ms) for x, y in zip(xs, ys)]
+
+    def _bezier_numpy(self, controls: tuple[tuple[float, float], ...], steps: int) -> tuple[list[int], list[int]]:
+        rng = np.random.default_rng(self.random.getrandbits(64))
+
+        t = np.linspace(0, 1, steps + 1)[1:]
+        s = t ** 3 * (10 - 15 * t + 6 * t ** 2)
+        weights = np.stack(((1 - s) ** 3, 3 * (1 - s) ** 2 * s, 3 * (1 - s) * s ** 2, s ** 3), axis=1)
+
+        points = weights @ np.asarray(controls, dtype=np.float64)
+        points += rng.normal(0, self.jitter, points.shape) * np.sin(np.pi * s)[:, None]
+
+        rounded = np.rint(points).astype(np.int64)
+        return rounded[:, 0].tolist(), rounded[:, 1].tolist()
+
+    def _bezier_python(self, controls: tuple[tuple[float, float], ...], steps: int) -> tuple[list[int], list[int]]:
+        (x0, y0), (x1, y1), (x2, y2), (x3, y3) = controls
+        xs, ys = [], []
+
+        for i in range(1, steps + 1):
+            t = i / steps
+            s = t ** 3 * (10 - 15 * t + 6 * t ** 2)
+            w0, w1, w2, w3 = (1 - s) ** 3, 3 * (1 - s) ** 2 * s, 3 * (1 - s) * s ** 2, s ** 3
+            noise = math.sin(math.pi * s)
+
+            xs.append(round(w0 * x0 + w1 * x1 + w2 * x2 + w3 * x3 + self.random.gauss(0, self.jitter) * noise))
+            ys.append(round(w0 * y0 + w1 * y1 + w2 * y2 + w3 * y3 + self.random.gauss(0, self.jitter) * noise))
+
+        return xs, ys
+
+    def target_point(self, rect: tuple[float, float, float, float]) -> tuple[float, float]:
+        """
+        :param rect: The (left, top, width, height) of the target
+        :return: A random point inside the target, which is most likely near its center
+        """
+        left, top, width, height = rect
+
+        x = min(max(self.random.gauss(0.5, 0.15), 0.1), 0.9)
+        y = min(max(self.random.gauss(0.5, 0.15), 0.1), 0.9)
+        return left + width * x, top + height * y
+
+    def move_to(self, driver: RemoteWebDriver, element: WebElement, start: tuple[float, float] | None,
+                click: bool = False) -> tuple[int, int] | None:
+        """
+        :param driver: The driver to perform the actions with
+        :param element: The element to move to. It is scrolled into view first if necessary
+        :param start: The current mouse position in viewport pixels (None if unknown)
+        :param click: Whether to click (left button) at the end of the movement
+        :return: The new mouse position or None if the element has no size (nothing was performed then)
+        """
+        left, top, width, height, viewport_width, viewport_height = driver.execute_script(LOCATE_SCRIPT, element)
+
+        if width <= 0 or height <= 0:
+            return None
+
+        bounds = (viewport_width, viewport_height)
+        start = self.clamp(start if start is not None else (0, 0), bounds)
+        end = self.clamp(self.target_point((left, top, width, height)), bounds)
+
+        builder = ActionBuilder(driver)
+        pointer = builder.pointer_action
+
+        for x, y, duration in self.path(start, end, min(width, height), bounds):
+            pointer.source.create_pointer_move(duration=duration, x=x, y=y, origin="viewport")
+
+        if click:
+            pointer.pointer_down()
+            pointer.pause(self.random.uniform(*self.hold_range))
+            pointer.pointer_up()
+
+        builder.perform()
+        return round(end[0]), round(end[1])
@@ -0,0 +1,113 @@
+// arguments[0]: "extract" or "chunk"
+// extract: arguments[1]: "css" or "xpath", arguments[2]: The record selector, arguments[3]: The compiled fields,
+//     arguments[4]: The chunk size. Returns {token, total, rows} with the first chunk of rows
+// chunk: arguments[1]: The token, arguments[2]: The offset, arguments[3]: The chunk size. Returns the rows or null if
+//     the records are no longer stored (e.g. since the page navigated or reloaded)
+// All records are extracted at once and kept in the page until their last chunk was fetched.
+var store = window.__webDriverPyExtractions || (window.__webDriverPyExtractions = { next: 0, results: {} });
+
+function readAttribute(element, name) {
+    var lower = name.toLowerCase();
+
+    if (lower === "class" || lower === "classname") {
+        return element.getAttribute("class");
+    }
+    if (lower === "style") {
+        return element.getAttribute("style");
+    }
+
+    var property = element[name];
+
+    if (property !== undefined && property !== null && typeof property !== "object" && typeof property !== "function") {
+        if (typeof property === "boolean") {
+            return property ? "true" : null;
+        }
+        return String(property);
+    }
+    return element.getAttribute(name);
+}
+
+function select(root, kind, selector, all) {
+    if (kind === "self") {
+        return all ? [root] : root;
+    }
+    if (kind === "xpath") {
+        var snapshot = document.evaluate(selector, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        var nodes = [];
+
+        for (var i = 0; i < snapshot.snapshotLength; i++) {
+            if (snapshot.snapshotItem(i).nodeType === Node.ELEMENT_NODE) {
+                nodes.push(snapshot.snapshotItem(i));
+                if (!all) {
+                    break;
+                }
+            }
+        }
+        return all ? nodes : (nodes[0] || null);
+    }
+    return all ? Array.prototype.slice.call(root.querySelectorAll(selector)) : root.querySelector(selector);
+}
+
+function readValue(element, field) {
+    switch (field.value) {
+        case "text":
+            return (element.innerText !== undefined ? element.innerText : element.textContent).trim();
+        case "html":
+            return element.innerHTML;
+        case "attr":
+            return readAttribute(element, field.attribute);
+        case "attrs":
+            var attributes = {};
+            for (var i = 0; i < element.attributes.length; i++) {
+                attributes[element.attributes[i].name] = element.attributes[i].value;
+            }
+            return attributes;
+        case "record":
+            return record(element, field.fields);
+    }
+    return null;
+}
+
+function record(element, fields) {
+    var result = {};
+
+    for (var name in fields) {
+        var field = fields[name];
+        var selected = select(element, field.kind, field.selector, field.all);
+
+        if (field.all) {
+            result[name] = selected.map(function (child) { return readValue(child, field); });
+        } else {
+            result[name] = selected ? readValue(selected, field) : null;
+        }
+    }
+    return result;
+}
+
+if (arguments[0] === "extract") {
+    var fields = arguments[3];
+    var chunkSize = arguments[4];
+    var records = select(document, arguments[1], arguments[2], true).map(function (element) {
+        return record(element, fields);
+    });
+
+    if (records.length <= chunkSize) {
+        return { token: null, total: records.length, rows: records };
+    }
+
+    var token = String(store.next++);
+    store.results[token] = records;
+    return { token: token, total: records.length, rows: records.slice(0, chunkSize) };
+}
+
+var stored = store.results[arguments[1]];
+if (!stored) {
+    return null;
+}
+
+var end = arguments[2] + arguments[3];
+
+if (end >= stored.length) {
+    delete store.results[arguments[1]];
+}
+return stored.slice(arguments[2], end);
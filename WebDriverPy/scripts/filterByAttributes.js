@@ -0,0 +1,32 @@
+// arguments[0]: The candidate elements
+// arguments[1]: [attribute name, expected value] pairs, which all have to match
+// Returns the matching elements. Attributes are read like WebElement.get_attribute() (property first, then attribute)
+function readAttribute(element, name) {
+    var lower = name.toLowerCase();
+
+    if (lower === "class" || lower === "classname") {
+        return element.getAttribute("class");
+    }
+    if (lower === "style") {
+        return element.getAttribute("style");
+    }
+
+    var property = element[name];
+
+    if (property !== undefined && property !== null && typeof property !== "object" && typeof property !== "function") {
+        if (typeof property === "boolean") {
+            return property ? "true" : null;
+        }
+        return String(property);
+    }
+    return element.getAttribute(name);
+}
+
+var elements = arguments[0];
+var predicates = arguments[1];
+
+return elements.filter(function (element) {
+    return predicates.every(function (predicate) {
+        return readAttribute(element, predicate[0]) === predicate[1];
+    });
+});
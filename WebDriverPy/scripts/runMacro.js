@@ -0,0 +1,185 @@
+// arguments[0]: The steps to run in order, each one of:
+//     {op: "wait", kind, selector, condition: "present" | "clickable", timeout (ms)}
+//     {op: "click" | "submit", kind, selector}
+//     {op: "write", kind, selector, text}
+//     {op: "sleep", ms}
+//     (kind is "css" or "xpath")
+// Resolves with one {duration (ms), value, error} entry per step that ran. Running stops at the first failing step.
+// A clicking or submitting step should be the last one, as the page may unload afterward.
+var steps = arguments[0];
+var done = arguments[arguments.length - 1];
+var results = [];
+
+function locate(kind, selector) {
+    if (kind === "xpath") {
+        var snapshot = document.evaluate(selector, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+
+        for (var i = 0; i < snapshot.snapshotLength; i++) {
+            if (snapshot.snapshotItem(i).nodeType === Node.ELEMENT_NODE) {
+                return snapshot.snapshotItem(i);
+            }
+        }
+        return null;
+    }
+    return document.querySelector(selector);
+}
+
+function isClickable(element) {
+    if (element.matches(":disabled")) {
+        return false;
+    }
+    if (element.checkVisibility && !element.checkVisibility({ checkOpacity: true, checkVisibilityCSS: true })) {
+        return false;
+    }
+
+    var rect = element.getBoundingClientRect();
+    return rect.width > 0 && rect.height > 0;
+}
+
+function check(step) {
+    var element = locate(step.kind, step.selector);
+
+    if (element && step.condition === "clickable" && !isClickable(element)) {
+        return null;
+    }
+    return element;
+}
+
+function waitFor(step, resolve, reject) {
+    var element = check(step);
+
+    if (element) {
+        resolve(element);
+        return;
+    }
+
+    var finished = false;
+    var observer = null;
+    var interval = null;
+    var timer = null;
+
+    function finish(error, result) {
+        if (finished) {
+            return;
+        }
+        finished = true;
+
+        observer.disconnect();
+        clearInterval(interval);
+        clearTimeout(timer);
+
+        if (error) {
+            reject(error);
+        } else {
+            resolve(result);
+        }
+    }
+
+    function tick() {
+        try {
+            var found = check(step);
+
+            if (found) {
+                finish(null, found);
+            }
+        } catch (e) {
+            finish(e);
+        }
+    }
+
+    observer = new MutationObserver(tick);
+    observer.observe(document.documentElement || document, { childList: true, subtree: true, attributes: true });
+
+    interval = setInterval(tick, 100);
+    timer = setTimeout(function () {
+        finish(new Error("Timed out after " + step.timeout + "ms waiting for " + step.condition + " element (" +
+            step.kind + " = " + step.selector + ")"));
+    }, step.timeout);
+}
+
+function target(step) {
+    var element = locate(step.kind, step.selector);
+
+    if (!element) {
+        throw new Error("No such element (" + step.kind + " = " + step.selector + ")");
+    }
+    return element;
+}
+
+function write(element, text) {
+    element.focus();
+
+    if (element.isContentEditable) {
+        document.execCommand("insertText", false, text);
+        return;
+    }
+
+    // The native setter keeps frameworks tracking the value (e.g. React) in sync
+    var prototype = element instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+    var setter = Object.getOwnPropertyDescriptor(prototype, "value").set;
+
+    setter.call(element, element.value + text);
+    element.dispatchEvent(new Event("input", { bubbles: true }));
+    element.dispatchEvent(new Event("change", { bubbles: true }));
+}
+
+function submit(element) {
+    var form = element.form || element.closest("form") || (element.tagName === "FORM" ? element : null);
+
+    if (!form) {
+        throw new Error("The element is not inside a form");
+    }
+    if (form.requestSubmit) {
+        form.requestSubmit();
+    } else {
+        form.submit();
+    }
+}
+
+function run(i) {
+    if (i >= steps.length) {
+        done(results);
+        return;
+    }
+
+    var step = steps[i];
+    var start = performance.now();
+
+    function succeed(value) {
+        results.push({ duration: performance.now() - start, value: value === undefined ? null : value, error: null });
+        run(i + 1);
+    }
+
+    function fail(error) {
+        results.push({ duration: performance.now() - start, value: null, error: String(error && error.message || error) });
+        done(results);
+    }
+
+    try {
+        switch (step.op) {
+            case "wait":
+                waitFor(step, succeed, fail);
+                return;
+            case "sleep":
+                setTimeout(succeed, step.ms);
+                return;
+            case "click":
+                target(step).click();
+                break;
+            case "write":
+                write(target(step), step.text);
+                break;
+            case "submit":
+                submit(target(step));
+                break;
+            default:
+                throw new Error("Unknown macro step: " + step.op);
+        }
+    } catch (e) {
+        fail(e);
+        return;
+    }
+    succeed(null);
+}
+
+run(0);
@@ -0,0 +1,111 @@
+// arguments[0]: The conditions as [kind, selector, condition] arrays:
+//     kind: "css", "xpath" or "script" (selector is then the body of a function returning a truthy value once met)
+//     condition: "present" (first element), "clickable" (first element, if displayed and enabled) or "all" (all elements)
+// arguments[1]: The timeout in milliseconds
+// Resolves with [index, value] of the first condition holding (earlier conditions win ties), null on timeout
+// or {error: message} on errors. The conditions are checked together on every DOM mutation and additionally
+// every 100ms for changes, which are no mutations (e.g. finished CSS transitions).
+var conditions = arguments[0];
+var timeout = arguments[1];
+var done = arguments[arguments.length - 1];
+
+var scripts = conditions.map(function (c) { return c[0] === "script" ? new Function(c[1]) : null; });
+
+function locate(kind, selector) {
+    if (kind === "xpath") {
+        var snapshot = document.evaluate(selector, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        var nodes = [];
+
+        for (var i = 0; i < snapshot.snapshotLength; i++) {
+            if (snapshot.snapshotItem(i).nodeType === Node.ELEMENT_NODE) {
+                nodes.push(snapshot.snapshotItem(i));
+            }
+        }
+        return nodes;
+    }
+    return Array.prototype.slice.call(document.querySelectorAll(selector));
+}
+
+function isClickable(element) {
+    if (element.matches(":disabled")) {
+        return false;
+    }
+    if (element.checkVisibility && !element.checkVisibility({ checkOpacity: true, checkVisibilityCSS: true })) {
+        return false;
+    }
+
+    var rect = element.getBoundingClientRect();
+    return rect.width > 0 && rect.height > 0;
+}
+
+function checkCondition(i) {
+    if (scripts[i]) {
+        return scripts[i]();
+    }
+
+    var elements = locate(conditions[i][0], conditions[i][1]);
+    var condition = conditions[i][2];
+
+    if (condition === "all") {
+        return elements.length ? elements : null;
+    }
+    if (!elements.length) {
+        return null;
+    }
+    if (condition === "clickable") {
+        return isClickable(elements[0]) ? elements[0] : null;
+    }
+    return elements[0];
+}
+
+function check() {
+    for (var i = 0; i < conditions.length; i++) {
+        var value = checkCondition(i);
+
+        if (value) {
+            return [i, value];
+        }
+    }
+    return null;
+}
+
+var finished = false;
+var observer = null;
+var interval = null;
+var timer = null;
+
+function finish(result) {
+    if (finished) {
+        return;
+    }
+    finished = true;
+
+    if (observer) {
+        observer.disconnect();
+    }
+    clearInterval(interval);
+    clearTimeout(timer);
+    done(result);
+}
+
+function tick() {
+    try {
+        var result = check();
+
+        if (result) {
+            finish(result);
+        }
+    } catch (e) {
+        finish({ error: String(e) });
+    }
+}
+
+tick();
+
+if (!finished) {
+    observer = new MutationObserver(tick);
+    observer.observe(document.documentElement || document, { childList: true, subtree: true, attributes: true });
+
+    interval = setInterval(tick, 100);
+    timer = setTimeout(function () { finish(null); }, timeout);
+}
@@ -1,6 +1,15 @@
 from .main import fetch_free_proxies, load_proxies_list
 from .proxy import Proxy, FetchedProxy, RankedProxies
-from .utils import test_proxy, test_url_speed, load_test_urls, save_test_urls, timed, timed_print, ignores_request_exception, ignores_timeout
+from .gateway import ProxyGateway
+from .health import ProxyScoreboard, ProxyHealth
+from .store import ProxyStore
+from .sources import (ProxySource, ProxyScrapeSource, TextListSource, proxy_sources, register_source, unregister_source,
+                      fetch_from_sources)
+from .refresher import ProxyRefresher
+from .pac import ProxyRoutes, pac_proxy_string, DIRECT
+from .utils import (test_proxy, test_url_speed, load_test_urls, save_test_urls, timed, timed_print, ignores_request_exception,
+                    ignores_timeout, measure_latency, LatencyMeasurement, UrlBaseline, TestUrlBaseline, get_test_url_baseline,
+                    load_test_url_baselines)
 from .exceptions import *
 
 __all__ = [
@@ -9,10 +18,31 @@ __all__ = [
     "Proxy",
     "FetchedProxy",
     "RankedProxies",
+    "ProxyGateway",
+    "ProxyScoreboard",
+    "ProxyHealth",
+    "ProxyStore",
+    "ProxySource",
+    "ProxyScrapeSource",
+    "TextListSource",
+    "proxy_sources",
+    "register_source",
+    "unregister_source",
+    "fetch_from_sources",
+    "ProxyRefresher",
+    "ProxyRoutes",
+    "pac_proxy_string",
+    "DIRECT",
     "test_proxy",
     "test_url_speed",
+    "measure_latency",
+    "LatencyMeasurement",
     "save_test_urls",
     "load_test_urls",
+    "load_test_url_baselines",
+    "get_test_url_baseline",
+    "UrlBaseline",
+    "TestUrlBaseline",
     "timed",
     "timed_print",
     "ignores_timeout",
@@ -22,6 +52,7 @@ __all__ = [
     "InvalidProxyFetchingResponse",
     "InvalidResponseFormat",
     "InvalidJSONResponse",
-    "InvalidSavedJSONFormat"
+    "InvalidSavedJSONFormat",
+    "ProxyGatewayException"
 ]
 
@@ -21,3 +21,7 @@ class ProxyTestingException(ProxyException):
 class InvalidSavedJSONFormat(ProxyException):
     pass
 
+
+
+class ProxyGatewayException(ProxyException):
+    pass
@@ -0,0 +1,518 @@
+import asyncio
+import base64
+import ipaddress
+import time
+
+from threading import Thread, Event, Lock
+from typing import Self, Callable, Any
+
+from .proxy import Proxy, ProtectedProxy, RankedProxies, proxy_key
+from .exceptions import ProxyGatewayException
+
+
+HEAD_LIMIT = 64 * 1024
+
+
+class UpstreamError(ProxyGatewayException):
+    pass
+
+
+class UpstreamPool:
+    """
+    Keeps warm TCP connections to upstream proxies, such that opening a tunnel does not have to wait for the TCP
+    handshake with the upstream proxy. Only fresh, unused connections are pooled, since a connection becomes a
+    tunnel to a single target once it was used.
+    """
+
+    def __init__(self, size: int = 2, idle_timeout: float = 20, connect_timeout: float = 8):
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.connect_timeout = connect_timeout
+
+        self._idle: dict[str, list[tuple[asyncio.StreamReader, asyncio.StreamWriter, float]]] = {}
+        self._refilling: set[str] = set()
+
+    async def _open(self, proxy: Proxy) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        host, port = proxy.ip.rsplit(":", maxsplit=1)
+        return await asyncio.wait_for(asyncio.open_connection(host, int(port), limit=HEAD_LIMIT), self.connect_timeout)
+
+    async def acquire(self, proxy: Proxy) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        idle = self._idle.get(proxy_key(proxy), [])
+        now = time.monotonic()
+
+        while idle:
+            reader, writer, opened = idle.pop()
+
+            if now - opened < self.idle_timeout and not reader.at_eof() and not writer.is_closing():
+                self._schedule_refill(proxy)
+                return reader, writer
+            writer.close()
+
+        connection = await self._open(proxy)
+        self._schedule_refill(proxy)
+        return connection
+
+    def _schedule_refill(self, proxy: Proxy) -> None:
+        key = proxy_key(proxy)
+
+        if self.size > 0 and key not in self._refilling and len(self._idle.get(key, [])) < self.size:
+            self._refilling.add(key)
+            asyncio.get_running_loop().create_task(self._refill(proxy))
+
+    async def _refill(self, proxy: Proxy) -> None:
+        key = proxy_key(proxy)
+
+        try:
+            idle = self._idle.setdefault(key, [])
+            while len(idle) < self.size:
+                reader, writer = await self._open(proxy)
+                idle.append((reader, writer, time.monotonic()))
+        except (OSError, asyncio.TimeoutError):
+            pass
+        finally:
+            self._refilling.discard(key)
+
+    def discard(self, proxy: Proxy) -> None:
+        for _, writer, _ in self._idle.pop(proxy_key(proxy), []):
+            writer.close()
+
+    def clear(self) -> None:
+        for idle in self._idle.values():
+            for _, writer, _ in idle:
+                writer.close()
+        self._idle.clear()
+
+
+class ProxyGateway:
+    """
+    A local forwarding proxy running an asyncio event loop in a background thread.
+
+    The browser connects to the gateway on localhost (either as HTTP proxy, e.g. "--proxy-server=http://127.0.0.1:{port}",
+    or as SOCKS5 proxy) and the gateway forwards every connection through one of the given upstream proxies.
+    Supported upstream protocols are http(s) (via CONNECT), socks4 and socks5.
+    Credentials of ProtectedProxy upstreams are injected by the gateway, so the browser never needs them.
+
+    Switching the upstream only affects the gateway, so rotating proxies needs no browser restart.
+    If connecting through an upstream fails, the next upstream is tried (at most max_attempts upstreams per connection).
+    """
+
+    def __init__(self,
+                 upstreams: list[Proxy] | RankedProxies,
+                 host: str = "127.0.0.1",
+                 port: int = 0,
+                 per_connection: bool = False,
+                 max_attempts: int = 3,
+                 connect_timeout: float = 8,
+                 pool_size: int = 2,
+                 pool_idle_timeout: float = 20,
+                 on_failure: Callable[[Proxy], Any] | None = None):
+        """
+        :param upstreams: The upstream proxies to forward connections through
+        :param host: The local host to bind to
+        :param port: The local port to bind to. 0 picks a free port (see the port attribute after start())
+        :param per_connection: Whether to pick the next upstream for every new connection (round-robin).
+            If False, the current upstream is used until rotate() or use() is called or it fails
+        :param max_attempts: How many upstreams to try per connection before giving up
+        :param connect_timeout: The timeout in seconds for connecting and handshaking with an upstream
+        :param pool_size: The number of warm connections kept per upstream. 0 disables pooling
+        :param pool_idle_timeout: The time in seconds after which warm connections are considered stale
+        :param on_failure: Called (in the gateway thread) with every upstream, which failed to connect
+            (e.g. ProxyScoreboard.report_failure)
+        """
+        self.host = host
+        self.port = port
+        self.per_connection = per_connection
+        self.max_attempts = max_attempts
+        self.connect_timeout = connect_timeout
+        self.on_failure = on_failure
+
+        self._pool = UpstreamPool(pool_size, pool_idle_timeout, connect_timeout)
+        self._lock = Lock()
+        self._upstreams: list[Proxy] = []
+        self._index = 0
+        self.set_upstreams(upstreams)
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._server: asyncio.Server | None = None
+        self._thread: Thread | None = None
+        self._stopped: asyncio.Event | None = None
+        # The tasks handling the established connections
+        self._handlers: set[asyncio.Task] = set()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def current(self) -> Proxy:
+        with self._lock:
+            return self._upstreams[self._index]
+
+    @property
+    def upstreams(self) -> list[Proxy]:
+        return list(self._upstreams)
+
+    def set_upstreams(self, upstreams: list[Proxy] | RankedProxies) -> Self:
+        """
+        :param upstreams: The new upstream proxies. Connections already established keep their upstream
+        :return: The gateway itself
+        """
+        if isinstance(upstreams, RankedProxies):
+            upstreams = upstreams.get_n_best(upstreams.count)
+
+        if not upstreams:
+            raise ProxyGatewayException("The gateway requires at least one upstream proxy!")
+
+        with self._lock:
+            self._upstreams = list(upstreams)
+            self._index = 0
+        return self
+
+    def rotate(self) -> Proxy:
+        """
+        :return: Switches to the next upstream and returns it
+        """
+        with self._lock:
+            self._index = (self._index + 1) % len(self._upstreams)
+            return self._upstreams[self._index]
+
+    def use(self, proxy: Proxy) -> Self:
+        """
+        :param proxy: The upstream to use for new connections. It is added to the upstreams if it is unknown
+        :return: The gateway itself
+        """
+        with self._lock:
+            keys = [proxy_key(p) for p in self._upstreams]
+
+            if proxy_key(proxy) in keys:
+                self._index = keys.index(proxy_key(proxy))
+            else:
+                self._upstreams.append(proxy)
+                self._index = len(self._upstreams) - 1
+        return self
+
+    def _candidates(self) -> list[Proxy]:
+        with self._lock:
+            n = len(self._upstreams)
+            start = self._index
+
+            if self.per_connection:
+                self._index = (self._index + 1) % n
+
+            return [self._upstreams[(start + i) % n] for i in range(min(self.max_attempts, n))]
+
+    def _report_failure(self, proxy: Proxy) -> None:
+        self._pool.discard(proxy)
+
+        if self.on_failure is not None:
+            self.on_failure(proxy)
+
+        if self.per_connection:
+            return
+
+        # Sticky mode: Fail over to the next upstream for all further connections
+        with self._lock:
+            if proxy_key(self._upstreams[self._index]) == proxy_key(proxy):
+                self._index = (self._index + 1) % len(self._upstreams)
+
+    def start(self) -> Self:
+        """
+        :return: Starts the gateway in a background thread and returns once it accepts connections
+        """
+        if self.running:
+            return self
+
+        started = Event()
+        errors = []
+
+        def run() -> None:
+            self._loop = asyncio.new_event_loop()
+            try:
+                self._loop.run_until_complete(self._serve(started))
+            except BaseException as e:
+                errors.append(e)
+                started.set()
+            finally:
+                self._loop.close()
+
+        self._thread = Thread(target=run, daemon=True, name="ProxyGateway")
+        self._thread.start()
+        started.wait()
+
+        if errors:
+            raise ProxyGatewayException(f"Failed to start the proxy gateway: {errors[0]}")
+        return self
+
+    async def _serve(self, started: Event) -> None:
+        self._stopped = asyncio.Event()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=HEAD_LIMIT)
+        self.port = self._server.sockets[0].getsockname()[1]
+        started.set()
+
+        async with self._server:
+            await self._stopped.wait()
+            self._server.close()
+
+            # Closes the client and upstream connections of every handler
+            handlers = list(self._handlers)
+            for handler in handlers:
+                handler.cancel()
+            await asyncio.gather(*handlers, return_exceptions=True)
+
+        self._pool.clear()
+
+    def stop(self) -> None:
+        """
+        Stops the gateway. Established connections are closed.
+        """
+        if not self.running:
+            return
+
+        self._loop.call_soon_threadsafe(self._stopped.set)
+        self._thread.join()
+        self._thread = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        up_writer = None
+
+        try:
+            first = await reader.readexactly(1)
+
+            if first == b"\x05":
+                upstream = await self._handle_socks5(reader, writer)
+            else:
+                upstream = await self._handle_http(first, reader, writer)
+
+            if upstream is not None:
+                up_reader, up_writer = upstream
+                await asyncio.gather(self._pipe(reader, up_writer), self._pipe(up_reader, writer))
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            self._handlers.discard(task)
+            writer.close()
+
+            if up_writer is not None:
+                up_writer.close()
+
+    async def _handle_http(self, first: bytes, reader: asyncio.StreamReader,
+                           writer: asyncio.StreamWriter) -> tuple[asyncio.StreamReader, asyncio.StreamWriter] | None:
+        head = first + await reader.readuntil(b"\r\n\r\n")
+        request_line, *header_lines = head.decode("latin-1").split("\r\n")[:-2]
+        method, target, version = request_line.split(" ", maxsplit=2)
+
+        if method.upper() == "CONNECT":
+            host, port = target.rsplit(":", maxsplit=1)
+            upstream = await self._connect(host.strip("[]"), int(port))
+
+            if upstream is None:
+                writer.write(b"HTTP/1.1 502 Bad Gateway\r\nContent-Length: 0\r\n\r\n")
+                await writer.drain()
+                return None
+
+            writer.write(b"HTTP/1.1 200 Connection Established\r\n\r\n")
+            await writer.drain()
+            return upstream
+
+        if "://" not in target:
+            writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n")
+            await writer.drain()
+            return None
+
+        # Plain HTTP request in absolute-form: Forward a single request, then close the connection
+        authority, _, path = target.split("://", maxsplit=1)[1].partition("/")
+        host, _, port = authority.rpartition(":") if authority.rsplit(":", maxsplit=1)[-1].isdigit() else (authority, "", "80")
+
+        headers = [line for line in header_lines
+                   if line.split(":", maxsplit=1)[0].strip().lower() not in ("proxy-connection", "proxy-authorization", "connection")]
+        headers.append("Connection: close")
+
+        upstream = await self._connect(host.strip("[]"), int(port), http_forward=True)
+
+        if upstream is None:
+            writer.write(b"HTTP/1.1 502 Bad Gateway\r\nContent-Length: 0\r\n\r\n")
+            await writer.drain()
+            return None
+
+        up_reader, up_writer, proxy = upstream
+
+        if proxy is not None:
+            # HTTP upstream: Keep the absolute-form and authenticate with the upstream
+            if isinstance(proxy, ProtectedProxy):
+                headers.append(f"Proxy-Authorization: {self._basic_auth(proxy)}")
+            request_line = f"{method} {target} {version}"
+        else:
+            request_line = f"{method} /{path} {version}"
+
+        up_writer.write(("\r\n".join([request_line, *headers]) + "\r\n\r\n").encode("latin-1"))
+        await up_writer.drain()
+        return up_reader, up_writer
+
+    async def _handle_socks5(self, reader: asyncio.StreamReader,
+                             writer: asyncio.StreamWriter) -> tuple[asyncio.StreamReader, asyncio.StreamWriter] | None:
+        n_methods = (await reader.readexactly(1))[0]
+        await reader.readexactly(n_methods)
+
+        # No authentication required for local clients
+        writer.write(b"\x05\x00")
+        await writer.drain()
+
+        _, command, _, address_type = await reader.readexactly(4)
+        host = await self._read_socks_address(reader, address_type)
+        port = int.from_bytes(await reader.readexactly(2), "big")
+
+        upstream = await self._connect(host, port) if command == 1 else None
+
+        if upstream is None:
+            # General failure / command not supported
+            writer.write(b"\x05" + (b"\x01" if command == 1 else b"\x07") + b"\x00\x01" + bytes(6))
+            await writer.drain()
+            return None
+
+        writer.write(b"\x05\x00\x00\x01" + bytes(6))
+        await writer.drain()
+        return upstream
+
+    @staticmethod
+    async def _read_socks_address(reader: asyncio.StreamReader, address_type: int) -> str:
+        match address_type:
+            case 1:
+                return str(ipaddress.IPv4Address(await reader.readexactly(4)))
+            case 3:
+                return (await reader.readexactly((await reader.readexactly(1))[0])).decode("idna")
+            case 4:
+                return str(ipaddress.IPv6Address(await reader.readexactly(16)))
+            case _:
+                raise ValueError(f"Invalid SOCKS address type: {address_type}")
+
+    async def _connect(self, host: str, port: int, http_forward: bool = False):
+        """
+        Tries the candidate upstreams in order until a tunnel to host:port is established.
+
+        :param http_forward: Whether the connection is used to forward a plain HTTP request.
+            HTTP upstreams are then not asked to CONNECT, but receive the request in absolute-form.
+            The upstream proxy is additionally returned (None if the connection is a tunnel).
+        :return: The reader and writer of the established connection or None if all candidates failed
+        """
+        for proxy in self._candidates():
+            try:
+                reader, writer = await self._pool.acquire(proxy)
+                scheme = proxy.protocol.lower()
+
+                try:
+                    if scheme.startswith("socks5"):
+                        await asyncio.wait_for(self._socks5_handshake(reader, writer, proxy, host, port), self.connect_timeout)
+                    elif scheme.startswith("socks4"):
+                        await asyncio.wait_for(self._socks4_handshake(reader, writer, proxy, host, port), self.connect_timeout)
+                    elif http_forward:
+                        return reader, writer, proxy
+                    else:
+                        await asyncio.wait_for(self._http_connect(reader, writer, proxy, host, port), self.connect_timeout)
+                except BaseException:
+                    writer.close()
+                    raise
+
+                return (reader, writer, None) if http_forward else (reader, writer)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                    UpstreamError):
+                self._report_failure(proxy)
+
+        return None
+
+    @staticmethod
+    def _basic_auth(proxy: ProtectedProxy) -> str:
+        return "Basic " + base64.b64encode(f"{proxy.username}:{proxy.password}".encode()).decode()
+
+    async def _http_connect(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                            proxy: Proxy, host: str, port: int) -> None:
+        authority = f"[{host}]:{port}" if ":" in host else f"{host}:{port}"
+        request = f"CONNECT {authority} HTTP/1.1\r\nHost: {authority}\r\n"
+
+        if isinstance(proxy, ProtectedProxy):
+            request += f"Proxy-Authorization: {self._basic_auth(proxy)}\r\n"
+
+        writer.write((request + "\r\n").encode("latin-1"))
+        await writer.drain()
+
+        status_line = (await reader.readuntil(b"\r\n\r\n")).split(b"\r\n", maxsplit=1)[0].decode("latin-1")
+        status = status_line.split(" ", maxsplit=2)
+
+        if len(status) < 2 or status[1] != "200":
+            raise UpstreamError(f"Upstream {proxy.ip} refused CONNECT: {status_line}")
+
+    async def _socks5_handshake(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                                proxy: Proxy, host: str, port: int) -> None:
+        protected = isinstance(proxy, ProtectedProxy)
+
+        writer.write(b"\x05\x02\x00\x02" if protected else b"\x05\x01\x00")
+        await writer.drain()
+
+        version, method = await reader.readexactly(2)
+
+        if method == 0x02 and protected:
+            username, password = proxy.username.encode(), proxy.password.encode()
+            writer.write(b"\x01" + bytes([len(username)]) + username + bytes([len(password)]) + password)
+            await writer.drain()
+
+            if (await reader.readexactly(2))[1] != 0x00:
+                raise UpstreamError(f"Upstream {proxy.ip} rejected the credentials")
+        elif version != 0x05 or method != 0x00:
+            raise UpstreamError(f"Upstream {proxy.ip} requires an unsupported authentication method")
+
+        writer.write(b"\x05\x01\x00" + self._socks5_address(host) + port.to_bytes(2, "big"))
+        await writer.drain()
+
+        _, reply, _, address_type = await reader.readexactly(4)
+        if reply != 0x00:
+            raise UpstreamError(f"Upstream {proxy.ip} failed to connect to {host}:{port} (SOCKS5 reply {reply})")
+
+        # Skip the bound address
+        try:
+            await self._read_socks_address(reader, address_type)
+        except ValueError as e:
+            raise UpstreamError(f"Upstream {proxy.ip} sent an invalid SOCKS5 reply: {e}") from e
+        await reader.readexactly(2)
+
+    @staticmethod
+    def _socks5_address(host: str) -> bytes:
+        try:
+            address = ipaddress.ip_address(host)
+        except ValueError:
+            encoded = host.encode("idna")
+            return b"\x03" + bytes([len(encoded)]) + encoded
+
+        return (b"\x01" if address.version == 4 else b"\x04") + address.packed
+
+    @staticmethod
+    async def _socks4_handshake(reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                                proxy: Proxy, host: str, port: int) -> None:
+        user_id = proxy.username.encode() if isinstance(proxy, ProtectedProxy) else b""
+
+        try:
+            request = b"\x04\x01" + port.to_bytes(2, "big") + ipaddress.IPv4Address(host).packed + user_id + b"\x00"
+        except ValueError:
+            # SOCKS4a: Let the upstream resolve the host name
+            request = b"\x04\x01" + port.to_bytes(2, "big") + b"\x00\x00\x00\x01" + user_id + b"\x00" + host.encode("idna") + b"\x00"
+
+        writer.write(request)
+        await writer.drain()
+
+        if (await reader.readexactly(8))[1] != 0x5A:
+            raise UpstreamError(f"Upstream {proxy.ip} failed to connect to {host}:{port} (SOCKS4)")
+
+    @staticmethod
+    async def _pipe(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while data := await reader.read(64 * 1024):
+                writer.write(data)
+                await writer.drain()
+        except OSError:
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,309 @@
+import time
+
+from dataclasses import dataclass
+from heapq import heappush, heappop, heapify
+from itertools import count
+from threading import Lock
+from typing import Iterable
+
+from .proxy import Proxy, RankedProxies, proxy_key
+
+
+@dataclass(slots=True)
+class ProxyHealth:
+    proxy: Proxy
+    ewma_latency: float | None = None
+    """Exponentially weighted moving average of the measured latencies in seconds (None if never measured)"""
+    successes: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    last_seen: float | None = None
+    """Timestamp (time.time()) of the last success"""
+    last_used: int = 0
+    """Selection counter value of the last time the proxy was selected (lower means longer ago)"""
+    demotions: int = 0
+    demoted_until: float = 0
+    """Monotonic timestamp until which the proxy is not selected (unless no other proxy is available)"""
+
+    @property
+    def failure_rate(self) -> float:
+        total = self.successes + self.failures
+        return self.failures / total if total else 0
+
+    @property
+    def demoted(self) -> bool:
+        return self.demoted_until > time.monotonic()
+
+
+class ProxyScoreboard:
+    """
+    Tracks the health of proxies from real usage and selects the next proxy to use in O(log n).
+
+    Every proxy has a score based on its EWMA latency and its failure rate (lower is better).
+    Scores are grouped into buckets of score_resolution seconds. next() picks a proxy from the best bucket and
+    rotates through proxies of the same bucket in least recently used order. Proxies never measured are tried first.
+
+    A proxy failing demote_after times in a row is demoted: It is not selected for demotion_time seconds
+    (doubled for every further demotion), unless all other proxies are demoted as well.
+
+    Reports about proxies, which are not tracked (anymore, e.g. after replace()), are ignored.
+    """
+
+    def __init__(self,
+                 proxies: Iterable[Proxy] | RankedProxies = (),
+                 alpha: float = 0.3,
+                 failure_penalty: float = 4.0,
+                 demote_after: int = 3,
+                 demotion_time: float = 60,
+                 score_resolution: float = 0.25):
+        """
+        :param proxies: The initial proxies. Earlier proxies are selected first while no measurements are available
+        :param alpha: The weight of new latency measurements in the EWMA
+        :param failure_penalty: The score penalty per consecutive failure in seconds. The latency is additionally
+            multiplied by (1 + failure_penalty * failure_rate)
+        :param demote_after: The number of consecutive failures after which a proxy is demoted
+        :param demotion_time: The time in seconds a proxy is demoted for the first time
+        :param score_resolution: The size of the score buckets in seconds
+        """
+        self.alpha = alpha
+        self.failure_penalty = failure_penalty
+        self.demote_after = demote_after
+        self.demotion_time = demotion_time
+        self.score_resolution = score_resolution
+
+        self._health: dict[str, ProxyHealth] = {}
+        self._heap: list[tuple[int, int, int, str]] = []
+        self._demoted: list[tuple[float, int, str]] = []
+        self._versions: dict[str, int] = {}
+        self._seq = count()
+        self._clock = count(1)
+        self._lock = Lock()
+
+        if isinstance(proxies, RankedProxies):
+            proxies = proxies.get_n_best(proxies.count)
+
+        proxies = list(proxies)
+        for i, proxy in enumerate(proxies):
+            self.add(proxy, _last_used=i - len(proxies))
+
+    def __len__(self) -> int:
+        return len(self._health)
+
+    def __contains__(self, proxy: Proxy) -> bool:
+        return proxy_key(proxy) in self._health
+
+    def score(self, health: ProxyHealth) -> float:
+        """
+        :return: The score of the proxy (lower is better)
+        """
+        latency = health.ewma_latency if health.ewma_latency is not None else 0
+        return latency * (1 + self.failure_penalty * health.failure_rate) + self.failure_penalty * health.consecutive_failures
+
+    def _push(self, health: ProxyHealth) -> None:
+        key = proxy_key(health.proxy)
+        version = next(self._seq)
+        self._versions[key] = version
+
+        if health.demoted:
+            heappush(self._demoted, (health.demoted_until, version, key))
+        else:
+            heappush(self._heap, (int(self.score(health) / self.score_resolution), health.last_used, version, key))
+
+        if len(self._heap) + len(self._demoted) > 2 * len(self._versions) + 32:
+            self._compact()
+
+    def _compact(self) -> None:
+        # Outdated entries are otherwise only dropped once they reach the top of their heap
+        for heap in (self._heap, self._demoted):
+            heap[:] = [entry for entry in heap if self._versions.get(entry[-1]) == entry[-2]]
+            heapify(heap)
+
+    def _release_demoted(self) -> None:
+        now = time.monotonic()
+
+        while self._demoted and self._demoted[0][0] <= now:
+            _, version, key = heappop(self._demoted)
+
+            if self._versions.get(key) == version:
+                self._push(self._health[key])
+
+    def add(self, proxy: Proxy, _last_used: int = 0) -> ProxyHealth:
+        """
+        :param proxy: The proxy to track. Already tracked proxies are not reset
+        :return: The health of the proxy
+        """
+        with self._lock:
+            return self._add(proxy, _last_used)
+
+    def _add(self, proxy: Proxy, last_used: int = 0) -> ProxyHealth:
+        key = proxy_key(proxy)
+
+        if key not in self._health:
+            self._health[key] = ProxyHealth(proxy, last_used=last_used)
+            self._push(self._health[key])
+
+        return self._health[key]
+
+    def remove(self, proxy: Proxy) -> None:
+        with self._lock:
+            key = proxy_key(proxy)
+            self._health.pop(key, None)
+
+            # Invalidates all heap entries of the proxy
+            self._versions.pop(key, None)
+
+    def replace(self, proxies: Iterable[Proxy] | RankedProxies) -> None:
+        """
+        Atomically replaces the tracked proxies. Proxies tracked before keep their health.
+
+        :param proxies: The new proxies. New proxies are selected in the given order while no measurements are available
+        """
+        if isinstance(proxies, RankedProxies):
+            proxies = proxies.get_n_best(proxies.count)
+
+        proxies = list(proxies)
+        keys = {proxy_key(proxy) for proxy in proxies}
+
+        with self._lock:
+            for key in [key for key in self._health if key not in keys]:
+                del self._health[key]
+                self._versions.pop(key, None)
+
+            for i, proxy in enumerate(proxies):
+                self._add(proxy, i - len(proxies))
+
+    def health(self, proxy: Proxy) -> ProxyHealth | None:
+        return self._health.get(proxy_key(proxy))
+
+    def report_success(self, proxy: Proxy, latency: float) -> None:
+        """
+        :param proxy: The proxy, which was used successfully. Ignored if it is not tracked
+        :param latency: The measured latency in seconds
+        """
+        with self._lock:
+            health = self._health.get(proxy_key(proxy))
+            if health is None:
+                return
+
+            health.ewma_latency = latency if health.ewma_latency is None \
+                else self.alpha * latency + (1 - self.alpha) * health.ewma_latency
+            health.successes += 1
+            health.consecutive_failures = 0
+            health.last_seen = time.time()
+
+            self._push(health)
+
+    def report_failure(self, proxy: Proxy) -> None:
+        """
+        :param proxy: The proxy, which failed. It is demoted after demote_after consecutive failures.
+            Ignored if it is not tracked
+        """
+        with self._lock:
+            health = self._health.get(proxy_key(proxy))
+            if health is None:
+                return
+
+            health.failures += 1
+            health.consecutive_failures += 1
+
+            if health.consecutive_failures >= self.demote_after:
+                health.demotions += 1
+                health.demoted_until = time.monotonic() + self.demotion_time * 2 ** (health.demotions - 1)
+                health.consecutive_failures = 0
+
+            self._push(health)
+
+    def demote(self, proxy: Proxy) -> None:
+        """
+        :param proxy: The proxy to demote immediately (e.g. after a definitive failure), regardless of demote_after.
+            Ignored if it is not tracked
+        """
+        with self._lock:
+            health = self._health.get(proxy_key(proxy))
+            if health is None:
+                return
+
+            health.demotions += 1
+            health.demoted_until = time.monotonic() + self.demotion_time * 2 ** (health.demotions - 1)
+            health.consecutive_failures = 0
+
+            self._push(health)
+
+    def _select(self, exclude: Proxy | None) -> tuple[ProxyHealth, tuple[list, tuple] | None]:
+        """
+        :return: The best proxy except for exclude (unless it is the only one available) and the heap entry popped
+            for it (None if the excluded proxy was chosen)
+        """
+        if not self._health:
+            raise IndexError("The scoreboard does not contain any proxies!")
+
+        self._release_demoted()
+
+        excluded_key = proxy_key(exclude) if exclude is not None else None
+        skipped = []
+
+        for heap in (self._heap, self._demoted):
+            while heap:
+                entry = heappop(heap)
+                key = entry[-1]
+
+                if self._versions.get(key) != entry[-2]:
+                    # Outdated entry
+                    continue
+
+                if key == excluded_key:
+                    skipped.append((heap, entry))
+                    continue
+
+                for skipped_heap, skipped_entry in skipped:
+                    heappush(skipped_heap, skipped_entry)
+                return self._health[key], (heap, entry)
+
+        for heap, entry in skipped:
+            heappush(heap, entry)
+
+        return self._health[excluded_key], None
+
+    def next(self, exclude: Proxy | None = None) -> Proxy:
+        """
+        :param exclude: A proxy not to select (e.g. the currently used one), unless it is the only one available
+        :return: The proxy to use next. It is marked as used, such that equally good proxies are rotated through
+        """
+        with self._lock:
+            chosen, _ = self._select(exclude)
+            self._mark_used(chosen)
+
+            return chosen.proxy
+
+    def peek(self, exclude: Proxy | None = None) -> Proxy:
+        """
+        Like next(), but without marking the proxy as used (e.g. to prepare a standby proxy, which may never be used)
+        """
+        with self._lock:
+            chosen, popped = self._select(exclude)
+
+            if popped is not None:
+                heappush(*popped)
+
+            return chosen.proxy
+
+    def mark_used(self, proxy: Proxy) -> None:
+        """
+        :param proxy: A proxy taken without next() (e.g. a standby proxy from peek()), which is now used
+        """
+        with self._lock:
+            health = self._health.get(proxy_key(proxy))
+
+            if health is not None:
+                self._mark_used(health)
+
+    def _mark_used(self, health: ProxyHealth) -> None:
+        health.last_used = next(self._clock)
+        self._push(health)
+
+    def ranked(self) -> list[ProxyHealth]:
+        """
+        :return: The health of all proxies ordered by their score (demoted proxies last)
+        """
+        with self._lock:
+            return sorted(self._health.values(), key=lambda health: (health.demoted, self.score(health)))
@@ -1,39 +1,62 @@
-import requests
+from itertools import islice
 from os.path import exists
+from typing import Iterable
 
-from .proxy import FetchedProxy, RankedProxies
-from .utils import load_request_args, resolve_resource_path
-from .exceptions import InvalidJSONResponse, InvalidResponseFormat
+from .proxy import RankedProxies
+from .sources import ProxySource, ProxyScrapeSource, proxy_sources, fetch_from_sources
+from .store import ProxyStore
+from .utils import resolve_resource_path
 
 
 def fetch_free_proxies(source_url: str = "https://api.proxyscrape.com/v3/free-proxy-list/get",
                        alt_params: dict[str, str] = None, alt_headers: dict[str, str] = None, n: int = 20,
-                       ssl_support_required: bool = True):
-    params, headers = load_request_args(alt_headers=alt_headers, alt_params=alt_params, ssl_support_required=ssl_support_required)
-
-    try:
-        response: dict = requests.get(source_url, params=params, headers=headers).json()["proxies"]
-    except requests.JSONDecodeError:
-        raise InvalidResponseFormat("Response was not a valid JSON response")
-    except KeyError:
-        raise InvalidJSONResponse("JSON response didn't contain \"proxies\" key")
-
-    found_proxies: list[FetchedProxy] = sorted([
-        FetchedProxy(ip=proxy["proxy"], protocol=proxy["protocol"], average_timeout=proxy["average_timeout"])
-        for proxy in response
-        if proxy.get("proxy") and proxy.get("protocol") and proxy.get("alive") and proxy.get("average_timeout")
-    ], key=lambda proxy: proxy.average_timeout)
+                       ssl_support_required: bool = True, required: int | None = None, max_workers: int = 16,
+                       sources: Iterable[ProxySource | str] | None = None, saves: bool = True):
+    """
+    :param source_url: The URL of the registered "proxyscrape" source (see ProxyScrapeSource)
+    :param n: Number of fetched proxies to test
+    :param required: Stop testing once this many working proxies were found. None to test all n proxies
+    :param max_workers: The maximum number of proxies tested at the same time
+    :param sources: The sources (or names of registered sources) to fetch concurrently.
+        None for all registered sources (see register_source())
+    :param saves: Whether to save the ranking to the JSON file. Pass False if a ProxyStore is the store of record
+    :return: A RankedProxies object holding the working fetched proxies
+    """
+    if sources is None:
+        sources = [ProxyScrapeSource(source_url, alt_params=alt_params, alt_headers=alt_headers,
+                                     ssl_support_required=ssl_support_required) if name == ProxyScrapeSource.name
+                   else source for name, source in proxy_sources.items()]
 
-    return RankedProxies(found_proxies[:n])
+    return RankedProxies(islice(fetch_from_sources(sources), n), required=required, max_workers=max_workers,
+                         saves=saves)
 
 
-def load_proxies_list(force_load: bool = False, n: int = 20) -> RankedProxies:
+def load_proxies_list(force_load: bool = False, n: int = 20, required: int | None = None,
+                      store: ProxyStore | None = None, max_age: float = 12 * 60 * 60,
+                      min_success_rate: float = 0) -> RankedProxies:
     """
     :param n: Number of proxies to consider.
     :param force_load: Whether to force a new series of requests to fetch new data
+    :param required: Only takes effect when fetching new data: Stop testing once this many working proxies were found
+    :param store: Only takes effect when given: Load the proxies from the ProxyStore instead of the JSON file and
+        record newly fetched proxies in it
+    :param max_age: Only takes effect when a store is given: Only use proxies measured within the last max_age seconds.
+        New data is fetched if fewer than required (or any) such proxies are stored
+    :param min_success_rate: Only takes effect when a store is given: The minimum success rate of the stored proxies
     :return: A RankedProxies object holding all fetched/saved data ranked by quickest average response times
     """
-    return RankedProxies.load() if exists(resolve_resource_path("./saved_free_proxies.json")) and not force_load else fetch_free_proxies(n=n)
+    if store is not None:
+        if not force_load:
+            stored = store.to_ranked(n, min_success_rate=min_success_rate, max_age=max_age)
+
+            if stored.count >= (required or 1):
+                return stored
+
+        return store.add_ranked(fetch_free_proxies(n=n, required=required, saves=False)).to_ranked(
+            n, min_success_rate=min_success_rate, max_age=max_age)
+
+    return RankedProxies.load() if exists(resolve_resource_path("./saved_free_proxies.json")) and not force_load \
+        else fetch_free_proxies(n=n, required=required)
 
 
 def main():
@@ -0,0 +1,208 @@
+import json
+
+from typing import Self, Iterable
+
+from .proxy import Proxy, ProtectedProxy, RankedProxies
+from .exceptions import ProxyException
+
+
+DIRECT = "DIRECT"
+"""The group name routing hosts without any proxy"""
+
+PAC_TEMPLATE = """
+var GROUPS = %(groups)s;
+var RULES = %(rules)s;
+var DEFAULT_GROUP = %(default)s;
+var BYPASS = %(bypass)s;
+var STICKY = %(sticky)s;
+var FAILOVER = %(failover)d;
+var counter = 0;
+
+function hashKey(key) {
+  var hash = 0;
+  for (var i = 0; i < key.length; i++) {
+    hash = ((hash << 5) - hash + key.charCodeAt(i)) | 0;
+  }
+  return hash >>> 0;
+}
+
+function baseDomain(host) {
+  var parts = host.split(".");
+  return parts.length <= 2 ? host : parts.slice(-2).join(".");
+}
+
+function matches(host, pattern) {
+  if (pattern.indexOf("*") >= 0) {
+    return shExpMatch(host, pattern);
+  }
+  return host === pattern || dnsDomainIs(host, "." + pattern);
+}
+
+function FindProxyForURL(url, host) {
+  host = host.toLowerCase();
+
+  if (isPlainHostName(host)) {
+    return "DIRECT";
+  }
+  for (var i = 0; i < BYPASS.length; i++) {
+    if (matches(host, BYPASS[i])) {
+      return "DIRECT";
+    }
+  }
+
+  var group = DEFAULT_GROUP;
+  for (var j = 0; j < RULES.length; j++) {
+    if (matches(host, RULES[j][0])) {
+      group = RULES[j][1];
+      break;
+    }
+  }
+
+  var proxies = GROUPS[group];
+  if (!proxies) {
+    return "DIRECT";
+  }
+
+  var start = STICKY ? hashKey(baseDomain(host)) %% proxies.length : (counter++) %% proxies.length;
+  var chain = [];
+  for (var k = 0; k <= FAILOVER && k < proxies.length; k++) {
+    chain.push(proxies[(start + k) %% proxies.length]);
+  }
+  return chain.join("; ");
+}
+"""
+
+
+def pac_proxy_string(proxy: Proxy) -> str:
+    """
+    :return: The PAC representation of the proxy, e.g. "PROXY 127.0.0.1:8080" or "SOCKS5 127.0.0.1:1080"
+    """
+    match proxy.protocol.lower():
+        case "http":
+            return f"PROXY {proxy.ip}"
+        case "https":
+            return f"HTTPS {proxy.ip}"
+        case "socks4" | "socks4a" | "socks":
+            return f"SOCKS {proxy.ip}"
+        case "socks5" | "socks5h":
+            return f"SOCKS5 {proxy.ip}"
+        case _:
+            raise ProxyException(f"Unsupported proxy protocol for PAC scripts: {proxy.protocol}")
+
+
+class ProxyRoutes:
+    """
+    Routes hosts through different groups of proxies by generating a PAC script (see WebDriver.apply_proxy_routes()).
+
+    Rules map domain patterns to groups and are checked in the order they were added. A pattern like "example.com"
+    matches the domain and all of its subdomains, patterns containing * are matched as shell expressions
+    (e.g. "*.example.*"). Hosts matching no rule use the default group. The group DIRECT routes without any proxy.
+
+    With sticky routing, all hosts of a base domain (e.g. "www.example.com" and "api.example.com") always use the
+    same proxy of their group, otherwise the proxies of a group are rotated for every newly resolved host.
+    """
+
+    def __init__(self,
+                 groups: dict[str, Iterable[Proxy] | RankedProxies] | Iterable[Proxy] | RankedProxies,
+                 rules: dict[str, str] | Iterable[tuple[str, str]] = (),
+                 default: str = "default",
+                 sticky: bool = True,
+                 failover: int = 1,
+                 bypass: Iterable[str] = ("localhost", "127.0.0.1")):
+        """
+        :param groups: The proxy groups by name. A single RankedProxies object or list of proxies becomes the
+            group "default"
+        :param rules: (domain pattern, group) pairs, e.g. {"example.com": "fast"}
+        :param default: The group of hosts matching no rule
+        :param sticky: Whether all hosts of a base domain always use the same proxy of their group
+        :param failover: The number of further proxies of the group Chrome falls back to if a proxy fails
+        :param bypass: Host patterns, which are never proxied
+        """
+        self.groups: dict[str, list[Proxy]] = {}
+        self.rules: list[tuple[str, str]] = []
+        self.default = default
+        self.sticky = sticky
+        self.failover = failover
+        self.bypass = list(bypass)
+
+        if not isinstance(groups, dict):
+            groups = {default: groups}
+
+        for name, proxies in groups.items():
+            self.add_group(name, proxies)
+
+        for pattern, group in (rules.items() if isinstance(rules, dict) else rules):
+            self.route(pattern, group)
+
+    @classmethod
+    def from_ranked(cls, ranked: RankedProxies, group_sizes: dict[str, int], **kwargs) -> Self:
+        """
+        :param ranked: The proxies to split into groups
+        :param group_sizes: The sizes of the groups. The best proxies go to the first group, the next ones to the
+            second group and so on, e.g. {"fast": 5, "default": 20}
+        :param kwargs: Any other arguments of the constructor (rules, default, ...)
+        :return: The routes
+        """
+        best = ranked.get_n_best(sum(group_sizes.values()))
+        groups, offset = {}, 0
+
+        for name, size in group_sizes.items():
+            groups[name] = best[offset:offset + size]
+            offset += size
+
+        return cls(groups, **kwargs)
+
+    def add_group(self, name: str, proxies: Iterable[Proxy] | RankedProxies) -> Self:
+        if name == DIRECT:
+            raise ProxyException(f"The group name {DIRECT} is reserved for routing without a proxy")
+
+        if isinstance(proxies, RankedProxies):
+            proxies = proxies.get_n_best(proxies.count)
+
+        proxies = list(proxies)
+        if not proxies:
+            raise ProxyException(f"The proxy group {name} is empty")
+
+        self.groups[name] = proxies
+        return self
+
+    def route(self, pattern: str, group: str) -> Self:
+        """
+        :param pattern: The domain pattern, e.g. "example.com" or "*.example.*"
+        :param group: The name of the group (or DIRECT) to route matching hosts through
+        :return: The routes
+        """
+        self.rules.append((pattern.lower(), group))
+        return self
+
+    def _validate(self) -> None:
+        for group in [self.default] + [group for _, group in self.rules]:
+            if group != DIRECT and group not in self.groups:
+                raise ProxyException(f"Unknown proxy group: {group}")
+
+    def script(self) -> str:
+        """
+        :return: The PAC script
+        """
+        self._validate()
+
+        return PAC_TEMPLATE % {
+            "groups": json.dumps({name: [pac_proxy_string(proxy) for proxy in proxies]
+                                  for name, proxies in self.groups.items()}),
+            "rules": json.dumps(self.rules),
+            "default": json.dumps(self.default),
+            "bypass": json.dumps(self.bypass),
+            "sticky": json.dumps(self.sticky),
+            "failover": max(self.failover, 0)
+        }
+
+    def credentials(self) -> dict[str, dict[str, str]]:
+        """
+        :return: The credentials of all protected proxies by "host:port" (PAC scripts cannot carry credentials)
+        """
+        return {
+            proxy.ip: {"username": proxy.username, "password": proxy.password}
+            for proxies in self.groups.values()
+            for proxy in proxies
+            if isinstance(proxy, ProtectedProxy)
+        }
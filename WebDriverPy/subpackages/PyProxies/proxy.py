@@ -1,28 +1,35 @@
 import json
+from array import array
 from dataclasses import dataclass
 from datetime import datetime
 from os import remove
 from os.path import exists
-from typing import Self
+from typing import Self, Iterable
 
-from .utils import load_test_urls, test_proxy, pick_random, resolve_resource_path
+from .utils import load_test_url_baselines, test_proxy, pick_random, resolve_resource_path, UrlBaseline
+from .validation import validate_concurrently
 from .exceptions import InvalidSavedJSONFormat, ProxyTestingException
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class Proxy:
     ip: str
     protocol: str
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class FetchedProxy(Proxy):
     ip: str
     protocol: str
     average_timeout: float
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ProtectedProxy(Proxy):
     ip: str
     protocol: str
@@ -41,15 +48,121 @@ class ProtectedProxy(Proxy):
         return cls(*cls.extract_proxy_string_components(proxy_string))
 
 
+def proxy_key(proxy: Proxy) -> str:
+    """
+    :return: A unique key of the proxy like "{protocol}://{ip}:{port}"
+    """
+    return f"{proxy.protocol}://{proxy.ip}"
+
+
+class ProxyTable:
+    """
+    A compact column store of proxies and their scores with a hash index by proxy_key().
+
+    Scores are kept in a flat array of doubles and ranked lazily (vectorized with NumPy if available),
+    so inserting is O(1) and the n best proxies are returned in O(n) once the ranking is computed.
+    Proxies with equal scores are ranked in insertion order.
+    """
+    __slots__ = ("proxies", "scores", "index", "_order")
+
+    def __init__(self, data: Iterable[tuple[Proxy, float]] = ()):
+        self.proxies: list[Proxy] = []
+        self.scores = array("d")
+        self.index: dict[str, int] = {}
+        self._order: list[int] | None = None
+
+        for proxy, score in data:
+            self.upsert(proxy, score)
+
+    def __len__(self) -> int:
+        return len(self.proxies)
+
+    def __contains__(self, proxy: Proxy) -> bool:
+        return proxy_key(proxy) in self.index
+
+    def upsert(self, proxy: Proxy, score: float) -> None:
+        """
+        :param proxy: The proxy to add. A proxy with the same key is replaced
+        :param score: The score of the proxy (lower is better)
+        """
+        key = proxy_key(proxy)
+        row = self.index.get(key)
+
+        if row is None:
+            self.index[key] = len(self.proxies)
+            self.proxies.append(proxy)
+            self.scores.append(score)
+        else:
+            self.proxies[row] = proxy
+            self.scores[row] = score
+
+        self._order = None
+
+    def score(self, proxy: Proxy) -> float | None:
+        row = self.index.get(proxy_key(proxy))
+        return self.scores[row] if row is not None else None
+
+    def clear(self) -> None:
+        self.proxies.clear()
+        self.scores = array("d")
+        self.index.clear()
+        self._order = None
+
+    def order(self) -> list[int]:
+        """
+        :return: The rows ordered by score (cached until the table changes)
+        """
+        if self._order is None:
+            if np is not None:
+                self._order = np.argsort(np.frombuffer(self.scores, dtype=np.float64), kind="stable").tolist()
+            else:
+                self._order = sorted(range(len(self.scores)), key=self.scores.__getitem__)
+        return self._order
+
+    def top(self, n: int) -> list[int]:
+        """
+        :return: The rows of the n best proxies in ranking order
+        """
+        n = max(min(n, len(self.proxies)), 0)
+
+        if self._order is None and np is not None and 0 < n < len(self.proxies) // 4:
+            # Partial ranking without sorting the whole table: All rows scoring better than the n-th score,
+            # filled up with the rows tying with it in insertion order (like order() ranks them)
+            scores = np.frombuffer(self.scores, dtype=np.float64)
+            kth = np.partition(scores, n - 1)[n - 1]
+            better = np.flatnonzero(scores < kth)
+            better = better[np.argsort(scores[better], kind="stable")]
+            tied = np.flatnonzero(scores == kth)[:n - len(better)]
+            return better.tolist() + tied.tolist()
+
+        return self.order()[:n]
+
+    def ranked(self) -> list[tuple[Proxy, float]]:
+        return [(self.proxies[row], self.scores[row]) for row in self.order()]
+
+
 class RankedProxies:
+    """
+    Proxies ranked by their score (lower is better), backed by a ProxyTable.
+    Every proxy (identified by proxy_key()) is contained at most once.
+    """
     saved_date_format = "%d.%m.%Y, %H:%M:%S"
 
-    def __init__(self, proxies: list[Proxy] = None, test_num: int = 5,
-                 alt_data: list[tuple[Proxy, float]] = None, saves: bool = True):
-        self.proxies: list[tuple[Proxy, float]] = sorted([
-            (proxy, proxy_time) for proxy in proxies
-            if (proxy_time := self.check_proxy(proxy, test_num=test_num)) is not None
-        ], key=lambda s: s[1]) if alt_data is None else alt_data
+    def __init__(self, proxies: Iterable[Proxy] = None, test_num: int = 5,
+                 alt_data: list[tuple[Proxy, float]] = None, saves: bool = True,
+                 max_workers: int = 16, required: int | None = None):
+        """
+        :param proxies: The proxies to test and rank. Ignored if alt_data is given
+        :param test_num: The number of test requests per proxy
+        :param alt_data: Already ranked (proxy, score) pairs to use instead of testing proxies
+        :param saves: Whether to save the ranking afterward
+        :param max_workers: The maximum number of proxies tested at the same time
+        :param required: Stop testing once this many working proxies were found. None to test all proxies
+        """
+        self.table = ProxyTable(alt_data if alt_data is not None else ())
+
+        if alt_data is None:
+            self.validate(proxies, test_num=test_num, max_workers=max_workers, required=required)
 
         self.data_from = datetime.now()
 
@@ -58,19 +171,62 @@ class RankedProxies:
 
     @property
     def count(self):
-        return len(self.proxies)
+        return len(self.table)
+
+    @property
+    def proxies(self) -> list[tuple[Proxy, float]]:
+        """
+        :return: All (proxy, score) pairs in ranking order
+        """
+        return self.table.ranked()
+
+    @proxies.setter
+    def proxies(self, data: Iterable[tuple[Proxy, float]]):
+        self.table = ProxyTable(data)
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def __contains__(self, proxy: Proxy) -> bool:
+        return proxy in self.table
+
+    def update(self, proxies: Iterable[Proxy] = None, test_num: int = 3,
+               max_workers: int = 16, required: int | None = None):
+        self.validate(proxies, test_num=test_num, max_workers=max_workers, required=required)
+
+    def validate(self, proxies: Iterable[Proxy], test_num: int = 3, max_workers: int = 16,
+                 required: int | None = None) -> list[tuple[Proxy, float]]:
+        """
+        Tests the given proxies concurrently and inserts every working proxy into the ranking as soon as its result arrives.
 
-    def update(self, proxies: list[Proxy] = None, test_num: int = 3):
-        self.proxies: list[tuple[Proxy, float]] = sorted([
-            (proxy, proxy_time) for proxy in proxies
-            if (proxy_time := self.check_proxy(proxy, test_num=test_num)) is not None
-        ] + self.proxies, key=lambda s: s[1])
+        :param proxies: The proxies to test (may be a lazy iterable)
+        :param test_num: The number of test requests per proxy
+        :param max_workers: The maximum number of proxies tested at the same time
+        :param required: Stop testing once this many working proxies were found. None to test all proxies
+        :return: The working proxies with their scores in the order they were validated
+        """
+        test_urls = load_test_url_baselines() if test_num >= 1 else {}
+
+        return validate_concurrently(
+            proxies,
+            lambda proxy: self.check_proxy(proxy, test_num=test_num, test_urls=test_urls),
+            max_workers=max_workers,
+            required=required,
+            on_result=self.insert
+        )
+
+    def insert(self, proxy: Proxy, score: float):
+        """
+        :param proxy: The proxy to add to the ranking. An already ranked proxy gets the new score
+        :param score: The score of the proxy (lower is better)
+        """
+        self.table.upsert(proxy, score)
 
     def get_best(self) -> Proxy:
-        return self.proxies[0][0]
+        return self.table.proxies[self.table.top(1)[0]]
 
     def get_n_best(self, n: int) -> list[Proxy]:
-        return [proxy[0] for proxy in self.proxies[:n]]
+        return [self.table.proxies[row] for row in self.table.top(n)]
 
     def save(self, path: str = resolve_resource_path("saved_free_proxies.json")):
         if not exists(path):
@@ -84,21 +240,17 @@ class RankedProxies:
                 }, file)
 
     def clear(self, deletes_file: bool = True, path: str = resolve_resource_path("saved_free_proxies.json")):
-        self.proxies.clear()
+        self.table.clear()
         if deletes_file:
             remove(path)
 
     def update_trusted_unprotected(self, proxies: list[Proxy] | list[str]):
-        self.proxies = sorted(
-            self.proxies + RankedProxies.__normalize_unprotected_proxy_list(proxies),
-            key=lambda s: s[1]
-        )
+        for proxy, score in RankedProxies.__normalize_unprotected_proxy_list(proxies):
+            self.table.upsert(proxy, score)
 
     def update_trusted_protected(self, proxies: list[Proxy] | list[str]):
-        self.proxies = sorted(
-            self.proxies + RankedProxies.__normalize_protected_proxy_list(proxies),
-            key=lambda s: s[1]
-        )
+        for proxy, score in RankedProxies.__normalize_protected_proxy_list(proxies):
+            self.table.upsert(proxy, score)
 
     @staticmethod
     def __normalize_unprotected_proxy_list(proxies: list[Proxy] | list[str]):
@@ -156,14 +308,27 @@ class RankedProxies:
         return rkp
 
     @staticmethod
-    def check_proxy(proxy: Proxy, test_num: int = 3) -> float | None:
+    def check_proxy(proxy: Proxy, test_num: int = 3, test_urls: dict[str, UrlBaseline] | None = None) -> float | None:
+        """
+        :param proxy: The proxy to test
+        :param test_num: The number of test requests
+        :param test_urls: The test URL baselines to pick a test URL from. If None, the in-memory baselines are used
+        :return: The additional time to first byte caused by the proxy normalised by the spread of the test URL
+            (lower is better) or None if the proxy does not work
+        """
         if test_num < 1:
             return 0
 
-        test_urls = load_test_urls()
+        if test_urls is None:
+            test_urls = load_test_url_baselines()
+
+        address = f"{proxy.username}:{proxy.password}@{proxy.ip}" if isinstance(proxy, ProtectedProxy) else proxy.ip
+
+        test_url, baseline = pick_random(test_urls)
 
         try:
-            return test_proxy(*pick_random(test_urls), proxy=proxy.ip, proxy_protocol=proxy.protocol, test_num=test_num)
+            return test_proxy(test_url, baseline.mean, proxy=address, proxy_protocol=proxy.protocol, test_num=test_num,
+                              test_url_spread=baseline.spread)
         except ProxyTestingException:
             return None
 
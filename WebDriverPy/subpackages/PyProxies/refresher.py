@@ -0,0 +1,192 @@
+import time
+
+from datetime import datetime
+from threading import Thread, Event, Lock
+from typing import Self, Callable, Any
+from warnings import warn
+
+from .main import fetch_free_proxies
+from .proxy import RankedProxies
+from .store import ProxyStore
+from .exceptions import ProxyException
+
+
+class ProxyRefresher:
+    """
+    Keeps a pool of free proxies fresh in a background daemon thread.
+
+    Every interval seconds new proxies are fetched and validated (fetch_free_proxies() by default) and the resulting
+    pool is handed to all subscribers (e.g. WebDriver.set_proxy_pool() of running drivers).
+    Starting the refresher never blocks on fetching: Cached proxies are served immediately, even if they are outdated,
+    and are replaced in the background.
+    """
+
+    def __init__(self,
+                 interval: float = 60 * 60,
+                 n: int = 50,
+                 required: int | None = None,
+                 store: ProxyStore | None = None,
+                 fetch: Callable[[], RankedProxies] | None = None,
+                 retry_interval: float = 60):
+        """
+        :param interval: The time in seconds between two refreshes. Cached proxies older than this are refreshed at once
+        :param n: Number of fetched proxies to test per refresh
+        :param required: Stop testing once this many working proxies were found. None to test all n proxies
+        :param store: An optional ProxyStore to load cached proxies from and to record refreshed proxies in
+        :param fetch: Returns a fresh pool of validated proxies. Defaults to fetch_free_proxies()
+        :param retry_interval: The time in seconds to wait before retrying a failed or empty refresh
+        """
+        self.interval = interval
+        self.n = n
+        self.required = required
+        self.store = store
+        self.fetch = fetch if fetch is not None else self._fetch_free_proxies
+        self.retry_interval = retry_interval
+
+        self.last_error: BaseException | None = None
+
+        self._current: RankedProxies | None = None
+        self._subscribers: list[Callable[[RankedProxies], Any]] = []
+        self._lock = Lock()
+        self._available = Event()
+        self._wake = Event()
+        self._stopped = Event()
+        self._thread: Thread | None = None
+
+    def _fetch_free_proxies(self) -> RankedProxies:
+        fetched = fetch_free_proxies(n=self.n, required=self.required, saves=self.store is None)
+
+        if self.store is not None:
+            self.store.add_ranked(fetched)
+        return fetched
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def current(self) -> RankedProxies | None:
+        """
+        :return: The most recent pool or None if no pool is available yet
+        """
+        return self._current
+
+    def subscribe(self, callback: Callable[[RankedProxies], Any]) -> Self:
+        """
+        :param callback: Called (in the refresher thread) with every new pool. Subscribing twice has no effect
+        :return: The refresher itself
+        """
+        with self._lock:
+            if callback not in self._subscribers:
+                self._subscribers.append(callback)
+        return self
+
+    def unsubscribe(self, callback: Callable[[RankedProxies], Any]) -> Self:
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+        return self
+
+    def _load_cached(self) -> RankedProxies | None:
+        try:
+            # Never fetches (unlike load_proxies_list()), fetching is left to the background thread
+            cached = self.store.to_ranked(self.n) if self.store is not None else RankedProxies.load()
+        except (OSError, ValueError, ProxyException):
+            return None
+
+        return cached if cached.count else None
+
+    def _publish(self, pool: RankedProxies) -> None:
+        with self._lock:
+            self._current = pool
+            subscribers = list(self._subscribers)
+        self._available.set()
+
+        for callback in subscribers:
+            try:
+                callback(pool)
+            except Exception as e:
+                warn(f"[ProxyRefresher]: Subscriber {callback} failed: {e}", RuntimeWarning)
+
+    def refresh(self) -> RankedProxies | None:
+        """
+        :return: Fetches a new pool in the calling thread, publishes it and returns it. None if the refresh failed
+            or found no working proxies (the previous pool is kept in that case)
+        """
+        try:
+            pool = self.fetch()
+        except Exception as e:
+            self.last_error = e
+            warn(f"[ProxyRefresher]: Refreshing proxies failed: {e}", RuntimeWarning)
+            return None
+
+        if not pool.count:
+            return None
+
+        self.last_error = None
+        self._publish(pool)
+        return pool
+
+    def refresh_soon(self) -> Self:
+        """
+        :return: Wakes the background thread to refresh immediately
+        """
+        self._wake.set()
+        return self
+
+    def start(self) -> Self:
+        """
+        :return: Starts the background thread (if not running yet) serving cached proxies right away
+        """
+        if self.running:
+            return self
+
+        self._stopped.clear()
+
+        if self._current is None:
+            cached = self._load_cached()
+            if cached is not None:
+                self._publish(cached)
+
+        self._thread = Thread(target=self._run, daemon=True, name="ProxyRefresher")
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wake.set()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def wait(self, timeout: float | None = None) -> RankedProxies:
+        """
+        :param timeout: The maximum time in seconds to wait. None to wait until a pool is available
+        :return: The current pool, waiting for the first refresh only if no pool is available at all
+        """
+        if not self._available.wait(timeout):
+            raise TimeoutError(f"[ProxyRefresher]: No proxies available after {timeout}s")
+        return self._current
+
+    def _next_delay(self) -> float:
+        current = self._current
+
+        if current is None or self.last_error is not None:
+            return 0 if current is None and self.last_error is None else self.retry_interval
+
+        age = (datetime.now() - current.data_from).total_seconds()
+        return max(self.interval - age, 0)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wake.wait(self._next_delay())
+            self._wake.clear()
+
+            if self._stopped.is_set():
+                break
+
+            started = time.monotonic()
+            if self.refresh() is None and self.last_error is None:
+                # No working proxies found: Retry later instead of hammering the source
+                self._stopped.wait(max(self.retry_interval - (time.monotonic() - started), 0))
@@ -0,0 +1,173 @@
+import requests
+
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, as_completed
+from os.path import exists
+from typing import Iterable, Iterator
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+from warnings import warn
+
+from .proxy import FetchedProxy
+from .thread_manager import ThreadManager
+from .utils import load_request_args
+from .exceptions import InvalidJSONResponse, InvalidResponseFormat, InvalidProxyFetchingResponse
+
+
+class ProxySource(ABC):
+    """
+    A provider of free proxy lists. Subclasses implement fetch() and are registered via register_source().
+    """
+
+    name: str = "source"
+
+    @abstractmethod
+    def fetch(self) -> list[FetchedProxy]:
+        """
+        :return: The proxies currently offered by the source
+        """
+        pass
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.name!r})"
+
+
+class ProxyScrapeSource(ProxySource):
+    """
+    The JSON API of proxyscrape (or any endpoint answering in the same format, e.g. a local stand-in server).
+    Only alive proxies are returned, ordered by their average timeout.
+    """
+
+    name = "proxyscrape"
+
+    def __init__(self, source_url: str = "https://api.proxyscrape.com/v3/free-proxy-list/get",
+                 alt_params: dict[str, str] = None, alt_headers: dict[str, str] = None,
+                 ssl_support_required: bool = True, timeout: float = 20):
+        self.source_url = source_url
+        self.params, self.headers = load_request_args(alt_headers=alt_headers, alt_params=alt_params,
+                                                      ssl_support_required=ssl_support_required)
+        self.timeout = timeout
+
+    def fetch(self) -> list[FetchedProxy]:
+        try:
+            response: dict = requests.get(self.source_url, params=self.params, headers=self.headers,
+                                          timeout=self.timeout).json()["proxies"]
+        except requests.JSONDecodeError:
+            raise InvalidResponseFormat("Response was not a valid JSON response")
+        except KeyError:
+            raise InvalidJSONResponse("JSON response didn't contain \"proxies\" key")
+
+        return sorted([
+            FetchedProxy(ip=proxy["proxy"], protocol=proxy["protocol"], average_timeout=proxy["average_timeout"])
+            for proxy in response
+            if proxy.get("proxy") and proxy.get("protocol") and proxy.get("alive") and proxy.get("average_timeout")
+        ], key=lambda proxy: proxy.average_timeout)
+
+
+class TextListSource(ProxySource):
+    """
+    A plain text proxy list with one "{ip}:{port}" or "{protocol}://{ip}:{port}" entry per line,
+    loaded from an HTTP(S) URL, a file:// URL or a local file path. Empty lines and lines starting with # are skipped.
+    """
+
+    def __init__(self, location: str, protocol: str = "http", name: str | None = None, timeout: float = 20):
+        """
+        :param location: The URL or file path of the list
+        :param protocol: The protocol of entries without an explicit protocol
+        :param name: The name of the source. Defaults to the location
+        :param timeout: The request timeout in seconds (HTTP only)
+        """
+        self.location = location
+        self.protocol = protocol
+        self.name = name if name is not None else location
+        self.timeout = timeout
+
+    def _read(self) -> str:
+        scheme = urlparse(self.location).scheme
+
+        if scheme in ("http", "https"):
+            response = requests.get(self.location, timeout=self.timeout)
+            response.raise_for_status()
+            return response.text
+
+        path = url2pathname(urlparse(self.location).path) if scheme == "file" else self.location
+        if not exists(path):
+            raise InvalidProxyFetchingResponse(f"Proxy list {path} does not exist")
+
+        with open(path, "r") as file:
+            return file.read()
+
+    def fetch(self) -> list[FetchedProxy]:
+        proxies = []
+
+        for line in self._read().splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            protocol, ip = line.split("://", maxsplit=1) if "://" in line else (self.protocol, line)
+            proxies.append(FetchedProxy(ip=ip, protocol=protocol, average_timeout=0))
+
+        return proxies
+
+
+proxy_sources: dict[str, ProxySource] = {}
+"""The registered sources used by fetch_free_proxies() by default"""
+
+
+def register_source(source: ProxySource, name: str | None = None) -> ProxySource:
+    """
+    :param source: The source to register. A source registered under the same name is replaced
+    :param name: The name to register the source under. Defaults to source.name
+    :return: The source
+    """
+    proxy_sources[name if name is not None else source.name] = source
+    return source
+
+
+def unregister_source(name: str) -> None:
+    proxy_sources.pop(name, None)
+
+
+register_source(ProxyScrapeSource())
+
+
+def fetch_from_sources(sources: Iterable[ProxySource | str] | None = None) -> Iterator[FetchedProxy]:
+    """
+    Fetches all sources concurrently and merges their proxies into one stream, deduplicated by ip:port.
+
+    The proxies of a source are yielded as soon as it answered (in the source's own order), so validation can start
+    before slow sources finished. Failing sources are skipped with a warning.
+
+    :param sources: The sources or names of registered sources. None for all registered sources
+    :return: The merged proxies. If all sources fail, the error of the last one is raised
+    """
+    sources = [proxy_sources[source] if isinstance(source, str) else source
+               for source in (proxy_sources.values() if sources is None else sources)]
+
+    executor = ThreadManager.shared_executor()
+    futures: dict[Future, ProxySource] = {executor.submit(source.fetch): source for source in sources}
+    seen: set[str] = set()
+    errors: list[Exception] = []
+
+    try:
+        for future in as_completed(futures):
+            try:
+                fetched = future.result()
+            except Exception as e:
+                errors.append(e)
+                if len(errors) == len(futures):
+                    # Nothing to fall back to
+                    raise
+                warn(f"[fetch_from_sources]: Fetching proxies from {futures[future]} failed: {e}", RuntimeWarning)
+                continue
+
+            for proxy in fetched:
+                if proxy.ip in seen:
+                    continue
+
+                seen.add(proxy.ip)
+                yield proxy
+    finally:
+        for future in futures:
+            future.cancel()
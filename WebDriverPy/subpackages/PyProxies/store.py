@@ -0,0 +1,251 @@
+import sqlite3
+import time
+
+from datetime import datetime
+from threading import Lock
+from typing import Self, Iterable
+
+from .proxy import Proxy, ProtectedProxy, RankedProxies
+from .utils import resolve_resource_path
+
+
+class ProxyStore:
+    """
+    A persistent SQLite store of proxies and their measurement history.
+
+    Unlike RankedProxies.save(), which rewrites the whole JSON file, every measurement is an incremental upsert,
+    credentials of protected proxies are kept and queries use indices on (ip, protocol), score and measurement time.
+    All timestamps are Unix timestamps (time.time()).
+    """
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS proxies (
+            id INTEGER PRIMARY KEY,
+            ip TEXT NOT NULL,
+            protocol TEXT NOT NULL,
+            username TEXT,
+            password TEXT,
+            score REAL,
+            latency REAL,
+            successes INTEGER NOT NULL DEFAULT 0,
+            failures INTEGER NOT NULL DEFAULT 0,
+            first_seen REAL NOT NULL,
+            last_measured REAL,
+            UNIQUE (ip, protocol)
+        );
+        CREATE INDEX IF NOT EXISTS proxies_score ON proxies (score);
+        CREATE INDEX IF NOT EXISTS proxies_last_measured ON proxies (last_measured);
+
+        CREATE TABLE IF NOT EXISTS measurements (
+            proxy_id INTEGER NOT NULL REFERENCES proxies (id) ON DELETE CASCADE,
+            measured_at REAL NOT NULL,
+            success INTEGER NOT NULL,
+            score REAL,
+            latency REAL
+        );
+        CREATE INDEX IF NOT EXISTS measurements_proxy ON measurements (proxy_id, measured_at);
+    """
+
+    def __init__(self, path: str = resolve_resource_path("proxies.sqlite3")):
+        """
+        :param path: The path of the database file (created if missing). ":memory:" for a temporary in-memory store
+        """
+        self.path = path
+        self._lock = Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA foreign_keys = ON")
+
+        if path != ":memory:":
+            self._connection.execute("PRAGMA journal_mode = WAL")
+
+        with self._connection:
+            self._connection.executescript(self.schema)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    @property
+    def count(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM proxies").fetchone()[0]
+
+    @property
+    def last_measured(self) -> datetime | None:
+        """
+        :return: The time of the most recent measurement or None if nothing was measured yet
+        """
+        with self._lock:
+            timestamp = self._connection.execute("SELECT MAX(last_measured) FROM proxies").fetchone()[0]
+        return datetime.fromtimestamp(timestamp) if timestamp is not None else None
+
+    @staticmethod
+    def _credentials(proxy: Proxy) -> tuple[str | None, str | None]:
+        return (proxy.username, proxy.password) if isinstance(proxy, ProtectedProxy) else (None, None)
+
+    @staticmethod
+    def _to_proxy(ip: str, protocol: str, username: str | None, password: str | None) -> Proxy:
+        return ProtectedProxy(ip, protocol, username, password) if username is not None else Proxy(ip, protocol)
+
+    def _upsert(self, proxy: Proxy, now: float) -> int:
+        username, password = self._credentials(proxy)
+
+        return self._connection.execute(
+            "INSERT INTO proxies (ip, protocol, username, password, first_seen) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (ip, protocol) DO UPDATE SET "
+            "username = COALESCE(excluded.username, username), password = COALESCE(excluded.password, password) "
+            "RETURNING id",
+            (proxy.ip, proxy.protocol, username, password, now)
+        ).fetchone()[0]
+
+    def add(self, proxies: Iterable[Proxy]) -> Self:
+        """
+        :param proxies: The proxies to store without any measurement. Known proxies keep their data
+        :return: The store itself
+        """
+        now = time.time()
+
+        with self._lock, self._connection:
+            for proxy in proxies:
+                self._upsert(proxy, now)
+        return self
+
+    def record(self, proxy: Proxy, success: bool = True, score: float | None = None, latency: float | None = None) -> Self:
+        """
+        Stores a single measurement of a proxy (see record_many()).
+        """
+        return self.record_many([(proxy, success, score, latency)])
+
+    def record_many(self, measurements: Iterable[tuple[Proxy, bool, float | None, float | None]]) -> Self:
+        """
+        Stores measurements in a single transaction. The proxies are inserted if unknown.
+
+        :param measurements: (proxy, success, score, latency) tuples. The score (e.g. from RankedProxies.check_proxy())
+            and the latency in seconds replace the current values of the proxy unless they are None
+        :return: The store itself
+        """
+        now = time.time()
+
+        with self._lock, self._connection:
+            for proxy, success, score, latency in measurements:
+                proxy_id = self._upsert(proxy, now)
+
+                self._connection.execute(
+                    "INSERT INTO measurements (proxy_id, measured_at, success, score, latency) VALUES (?, ?, ?, ?, ?)",
+                    (proxy_id, now, int(success), score, latency)
+                )
+                self._connection.execute(
+                    "UPDATE proxies SET "
+                    "score = COALESCE(?, score), latency = COALESCE(?, latency), "
+                    "successes = successes + ?, failures = failures + ?, last_measured = ? "
+                    "WHERE id = ?",
+                    (score, latency, int(success), int(not success), now, proxy_id)
+                )
+        return self
+
+    def add_ranked(self, ranked: RankedProxies) -> Self:
+        """
+        :param ranked: Validated proxies, which are recorded as successful measurements with their scores
+        :return: The store itself
+        """
+        return self.record_many((proxy, True, score, None) for proxy, score in ranked.proxies)
+
+    def remove(self, proxy: Proxy) -> Self:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM proxies WHERE ip = ? AND protocol = ?", (proxy.ip, proxy.protocol))
+        return self
+
+    def top(self, n: int,
+            min_success_rate: float = 0,
+            max_age: float | None = None,
+            protocol: str | None = None) -> list[tuple[Proxy, float]]:
+        """
+        :param n: The maximum number of proxies to return
+        :param min_success_rate: The minimum share of successful measurements (0 to 1)
+        :param max_age: Only consider proxies measured within the last max_age seconds. None for any age
+        :param protocol: Only consider proxies of this protocol. None for any protocol
+        :return: The n best scored (proxy, score) pairs (lower is better) in ranking order
+        """
+        query = "SELECT ip, protocol, username, password, score FROM proxies " \
+                "WHERE score IS NOT NULL AND successes >= ? * (successes + failures)"
+        params: list = [min_success_rate]
+
+        if max_age is not None:
+            query += " AND last_measured >= ?"
+            params.append(time.time() - max_age)
+
+        if protocol is not None:
+            query += " AND protocol = ?"
+            params.append(protocol)
+
+        query += " ORDER BY score LIMIT ?"
+        params.append(n)
+
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+
+        return [(self._to_proxy(*row[:4]), row[4]) for row in rows]
+
+    def to_ranked(self, n: int, min_success_rate: float = 0, max_age: float | None = None,
+                  protocol: str | None = None) -> RankedProxies:
+        """
+        :return: The result of top() as a RankedProxies object, which is not saved to the JSON file
+        """
+        ranked = RankedProxies(alt_data=self.top(n, min_success_rate, max_age, protocol), saves=False)
+        ranked.data_from = self.last_measured or ranked.data_from
+        return ranked
+
+    def stats(self, proxy: Proxy) -> dict | None:
+        """
+        :return: The stored data of the proxy (score, latency, successes, failures, success_rate, first_seen,
+            last_measured) or None if the proxy is unknown
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT score, latency, successes, failures, first_seen, last_measured FROM proxies "
+                "WHERE ip = ? AND protocol = ?",
+                (proxy.ip, proxy.protocol)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        score, latency, successes, failures, first_seen, last_measured = row
+        return {
+            "score": score,
+            "latency": latency,
+            "successes": successes,
+            "failures": failures,
+            "success_rate": successes / (successes + failures) if successes + failures else None,
+            "first_seen": first_seen,
+            "last_measured": last_measured
+        }
+
+    def history(self, proxy: Proxy, limit: int = 100) -> list[tuple[float, bool, float | None, float | None]]:
+        """
+        :return: The most recent (measured_at, success, score, latency) measurements of the proxy, newest first
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT m.measured_at, m.success, m.score, m.latency FROM measurements m "
+                "JOIN proxies p ON p.id = m.proxy_id WHERE p.ip = ? AND p.protocol = ? "
+                "ORDER BY m.measured_at DESC LIMIT ?",
+                (proxy.ip, proxy.protocol, limit)
+            ).fetchall()
+
+        return [(measured_at, bool(success), score, latency) for measured_at, success, score, latency in rows]
+
+    def prune_history(self, older_than: float) -> int:
+        """
+        :param older_than: The age in seconds after which measurements are deleted. The aggregated values are kept
+        :return: The number of deleted measurements
+        """
+        with self._lock, self._connection:
+            return self._connection.execute("DELETE FROM measurements WHERE measured_at < ?",
+                                            (time.time() - older_than,)).rowcount
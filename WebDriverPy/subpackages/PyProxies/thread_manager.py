@@ -1,11 +1,78 @@
+import time
+
 from warnings import warn
-from typing import Self, Callable, Iterable
-from threading import Thread
+from typing import Self, Callable, Iterable, Any
+from threading import Lock, local
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+
+
+_worker_state = local()
+
+
+def _mark_worker() -> None:
+    _worker_state.is_worker = True
+
+
+def in_shared_worker() -> bool:
+    """
+    :return: Whether the current thread is a worker of the shared ThreadManager executor
+    """
+    return getattr(_worker_state, "is_worker", False)
+
+
+class _Task:
+    """
+    A task, which is either run by a worker of the shared executor or inline by a thread waiting for it,
+    whichever claims it first.
+    """
+    __slots__ = ("target", "args", "future", "submitted", "_claimed", "_lock")
+
+    def __init__(self, target: Callable, args: Iterable) -> None:
+        self.target = target
+        self.args = tuple(args)
+        self.future = Future()
+        self.submitted = time.monotonic()
+        self._claimed = False
+        self._lock = Lock()
+
+    def run(self) -> None:
+        with self._lock:
+            if self._claimed:
+                return
+            self._claimed = True
+
+        if not self.future.set_running_or_notify_cancel():
+            return
+
+        try:
+            self.future.set_result(self.target(*self.args))
+        except BaseException as e:
+            self.future.set_exception(e)
 
 
 class ThreadManager:
-    def __init__(self, fill_target: Callable | None = None, fill_args: Iterable[Iterable] | None = None):
-        self.threads = []
+    """
+    Runs tasks on a shared, size-limited pool of worker threads, which is reused by all ThreadManager instances.
+
+    Waiting for tasks from inside a worker of the shared pool (e.g. a task starting subtasks) runs all subtasks
+    not yet picked up by another worker inline, so nested usage cannot exhaust the pool and deadlock.
+    """
+
+    max_workers: int = 32
+
+    _executor: ThreadPoolExecutor | None = None
+    _executor_lock = Lock()
+
+    def __init__(self, fill_target: Callable | None = None, fill_args: Iterable[Iterable] | None = None,
+                 timeout: float | None = None):
+        """
+        :param fill_target: The target to call for every argument tuple of fill_args
+        :param fill_args: The argument tuples to call fill_target with
+        :param timeout: The time in seconds (since submission) each task may take until join() raises a TimeoutError
+            and cancels the task if it has not started yet. None for no timeout
+        """
+        self.tasks: list[_Task] = []
+        self.timeout = timeout
 
         if fill_target is not None:
             if fill_args is None:
@@ -14,21 +81,83 @@ class ThreadManager:
         elif fill_args is not None:
             warn("[ThreadManager]: fill_target is None but fill_args is not None: Skipping thread execution.", UserWarning)
 
-    def join(self) -> Self:
-        for thread in self.threads:
-            thread.join()
+    @classmethod
+    def shared_executor(cls) -> ThreadPoolExecutor:
+        """
+        :return: The executor shared by all ThreadManager instances (created on first use)
+        """
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(max_workers=cls.max_workers, thread_name_prefix="ThreadManager",
+                                                   initializer=_mark_worker)
+            return cls._executor
+
+    @classmethod
+    def set_max_workers(cls, max_workers: int) -> None:
+        """
+        :param max_workers: The new size of the shared pool. Tasks already submitted finish on the old pool
+        """
+        with cls._executor_lock:
+            cls.max_workers = max_workers
+
+            if cls._executor is not None:
+                cls._executor.shutdown(wait=False)
+                cls._executor = None
+
+    @property
+    def futures(self) -> list[Future]:
+        return [task.future for task in self.tasks]
+
+    def join(self, raise_exceptions: bool = False) -> Self:
+        """
+        Waits for all tasks to finish.
+
+        :param raise_exceptions: Whether to re-raise the first exception raised by a task. Off by default, like
+            joining the tasks' threads used to be. Use results() to inspect the outcome of every task
+        :return: The ThreadManager itself
+        """
+        if in_shared_worker():
+            for task in self.tasks:
+                task.run()
+
+        for task in self.tasks:
+            remaining = None if self.timeout is None else self.timeout - (time.monotonic() - task.submitted)
+
+            if remaining is None:
+                wait([task.future])
+            elif not wait([task.future], timeout=max(remaining, 0)).done:
+                for pending in self.tasks:
+                    pending.future.cancel()
+                raise TimeoutError(f"[ThreadManager]: Task exceeded the timeout of {self.timeout}s")
+
+            if raise_exceptions and task.future.exception() is not None:
+                raise task.future.exception()
+
         return self
 
+    def results(self, raise_exceptions: bool = True) -> list[Any]:
+        """
+        :param raise_exceptions: Whether to re-raise the first exception raised by a task.
+            If False, failed tasks are represented by their exception
+        :return: Waits for all tasks and returns their results in submission order
+        """
+        self.join(raise_exceptions=raise_exceptions)
+
+        return [task.future.exception() if task.future.exception() is not None else task.future.result()
+                for task in self.tasks]
+
     def clear(self) -> Self:
-        self.threads.clear()
+        self.tasks.clear()
         return self
 
     def fill(self, target: Callable, args: Iterable[Iterable]) -> Self:
-        for thread_arguments in args:
-            thread = Thread(target=target, args=thread_arguments)
-            thread.start()
+        executor = self.shared_executor()
+
+        for task_arguments in args:
+            task = _Task(target, task_arguments)
+            executor.submit(task.run)
 
-            self.threads.append(thread)
+            self.tasks.append(task)
 
         return self
 
@@ -1,18 +1,27 @@
-from typing import Callable
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, TypeVar
 from functools import wraps
+from threading import Lock, Thread
 from timeit import default_timer
-from os.path import exists, dirname, join
+from os.path import exists, dirname, join, getmtime
 from os import makedirs
+from urllib.parse import urlsplit
 import random
 import json
+import time
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from .exceptions import ProxyTestingException
 from .test_urls import test_urls as urls_to_test
 from .thread_manager import ThreadManager
 
 
+T = TypeVar("T")
+
+
 def resolve_resource_path(resource_name: str,
                           add_data_dir: str = "data",
                           ensure_exists: bool = True) -> str:
@@ -79,67 +88,308 @@ def ignores_request_exception(f: Callable) -> Callable:
     return wrapper
 
 
-def pick_random(test_urls: dict[str, float]) -> tuple[str, float]:
-    key = random.choice(list(test_urls.keys()))
-    return key, test_urls[key]
+@dataclass
+class LatencyMeasurement:
+    connect_time: float
+    """The additional time of the first request for establishing the connection (TCP, proxy and TLS handshakes)"""
+    ttfb: float
+    """The average time to first byte of the requests over the already established (kept-alive) connection"""
+    ttfb_variance: float = 0
+    """The variance of the time to first byte of the requests over the already established connection"""
 
 
-def test_proxy(test_url: str, test_url_time: float, proxy: str, proxy_protocol: str, test_num: int = 3):
-    time_list = []
+@dataclass(frozen=True)
+class UrlBaseline:
+    mean: float
+    """The average time to first byte of the URL without proxy"""
+    variance: float = 0
+    """The variance of the time to first byte of the URL without proxy"""
 
-    try:
-        @ignores_request_exception
-        def speed_test():
-            time_list.append(timed(lambda: requests.get(test_url, proxies={proxy_protocol: proxy}, timeout=8))()[0])
+    @property
+    def spread(self) -> float:
+        """
+        The standard deviation used to normalise proxy scores.
+        It is at least 10% of the mean (and 10ms), since a few samples may show almost no variance.
+        """
+        return max(self.variance ** 0.5, self.mean * 0.1, 0.01)
+
+
+_sessions: OrderedDict[tuple[str, str], requests.Session] = OrderedDict()
+_sessions_lock = Lock()
+max_cached_sessions = 256
+
+
+def proxy_url(proxy: str, proxy_protocol: str) -> str:
+    return proxy if "://" in proxy else f"{proxy_protocol}://{proxy}"
+
+
+def get_session(target_url: str, proxy: str | None = None, proxy_protocol: str | None = None) -> requests.Session:
+    """
+    :param target_url: The URL the session is used for. Sessions are cached per proxy and target host
+    :param proxy: The proxy as "{ip}:{port}" (or "{user}:{password}@{ip}:{port}"), None for a direct connection
+    :param proxy_protocol: The protocol of the proxy (e.g. "http" or "socks5")
+    :return: A cached session keeping connections alive, such that repeated requests skip TCP and TLS handshakes
+    """
+    key = (proxy_url(proxy, proxy_protocol) if proxy is not None else "direct", urlsplit(target_url).netloc)
+
+    with _sessions_lock:
+        session = _sessions.get(key)
+
+        if session is not None:
+            _sessions.move_to_end(key)
+            return session
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+        if proxy is not None:
+            # requests selects proxies by the scheme of the target URL, not by the protocol of the proxy
+            session.proxies = {"http": key[0], "https": key[0]}
+            # Otherwise HTTP(S)_PROXY environment variables take precedence over the proxy under test
+            session.trust_env = False
 
-        ThreadManager(speed_test, [()] * test_num).join()
+        _sessions[key] = session
 
-        return (sum(time_list) / test_num) - test_url_time
+        # Evicted sessions are not closed, since other threads may still use them.
+        # Their connections are closed once they are garbage collected
+        while len(_sessions) > max_cached_sessions:
+            _sessions.popitem(last=False)
+
+    return session
+
+
+def discard_session(target_url: str, proxy: str | None = None, proxy_protocol: str | None = None) -> None:
+    """
+    Removes the cached session (e.g. after a failed request), such that the next get_session() starts a fresh one.
+    Like evicted sessions, it is not closed, since other threads may still use it
+    """
+    key = (proxy_url(proxy, proxy_protocol) if proxy is not None else "direct", urlsplit(target_url).netloc)
+
+    with _sessions_lock:
+        _sessions.pop(key, None)
+
+
+def measure_latency(session: requests.Session, url: str, test_num: int = 3, timeout: float = 8) -> LatencyMeasurement:
+    """
+    Sends test_num + 1 sequential requests over the same session. The first request establishes the connection,
+    the others reuse it, which separates the connection setup from the time to first byte.
+
+    :param session: The session to use
+    :param url: The URL to request
+    :param test_num: The number of measured requests over the established connection
+    :param timeout: The timeout per request in seconds
+    :return: The measured connection time and time to first byte
+    """
+    samples = []
+
+    for _ in range(max(test_num, 1) + 1):
+        start = default_timer()
+
+        with session.get(url, timeout=timeout, stream=True) as response:
+            samples.append(default_timer() - start)
+
+            # Read the body, such that the connection is returned to the pool
+            _ = response.content
+
+    cold, warm = samples[0], samples[1:]
+    ttfb = sum(warm) / len(warm)
+    variance = sum((sample - ttfb) ** 2 for sample in warm) / len(warm)
+
+    return LatencyMeasurement(connect_time=max(cold - ttfb, 0), ttfb=ttfb, ttfb_variance=variance)
+
+
+def pick_random(test_urls: dict[str, T]) -> tuple[str, T]:
+    key = random.choice(list(test_urls.keys()))
+    return key, test_urls[key]
+
+
+def test_proxy(test_url: str, test_url_time: float, proxy: str, proxy_protocol: str, test_num: int = 3,
+               test_url_spread: float | None = None) -> float:
+    """
+    :param test_url: The URL to request through the proxy
+    :param test_url_time: The time to first byte of the URL without proxy
+    :param proxy: The proxy as "{ip}:{port}" (or "{user}:{password}@{ip}:{port}")
+    :param proxy_protocol: The protocol of the proxy
+    :param test_num: The number of measured requests
+    :param test_url_spread: The standard deviation of the time to first byte of the URL without proxy (see UrlBaseline.spread).
+        If given, the result is normalised by it, such that scores measured with different URLs are comparable
+    :return: The additional time to first byte caused by the proxy (in units of test_url_spread, if given)
+    """
+    try:
+        measurement = measure_latency(get_session(test_url, proxy, proxy_protocol), test_url, test_num)
     except requests.exceptions.RequestException as e:
+        discard_session(test_url, proxy, proxy_protocol)
         raise ProxyTestingException(str(e))
 
+    if test_url_spread is not None:
+        return (measurement.ttfb - test_url_time) / test_url_spread
+    return measurement.ttfb - test_url_time
 
-def generate_test_urls() -> dict[str, float]:
-    time_dict = {}
+
+def generate_test_url_baselines(test_num: int = 3) -> dict[str, UrlBaseline]:
+    """
+    :return: The baseline (without proxy) of all reachable test URLs
+    """
+    baselines = {}
 
     def test_url_task(test_url: str):
-        time_dict.update({test_url: test_url_speed(test_url)})
+        measurement = measure_test_url(test_url, test_num)
+
+        if measurement is not None:
+            baselines.update({test_url: UrlBaseline(measurement.ttfb, measurement.ttfb_variance)})
 
     ThreadManager(test_url_task, [(url,) for url in urls_to_test]).join()
 
-    return time_dict
+    return baselines
+
+
+def generate_test_urls() -> dict[str, float]:
+    return {url: baseline.mean for url, baseline in generate_test_url_baselines().items()}
+
+
+def measure_test_url(url: str, test_num: int = 3) -> LatencyMeasurement | None:
+    """
+    :return: The latency measurement of the URL without proxy or None if the URL is unreachable
+    """
+    try:
+        return measure_latency(get_session(url), url, test_num)
+    except requests.exceptions.RequestException:
+        discard_session(url)
+        return None
 
 
 def test_url_speed(url: str, test_num: int = 3) -> float:
-    time_list = []
+    """
+    :return: The time to first byte of the URL without proxy or infinity if the URL is unreachable
+    """
+    measurement = measure_test_url(url, test_num)
+    return measurement.ttfb if measurement is not None else float("inf")
 
-    @ignores_request_exception
-    def speed_test() -> None:
-        time_list.append(timed(lambda: requests.get(url, timeout=8))()[0])
 
-    ThreadManager(speed_test, [()] * test_num).join()
+class TestUrlBaseline:
+    """
+    Process-wide in-memory cache of the test URL baselines (see get_test_url_baseline()).
 
-    return sum(time_list) / test_num
+    The baselines are read from the save file (or generated, if it does not exist) once.
+    After ttl seconds, get() keeps returning the cached baselines while a background thread measures new ones
+    and swaps them in once done.
+    """
 
+    max_mean: float = 5.0
 
-def load_test_urls(save_path: str = resolve_resource_path("test_urls_save.json"), saves: bool = True) -> dict[str, float]:
-    if exists(save_path):
-        with open(save_path, "r") as file:
-            content = json.load(file)
-    else:
-        content = generate_test_urls()
-        if saves:
-            save_test_urls(content, save_path=save_path)
+    def __init__(self, save_path: str = resolve_resource_path("test_urls_save.json"), ttl: float = 12 * 60 * 60,
+                 saves: bool = True):
+        """
+        :param save_path: The file to load the baselines from and save them to
+        :param ttl: The time in seconds after which the baselines are refreshed in the background
+        :param saves: Whether to save newly generated baselines to save_path
+        """
+        self.save_path = save_path
+        self.ttl = ttl
+        self.saves = saves
+
+        self._baselines: dict[str, UrlBaseline] | None = None
+        self._measured_at = 0.0
+        self._lock = Lock()
+        self._refresh_thread: Thread | None = None
+
+    @property
+    def age(self) -> float:
+        """
+        :return: The age of the cached baselines in seconds
+        """
+        return time.time() - self._measured_at
+
+    def get(self) -> dict[str, UrlBaseline]:
+        """
+        :return: The baselines of all usable test URLs (average time to first byte below max_mean).
+            Blocks only if no baselines have been loaded yet
+        """
+        with self._lock:
+            if self._baselines is None:
+                self._load()
+
+            if self.age > self.ttl:
+                self._refresh_in_background()
+
+            return self._baselines
 
-    return {k: v for k, v in content.items() if v < 5.0}
+    def _load(self) -> None:
+        if exists(self.save_path):
+            with open(self.save_path, "r") as file:
+                content = json.load(file)
+
+            self._set({url: UrlBaseline(**value) if isinstance(value, dict) else UrlBaseline(value)
+                       for url, value in content.items()}, getmtime(self.save_path))
+        else:
+            self._set(self._generate(), time.time())
+
+    def _generate(self) -> dict[str, UrlBaseline]:
+        baselines = generate_test_url_baselines()
+
+        if self.saves:
+            save_test_urls(baselines, save_path=self.save_path)
+        return baselines
+
+    def _set(self, baselines: dict[str, UrlBaseline], measured_at: float) -> None:
+        self._baselines = {url: baseline for url, baseline in baselines.items() if baseline.mean < self.max_mean}
+        self._measured_at = measured_at
+
+    def _refresh_in_background(self) -> None:
+        if self._refresh_thread is not None and self._refresh_thread.is_alive():
+            return
+
+        def refresh() -> None:
+            baselines = self._generate()
+
+            with self._lock:
+                self._set(baselines, time.time())
+
+        self._refresh_thread = Thread(target=refresh, daemon=True, name="TestUrlBaselineRefresh")
+        self._refresh_thread.start()
+
+    def refresh(self) -> dict[str, UrlBaseline]:
+        """
+        :return: Measures new baselines (blocking) and returns them
+        """
+        baselines = self._generate()
+
+        with self._lock:
+            self._set(baselines, time.time())
+            return self._baselines
+
+
+_test_url_baselines: dict[str, TestUrlBaseline] = {}
+_test_url_baselines_lock = Lock()
+
+
+def get_test_url_baseline(save_path: str = resolve_resource_path("test_urls_save.json"), saves: bool = True) -> TestUrlBaseline:
+    """
+    :return: The process-wide baseline cache for the given save file
+    """
+    with _test_url_baselines_lock:
+        if save_path not in _test_url_baselines:
+            _test_url_baselines[save_path] = TestUrlBaseline(save_path, saves=saves)
+        return _test_url_baselines[save_path]
+
+
+def load_test_url_baselines(save_path: str = resolve_resource_path("test_urls_save.json"), saves: bool = True) -> dict[str, UrlBaseline]:
+    return get_test_url_baseline(save_path, saves).get()
+
+
+def load_test_urls(save_path: str = resolve_resource_path("test_urls_save.json"), saves: bool = True) -> dict[str, float]:
+    return {url: baseline.mean for url, baseline in load_test_url_baselines(save_path, saves).items()}
 
 
-def save_test_urls(test_urls: dict[str, float], save_path: str = resolve_resource_path("test_urls_save.json")):
+def save_test_urls(test_urls: dict[str, float] | dict[str, UrlBaseline], save_path: str = resolve_resource_path("test_urls_save.json")):
     if not exists(save_path):
         open(save_path, "x").close()
 
     with open(save_path, "w") as file:
-        json.dump(test_urls, file)
+        json.dump({url: {"mean": value.mean, "variance": value.variance} if isinstance(value, UrlBaseline) else value
+                   for url, value in test_urls.items()}, file)
 
 
 def load_request_args(alt_headers: dict[str, str], alt_params: dict[str, str], ssl_support_required: bool = True) -> tuple[dict[str, str], dict[str, str]]:
@@ -0,0 +1,73 @@
+from concurrent.futures import Future, wait, FIRST_COMPLETED
+from typing import Callable, Iterable, Any, TypeVar
+
+from .thread_manager import ThreadManager
+
+
+T = TypeVar("T")
+
+
+def validate_concurrently(candidates: Iterable[T],
+                          check: Callable[[T], float | None],
+                          max_workers: int = 16,
+                          required: int | None = None,
+                          on_result: Callable[[T, float], Any] | None = None) -> list[tuple[T, float]]:
+    """
+    Checks all candidates in parallel on the shared ThreadManager pool.
+
+    At most max_workers checks are submitted at the same time and candidates are only taken from the
+    (possibly lazy) candidates iterable when a check finished, so arbitrarily large candidate streams can be validated.
+
+    :param candidates: The candidates to check (e.g. proxies)
+    :param check: Returns the score of a candidate (lower is better) or None if the candidate is invalid
+    :param max_workers: The maximum number of concurrent checks
+    :param required: Stop early once this many valid candidates were found. Pending checks are cancelled.
+        None to check all candidates
+    :param on_result: Called (in the calling thread) with every valid candidate and its score as soon as it is available
+    :return: All valid candidates with their scores in the order they were validated
+    """
+    results: list[tuple[T, float]] = []
+    candidates = iter(candidates)
+    pending: set[Future] = set()
+    submitted: dict[Future, T] = {}
+    exhausted = False
+
+    executor = ThreadManager.shared_executor()
+
+    try:
+        while True:
+            while not exhausted and len(pending) < max_workers:
+                try:
+                    candidate = next(candidates)
+                except StopIteration:
+                    exhausted = True
+                    break
+
+                future = executor.submit(check, candidate)
+                submitted[future] = candidate
+                pending.add(future)
+
+            if not pending:
+                break
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                candidate = submitted.pop(future)
+                score = future.result()
+
+                if score is None:
+                    continue
+
+                results.append((candidate, score))
+                if on_result is not None:
+                    on_result(candidate, score)
+
+            if required is not None and len(results) >= required:
+                break
+    finally:
+        # Running checks cannot be interrupted, but their results are discarded
+        for future in pending:
+            future.cancel()
+
+    return results
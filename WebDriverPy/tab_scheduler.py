@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+import time
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Generator, Self, TYPE_CHECKING
+
+from selenium.common import TimeoutException, WebDriverException
+
+if TYPE_CHECKING:
+    from .driver import WebDriver
+    from .driver_scripts import DriverScript
+
+
+@dataclass(frozen=True, slots=True)
+class Load:
+    """
+    Yielded by DriverScript.run_steps() to load a page without blocking other scripts. Resumes the script with None
+    once the page finished loading
+    """
+    url: str
+    timeout: float | None = None
+    """The timeout in seconds. None for the load_timeout of the scheduler"""
+
+
+@dataclass(frozen=True, slots=True)
+class Sleep:
+    """
+    Yielded by DriverScript.run_steps() to pause the script without blocking other scripts. Resumes the script with None
+    """
+    seconds: float
+
+
+class WaitFor:
+    """
+    Yielded by DriverScript.run_steps() to wait for any of the conditions (see WebDriver.wait_any()) without blocking
+    other scripts. Resumes the script with the (index, value) of the first condition holding
+    """
+
+    __slots__ = ("conditions", "timeout")
+
+    def __init__(self, *conditions: tuple[str, str] | tuple[str, str, str] | str, timeout: float | None = None):
+        """
+        :param conditions: The conditions in the format of WebDriver.wait_any()
+        :param timeout: The timeout in seconds. None for the default timeout of the driver's wait_policy
+        """
+        self.conditions = conditions
+        self.timeout = timeout
+
+    def __repr__(self) -> str:
+        return f"WaitFor({', '.join(map(repr, self.conditions))}, timeout={self.timeout})"
+
+
+WaitPoint = Load | Sleep | WaitFor
+
+
+@dataclass(slots=True)
+class _Task:
+    index: int
+    script: DriverScript
+    steps: Generator[WaitPoint, Any, Any]
+    handle: str | None = None
+    owns_tab: bool = False
+    point: WaitPoint | None = None
+    deadline: float = 0
+    budget_deadline: float | None = None
+
+
+class TabScheduler:
+    """
+    Runs several DriverScripts interleaved in the tabs of one WebDriver, such that one browser handles several jobs
+    and their page loads and waits overlap.
+
+    Every script runs in its own tab via DriverScript.run_steps(), a generator yielding Load, WaitFor and Sleep points.
+    The scheduler only switches tabs at these points: Loads are started without blocking, and all pending points are
+    checked round-robin (a single command per check) until one is ready and its script can continue.
+    Scripts not overriding run_steps() run completely when they are started (without interleaving).
+
+    Note that checking a tab, which is still loading, may block until its page loaded (Chromedriver waits for pending
+    navigations), while the pages of all other tabs keep loading in the background.
+
+    Usage:
+        results = TabScheduler(driver).add(OpenGoogle).add(GrabTempMail).run()
+    """
+
+    def __init__(self, driver: WebDriver, max_tabs: int = 4, load_timeout: float = 30, close_tabs: bool = True):
+        """
+        :param driver: The driver to run the scripts with
+        :param max_tabs: The maximum number of scripts (tabs) running at the same time. Further scripts are queued
+        :param load_timeout: The default timeout of Load points in seconds
+        :param close_tabs: Whether to close the tab of a script once it finished
+        """
+        if max_tabs < 1:
+            raise ValueError(f"max_tabs must be at least 1, not {max_tabs}")
+
+        self.driver = driver
+        self.max_tabs = max_tabs
+        self.load_timeout = load_timeout
+        self.close_tabs = close_tabs
+
+        self._queued: list[tuple[DriverScript, tuple, dict]] = []
+        self._active: list[_Task] = []
+        self._results: list[Any] = []
+        self._failed = False
+        self._current: str | None = None
+
+    def add(self, script: DriverScript | type[DriverScript], *args, **kwargs) -> Self:
+        """
+        :param script: A DriverScript or DriverScript subclass
+        :param args: For subclasses the arguments of the constructor (after the driver), otherwise of run_steps()
+        :param kwargs: For subclasses the keyword arguments of the constructor, otherwise of run_steps()
+        :return: The scheduler
+        """
+        if isinstance(script, type):
+            self._queued.append((script(self.driver, *args, **kwargs), (), {}))
+        else:
+            self._queued.append((script, args, kwargs))
+        return self
+
+    def _switch(self, task: _Task) -> None:
+        if self._current != task.handle:
+            self.driver.switch_to_tab(task.handle)
+            self._current = task.handle
+
+    def _open(self, task: _Task) -> None:
+        if self._current is None:
+            self._current = self.driver.current_window_handle
+
+        if self.driver.is_on_empty_tab and self._current not in self._handles():
+            task.owns_tab = False
+        else:
+            self.driver.open_new_tab()
+            self._current = self.driver.current_window_handle
+            task.owns_tab = True
+
+        task.handle = self._current
+
+    def _handles(self) -> set[str]:
+        return {task.handle for task in self._active}
+
+    def _close(self, task: _Task) -> None:
+        if not self.close_tabs or not task.owns_tab:
+            return
+
+        self._switch(task)
+        self.driver.close_tab()
+        self._current = None
+
+        remaining = self.driver.window_handles
+        if remaining:
+            self.driver.switch_to_tab(remaining[0])
+            self._current = remaining[0]
+
+    def _enter(self, task: _Task, point: WaitPoint) -> None:
+        """
+        Starts waiting at the point
+        """
+        task.point = point
+        now = time.monotonic()
+
+        match point:
+            case Load():
+                self.driver.start_loading(point.url)
+                timeout = point.timeout if point.timeout is not None else self.load_timeout
+            case Sleep():
+                timeout = point.seconds
+            case WaitFor():
+                timeout = self.driver.wait_policy.timeout(None, point.timeout)
+            case _:
+                raise TypeError(f"{type(task.script).__name__}.run_steps() yielded {point!r}, "
+                                f"expected Load, WaitFor or Sleep")
+
+        task.deadline = now + timeout
+        if task.budget_deadline is not None:
+            task.deadline = min(task.deadline, task.budget_deadline)
+
+    def _advance(self, task: _Task, value: Any = None, error: Exception | None = None) -> bool:
+        """
+        Resumes the script until its next wait point
+        :return: Whether the script finished
+        """
+        self._switch(task)
+
+        try:
+            point = task.steps.throw(error) if error is not None else task.steps.send(value)
+        except StopIteration as stop:
+            self._results[task.index] = stop.value
+            return True
+        except Exception as e:
+            self.driver.output.log(f"Script {type(task.script).__name__} failed: {e}", "SCRIPT-ERROR")
+            self._results[task.index] = e
+            self._failed = True
+            return True
+
+        try:
+            self._enter(task, point)
+        except Exception as e:
+            return self._advance(task, error=e)
+        return False
+
+    def _poll(self, task: _Task) -> tuple[bool, Any]:
+        """
+        :return: Whether the wait point of the task is ready and the value to resume the script with
+        """
+        point = task.point
+
+        if isinstance(point, Sleep):
+            return time.monotonic() >= task.deadline, None
+
+        self._switch(task)
+
+        if isinstance(point, Load):
+            return self.driver.is_page_loaded(), None
+
+        result = self.driver.check_any(*point.conditions)
+        return result is not None, result
+
+    def _start(self, index: int, script: DriverScript, args: tuple, kwargs: dict) -> _Task:
+        task = _Task(index, script, script.run_steps(*args, **kwargs))
+        if script.wait_budget is not None:
+            task.budget_deadline = time.monotonic() + script.wait_budget
+
+        self._open(task)
+        self._active.append(task)
+        self.driver.output.log(f'Scheduling script "{type(script).__name__}" in tab {task.handle}', "SCRIPT")
+
+        if self._advance(task):
+            self._finish(task)
+        return task
+
+    def _finish(self, task: _Task) -> None:
+        self._active.remove(task)
+        self._close(task)
+
+    def run(self, return_exceptions: bool = False) -> list[Any]:
+        """
+        :param return_exceptions: Whether to return the exceptions of failed scripts as their results instead of
+            raising the first one after all scripts finished
+        :return: The results of all added scripts in the order they were added
+        """
+        queued = deque(enumerate(self._queued))
+        self._queued = []
+        self._active = []
+        self._results = [None] * len(queued)
+        self._failed = False
+
+        intervals = self.driver.wait_policy.poll_intervals()
+
+        while queued or self._active:
+            while queued and len(self._active) < self.max_tabs:
+                index, (script, args, kwargs) = queued.popleft()
+                self._start(index, script, args, kwargs)
+
+            progressed = False
+
+            for task in list(self._active):
+                try:
+                    ready, value = self._poll(task)
+                    error = None
+                except WebDriverException as e:
+                    # Raised inside the script at its wait point
+                    ready, value, error = False, None, e
+
+                if error is not None:
+                    finished = self._advance(task, error=error)
+                elif ready:
+                    finished = self._advance(task, value)
+                elif time.monotonic() >= task.deadline:
+                    finished = self._advance(task, error=TimeoutException(f"Timed out waiting for {task.point!r}"))
+                else:
+                    continue
+
+                progressed = True
+                if finished:
+                    self._finish(task)
+
+            if progressed:
+                intervals = self.driver.wait_policy.poll_intervals()
+            elif self._active:
+                time.sleep(next(intervals))
+
+        if self._failed and not return_exceptions:
+            raise next(result for result in self._results if isinstance(result, Exception))
+        return self._results
@@ -0,0 +1,138 @@
+import string
+
+from dataclasses import dataclass
+from itertools import cycle
+from random import Random
+
+from selenium.webdriver import Keys, ActionChains
+from selenium.webdriver.remote.webdriver import WebDriver as RemoteWebDriver
+from selenium.webdriver.remote.webelement import WebElement
+
+
+@dataclass(frozen=True, slots=True)
+class Keystroke:
+    key: str
+    """The character or special key (e.g. Keys.BACKSPACE)"""
+    hold: float
+    """The time in seconds between pressing and releasing the key"""
+    delay: float
+    """The time in seconds between releasing the key and pressing the next one"""
+
+
+class TypingEngine:
+    """
+    Types like a human: Precomputes the whole keystroke schedule (typos and their corrections, accelerating typing
+    speed) and replays it as W3C actions, so the browser receives real key events with the scheduled pauses
+    from a single perform() command per field instead of one command (and a blocking sleep) per character.
+
+    Pass a seed for reproducible schedules.
+    """
+
+    special_keys = {"\n": Keys.ENTER, "\r": Keys.ENTER, "\t": Keys.TAB}
+
+    def __init__(self,
+                 avg_char_delay: float = 0.2,
+                 mistype_chances: tuple[int, ...] = (15, 5, 22),
+                 hold_range: tuple[float, float] = (0.02, 0.06),
+                 max_batch_duration: float = 30,
+                 seed: int | None = None):
+        """
+        :param avg_char_delay: The average delay per character in seconds
+        :param mistype_chances: The cycled chances (1 in n) of mistyping a letter. The next chance is used after every typo
+        :param hold_range: The range of the time in seconds a key is held down (taken from the delay after it)
+        :param max_batch_duration: The maximum duration in seconds of a single perform() command.
+            Longer schedules are split to stay well below the HTTP timeout of the driver connection
+        :param seed: The seed of the random number generator. None for a random seed
+        """
+        self.avg_char_delay = avg_char_delay
+        self.mistype_chances = mistype_chances
+        self.hold_range = hold_range
+        self.max_batch_duration = max_batch_duration
+        self.random = Random(seed)
+
+    def seed(self, seed: int | None) -> None:
+        self.random.seed(seed)
+
+    def _keystroke(self, key: str, delay: float) -> Keystroke:
+        hold = min(self.random.uniform(*self.hold_range), delay / 2)
+        return Keystroke(self.special_keys.get(key, key), hold, delay - hold)
+
+    def schedule(self, text: str, may_miss: bool = True) -> list[Keystroke]:
+        """
+        :param text: The text to type
+        :param may_miss: Whether to occasionally mistype letters (and correct them immediately)
+        :return: The keystrokes typing the text
+        """
+        avg_wait = self.avg_char_delay * 2
+        acc_factor = 1.5
+        min_avg_wait = self.avg_char_delay * 0.5
+
+        chance_state = cycle(self.mistype_chances)
+        chance_to_mistype = next(chance_state)
+
+        keystrokes = []
+
+        for char in text:
+            if may_miss and char in string.ascii_letters and self.random.randint(1, chance_to_mistype) == 1:
+                keystrokes.append(self._keystroke(self.random.choice(string.ascii_letters), avg_wait * 0.8))
+                keystrokes.append(self._keystroke(Keys.BACKSPACE, avg_wait / 2))
+
+                # Accelerate once
+                acc_factor = min(acc_factor + 0.125, 2.5)
+                chance_to_mistype = next(chance_state)
+
+            s_time = self.random.uniform(avg_wait / acc_factor, avg_wait * (3.25 - acc_factor))
+
+            acc_factor = min(acc_factor + 0.125, 2.5)
+            if s_time > self.avg_char_delay:
+                avg_wait = max(avg_wait - s_time + self.avg_char_delay, min_avg_wait)
+
+            keystrokes.append(self._keystroke(char, max(s_time, min_avg_wait)))
+
+        return keystrokes
+
+    def _batches(self, keystrokes: list[Keystroke]) -> list[list[Keystroke]]:
+        batches, batch, duration = [], [], 0.0
+
+        for keystroke in keystrokes:
+            if batch and duration + keystroke.hold + keystroke.delay > self.max_batch_duration:
+                batches.append(batch)
+                batch, duration = [], 0.0
+
+            batch.append(keystroke)
+            duration += keystroke.hold + keystroke.delay
+
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def replay(self, driver: RemoteWebDriver, element: WebElement, keystrokes: list[Keystroke]) -> None:
+        """
+        :param driver: The driver to perform the actions with
+        :param element: The element to type into. It is focused first (with the caret at the end), like send_keys() does
+        :param keystrokes: The keystrokes to replay
+        """
+        driver.execute_script(
+            "var element = arguments[0];"
+            "if (document.activeElement !== element) {"
+            "    element.focus();"
+            "    try { element.setSelectionRange(element.value.length, element.value.length); } catch (e) {}"
+            "}",
+            element
+        )
+
+        for batch in self._batches(keystrokes):
+            actions = ActionChains(driver)
+
+            for keystroke in batch:
+                actions.key_down(keystroke.key).pause(keystroke.hold).key_up(keystroke.key).pause(keystroke.delay)
+
+            actions.perform()
+
+    def type(self, driver: RemoteWebDriver, element: WebElement, text: str, may_miss: bool = True) -> list[Keystroke]:
+        """
+        :return: Types the text into the element and returns the replayed keystrokes
+        """
+        keystrokes = self.schedule(text, may_miss)
+        self.replay(driver, element, keystrokes)
+        return keystrokes
@@ -1,5 +1,5 @@
 from typing import Callable, Any
-from functools import wraps
+from functools import wraps, cache
 
 from random import choices
 
@@ -8,6 +8,8 @@ from os import remove, listdir, makedirs
 from os.path import exists, join, splitext, abspath, isfile, dirname, basename
 from zipfile import ZipFile
 
+from selenium.webdriver.common.by import By
+
 
 def ensure_exists(dir_name: str) -> str:
     makedirs(dir_name, exist_ok=True)
@@ -117,6 +119,15 @@ def read_content(file_path: str) -> str:
     return content
 
 
+@cache
+def read_script(script_name: str) -> str:
+    """
+    :param script_name: The file name of a javascript file in the package's scripts directory (e.g. "filterByAttributes.js")
+    :return: The content of the script (cached after the first read)
+    """
+    return read_content(resolve_resource_path(join("./scripts", script_name)))
+
+
 def read_template_content(file_path: str, template_identifier_to_value: dict[str, str]) -> str:
     content = read_content(file_path)
 
@@ -197,3 +208,144 @@ def clear_files(directory: str, condition: Callable[[str], bool] = lambda _: Tru
         if isfile(element) and condition(element):
             remove(element)
 
+
+def css_escape_identifier(identifier: str) -> str:
+    """
+    :return: The identifier escaped for usage in a CSS selector (like CSS.escape() in browsers)
+    """
+    escaped = []
+
+    for i, char in enumerate(identifier):
+        if (char.isalnum() and char.isascii() and not (i == 0 and char.isdigit())) or char in "_-" or ord(char) > 0x7f:
+            escaped.append(char)
+        elif char.isdigit():
+            # Identifiers must not start with a digit
+            escaped.append(f"\\{ord(char):x} ")
+        else:
+            escaped.append(f"\\{char}")
+
+    return "".join(escaped)
+
+
+def css_string(value: str) -> str:
+    """
+    :return: The value as a quoted CSS string (e.g. for attribute selectors like [name="..."])
+    """
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\a ") + '"'
+
+
+_ascii_upper = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+_ascii_lower = _ascii_upper.lower()
+
+
+def compile_tag_locator(tag: str, by: str, value: str) -> tuple[str, str] | None:
+    """
+    Compiles "elements located by (by, value) with the given tag name" into a single locator.
+
+    :param tag: The lowercase tag name
+    :param by: The resolved locator strategy (a By constant)
+    :param value: The locator value
+    :return: The compiled (by, value) locator or None if the combination cannot be compiled
+    """
+    if not tag.replace("-", "").isalnum() or not tag[0].isalpha():
+        return None
+
+    if by == By.CLASS_NAME and (not value or any(char.isspace() for char in value)):
+        # Compound class names are no single class, leave them to Selenium
+        return None
+
+    match by:
+        case By.ID:
+            return By.CSS_SELECTOR, f"{tag}[id={css_string(value)}]"
+        case By.NAME:
+            return By.CSS_SELECTOR, f"{tag}[name={css_string(value)}]"
+        case By.CLASS_NAME:
+            return By.CSS_SELECTOR, f"{tag}.{css_escape_identifier(value)}"
+        case By.TAG_NAME:
+            return By.CSS_SELECTOR, tag if value.lower() in (tag, "*") else f"{tag}:not({tag})"
+        case By.CSS_SELECTOR:
+            # "tag:is(selector)" would silently match nothing for invalid selectors instead of raising,
+            # since :is() parses its arguments forgivingly
+            return None
+        case By.XPATH:
+            # Case-insensitive like WebElement.tag_name.lower(), since SVG tags are mixed-case (e.g. "foreignObject")
+            return By.XPATH, f"({value})[translate(local-name(), '{_ascii_upper}', '{_ascii_lower}')='{tag}']"
+        case By.LINK_TEXT | By.PARTIAL_LINK_TEXT if tag == "a":
+            return by, value
+        case _:
+            return None
+
+
+def compile_in_page_locator(by: str, value: str) -> tuple[str, str] | None:
+    """
+    :param by: The resolved locator strategy (a By constant)
+    :param value: The locator value
+    :return: ("css", selector) or ("xpath", expression) evaluable inside the page, or None if the locator
+        cannot be evaluated by page scripts (e.g. link texts, which depend on the rendered text, or compound class names)
+    """
+    match by:
+        case By.CSS_SELECTOR:
+            return "css", value
+        case By.XPATH:
+            return "xpath", value
+        case By.ID:
+            return "css", f"[id={css_string(value)}]"
+        case By.NAME:
+            return "css", f"[name={css_string(value)}]"
+        case By.CLASS_NAME if value and not any(char.isspace() for char in value):
+            return "css", f".{css_escape_identifier(value)}"
+        case By.TAG_NAME:
+            # The universal selector matches any tag, like Selenium's tag name "*"
+            return "css", value if value == "*" else css_escape_identifier(value)
+        case _:
+            return None
+
+
+def compile_extraction_field(spec: str | list | dict) -> dict[str, Any]:
+    """
+    Compiles a field of WebDriver.extract() into the form evaluated by scripts/extractRecords.js.
+
+    :param spec: "sub-selector[::text | ::html | ::attr(name) | ::attrs]" (an empty sub-selector refers to the record
+        element itself, sub-selectors starting with "./", "../" or "(" are XPath expressions evaluated with the record
+        as context node, so paths inside parentheses must be relative as well, e.g. "(.//span)[2]"),
+        [spec] for the values of all matches instead of the first one, or
+        {"selector": sub-selector, "fields": {...}, "all": bool} for nested records
+    :return: The compiled field
+    """
+    if isinstance(spec, list):
+        if len(spec) != 1:
+            raise ValueError(f"A list field must contain exactly one field specification: {spec}")
+        return compile_extraction_field(spec[0]) | {"all": True}
+
+    if isinstance(spec, dict):
+        selector = spec.get("selector", "")
+        compiled = compile_extraction_field(selector)
+        compiled["all"] = spec.get("all", False)
+
+        if spec.get("fields") is not None:
+            compiled["value"] = "record"
+            compiled["fields"] = {name: compile_extraction_field(field) for name, field in spec["fields"].items()}
+        return compiled
+
+    selector, _, value = spec.partition("::")
+    selector = selector.strip()
+    value = value.strip() or "text"
+    attribute = None
+
+    if value.startswith("attr(") and value.endswith(")"):
+        value, attribute = "attr", value[len("attr("):-1].strip()
+    elif value not in ("text", "html", "attrs"):
+        raise ValueError(f"Unknown extraction value \"::{value}\" in {spec}")
+
+    if not selector:
+        kind = "self"
+    elif selector.startswith(("./", "../", "(")):
+        kind = "xpath"
+    elif selector.startswith("/"):
+        # Absolute paths would select from the document root, i.e. the same element(s) for every record
+        raise ValueError(f"XPath sub-selectors must be relative to the record, e.g. \".{selector}\" instead of "
+                         f"\"{selector}\" in {spec}")
+    else:
+        kind = "css"
+
+    return {"kind": kind, "selector": selector, "value": value, "attribute": attribute, "all": False, "fields": None}
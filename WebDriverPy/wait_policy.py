@@ -0,0 +1,212 @@
+import time
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from random import uniform
+from threading import Lock
+from typing import Any, Callable, Hashable, Iterator
+
+from selenium.common import NoSuchElementException, TimeoutException
+
+
+@dataclass(slots=True)
+class TimeToAppear:
+    ewma: float
+    """Exponentially weighted moving average of the time in seconds a wait took to succeed"""
+    deviation: float = 0
+    """Exponentially weighted mean absolute deviation from the average"""
+    samples: int = 1
+
+
+class WaitPolicy:
+    """
+    Decides how long and how often the WebDriver waits.
+
+    Polling starts fast (initial_poll) and backs off exponentially up to max_poll, with some jitter, so fast pages
+    are detected within milliseconds while slow pages do not cost a Chromedriver command every few milliseconds.
+
+    Waits without an explicit timeout use a learned timeout per locator, based on how long the locator took to appear
+    before (timeout_factor * (average + 2 * deviation), limited by min_learned_timeout and max_learned_timeout),
+    or default_timeout while fewer than min_samples measurements are known.
+    Learned timeouts only extend default_timeout for slow locators, unless shorten_timeouts is True.
+
+    budget() limits the total time of all waits inside it (e.g. of a whole DriverScript, see DriverScript.wait_budget).
+    Budgets only apply to the thread (and context) they were started in, so scripts sharing a policy do not cut
+    each other's waits short.
+    """
+
+    ignored_exceptions: tuple[type[Exception], ...] = (NoSuchElementException,)
+
+    def __init__(self,
+                 default_timeout: float = 6,
+                 initial_poll: float = 0.05,
+                 max_poll: float = 0.5,
+                 backoff: float = 1.5,
+                 jitter: float = 0.2,
+                 learn_timeouts: bool = True,
+                 timeout_factor: float = 3,
+                 min_learned_timeout: float = 3,
+                 max_learned_timeout: float = 30,
+                 min_samples: int = 3,
+                 alpha: float = 0.3,
+                 shorten_timeouts: bool = False):
+        """
+        :param default_timeout: The timeout in seconds of waits without an explicit or learned timeout
+        :param initial_poll: The first poll interval in seconds
+        :param max_poll: The maximum poll interval in seconds
+        :param backoff: The factor by which the poll interval grows after every unsuccessful poll
+        :param jitter: The relative random deviation of every poll interval (e.g. 0.2 -> +-20%)
+        :param learn_timeouts: Whether to learn timeouts per locator from previous waits
+        :param timeout_factor: The safety factor applied to the expected time to appear
+        :param min_learned_timeout: The minimum learned timeout in seconds
+        :param max_learned_timeout: The maximum learned timeout in seconds
+        :param min_samples: The number of successful waits for a locator before its learned timeout is used
+        :param alpha: The weight of new measurements in the averages
+        :param shorten_timeouts: Whether learned timeouts may be shorter than default_timeout (down to
+            min_learned_timeout), such that waits for fast locators fail sooner
+        """
+        self.default_timeout = default_timeout
+        self.initial_poll = initial_poll
+        self.max_poll = max_poll
+        self.backoff = backoff
+        self.jitter = jitter
+        self.learn_timeouts = learn_timeouts
+        self.timeout_factor = timeout_factor
+        self.min_learned_timeout = min_learned_timeout
+        self.max_learned_timeout = max_learned_timeout
+        self.min_samples = min_samples
+        self.alpha = alpha
+        self.shorten_timeouts = shorten_timeouts
+
+        self._learned: dict[Hashable, TimeToAppear] = {}
+        self._deadlines: ContextVar[tuple[float, ...]] = ContextVar(f"wait_budget_{id(self)}", default=())
+        self._lock = Lock()
+
+    def poll_intervals(self) -> Iterator[float]:
+        """
+        :return: An endless iterator of poll intervals in seconds
+        """
+        interval = self.initial_poll
+
+        while True:
+            yield interval * uniform(1 - self.jitter, 1 + self.jitter)
+            interval = min(interval * self.backoff, self.max_poll)
+
+    def learned_timeout(self, key: Hashable) -> float | None:
+        """
+        :param key: The key of the wait (e.g. the resolved (by, value) locator)
+        :return: The learned timeout in seconds or None if not enough measurements are known
+        """
+        with self._lock:
+            measured = self._learned.get(key)
+
+        if measured is None or measured.samples < self.min_samples:
+            return None
+
+        expected = measured.ewma + 2 * measured.deviation
+        return min(max(self.timeout_factor * expected, self.min_learned_timeout), self.max_learned_timeout)
+
+    def timeout(self, key: Hashable | None = None, timeout: float | None = None) -> float:
+        """
+        :param key: The key of the wait (e.g. the resolved (by, value) locator) or None for waits, which are not learned
+        :param timeout: An explicit timeout in seconds, which takes precedence over learned and default timeouts
+        :return: The timeout to use, limited by the remaining budget
+        """
+        if timeout is None:
+            learned = self.learned_timeout(key) if self.learn_timeouts and key is not None else None
+
+            if learned is None:
+                timeout = self.default_timeout
+            else:
+                timeout = learned if self.shorten_timeouts else max(learned, self.default_timeout)
+
+        remaining = self.remaining_budget()
+        if remaining is not None:
+            if remaining <= 0:
+                raise TimeoutException("The wait budget is exhausted")
+            timeout = min(timeout, remaining)
+
+        return timeout
+
+    def record(self, key: Hashable | None, elapsed: float) -> None:
+        """
+        :param key: The key of the wait, which succeeded
+        :param elapsed: The time in seconds the wait took
+        """
+        if key is None or not self.learn_timeouts:
+            return
+
+        with self._lock:
+            measured = self._learned.get(key)
+
+            if measured is None:
+                self._learned[key] = TimeToAppear(elapsed)
+                return
+
+            measured.deviation = self.alpha * abs(elapsed - measured.ewma) + (1 - self.alpha) * measured.deviation
+            measured.ewma = self.alpha * elapsed + (1 - self.alpha) * measured.ewma
+            measured.samples += 1
+
+    def forget(self, key: Hashable | None = None) -> None:
+        """
+        :param key: The key to forget the measurements of. None to forget all measurements
+        """
+        with self._lock:
+            if key is None:
+                self._learned.clear()
+            else:
+                self._learned.pop(key, None)
+
+    def remaining_budget(self) -> float | None:
+        """
+        :return: The remaining time in seconds of the innermost active budget or None if no budget is active
+        """
+        deadlines = self._deadlines.get()
+
+        if not deadlines:
+            return None
+        return min(deadlines) - time.monotonic()
+
+    @contextmanager
+    def budget(self, seconds: float) -> Iterator[None]:
+        """
+        :param seconds: The total time all waits inside the context may take. Waits are cut short to the remaining
+            budget and fail immediately once it is exhausted. Nested budgets can only shorten the outer budget
+        """
+        token = self._deadlines.set((*self._deadlines.get(), time.monotonic() + seconds))
+        try:
+            yield
+        finally:
+            self._deadlines.reset(token)
+
+    def until(self, driver: Any, condition: Callable[[Any], Any], timeout: float, reverse: bool = False,
+              message: str = "") -> Any:
+        """
+        Like WebDriverWait.until() (or until_not() if reverse is True), but polling according to the policy.
+
+        :param driver: The driver passed to the condition
+        :param condition: The condition to wait for
+        :param timeout: The timeout in seconds. The condition is always checked at least once
+        :param reverse: Whether to wait until the condition no longer holds
+        :param message: The message of the TimeoutException raised on timeout
+        :return: The last value of the condition
+        """
+        end = time.monotonic() + timeout
+        intervals = self.poll_intervals()
+
+        while True:
+            try:
+                value = condition(driver)
+
+                if bool(value) != reverse:
+                    return value
+            except self.ignored_exceptions:
+                if reverse:
+                    return True
+
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutException(message)
+
+            time.sleep(min(next(intervals), remaining))
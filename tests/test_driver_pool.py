@@ -0,0 +1,81 @@
+import time
+
+import pytest
+
+from WebDriverPy.driver_pool import DriverPool
+from WebDriverPy.exceptions import DriverPoolException
+
+
+class FakeOutput:
+    def log(self, *args, **kwargs) -> None:
+        pass
+
+
+class FakeDriver:
+    def __init__(self):
+        self.output = FakeOutput()
+        self.running = True
+        self.is_alive = True
+        self.resets = 0
+        self.on_reset = None
+
+    def init(self) -> None:
+        self.running = True
+
+    def reset_session(self) -> None:
+        self.resets += 1
+        if self.on_reset is not None:
+            self.on_reset()
+
+    def quit(self) -> None:
+        self.is_alive = False
+
+
+def test_leases_reset_and_reuse_drivers():
+    with DriverPool(min_size=1, max_size=1, driver_factory=FakeDriver, maintenance_interval=None) as pool:
+        with pool.lease() as first:
+            pass
+
+        with pool.lease() as second:
+            assert second is first
+            assert first.resets == 1
+
+        with pytest.raises(DriverPoolException):
+            pool.release(first)
+
+
+def test_acquire_times_out_when_exhausted():
+    with DriverPool(min_size=0, max_size=1, driver_factory=FakeDriver, maintenance_interval=None) as pool:
+        with pool.lease():
+            with pytest.raises(DriverPoolException):
+                pool.acquire(timeout=0.05)
+
+
+def test_release_racing_close_quits_the_driver():
+    pool = DriverPool(min_size=0, max_size=1, driver_factory=FakeDriver, maintenance_interval=None)
+    driver = pool.acquire()
+    driver.on_reset = pool.close
+
+    pool.release(driver)
+
+    assert pool.idle_count == 0
+    assert not driver.is_alive
+
+
+def test_maintenance_survives_failing_starts():
+    attempts = []
+
+    def factory() -> FakeDriver:
+        attempts.append(None)
+        if len(attempts) < 3:
+            raise RuntimeError("Chrome failed to start")
+        return FakeDriver()
+
+    with pytest.warns(RuntimeWarning, match="Chrome failed to start"):
+        with DriverPool(min_size=1, max_size=1, driver_factory=factory, warm_up=False,
+                        maintenance_interval=0.01) as pool:
+            deadline = time.monotonic() + 5
+            while pool.idle_count == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            assert pool.idle_count == 1
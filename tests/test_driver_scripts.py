@@ -0,0 +1,112 @@
+from threading import Event, Thread
+
+import pytest
+
+from WebDriverPy.driver_scripts import DriverScript, OpeningDriverScript, OpenGoogle, GrabTempMail
+from WebDriverPy.tab_scheduler import Load, Sleep, WaitFor
+from WebDriverPy.wait_policy import WaitPolicy
+
+
+class FakeOutput:
+    def log(self, *args, **kwargs) -> None:
+        pass
+
+
+class FakeDriver:
+    def __init__(self, conditions: dict | None = None):
+        self.output = FakeOutput()
+        self.wait_policy = WaitPolicy()
+        self.is_on_empty_tab = True
+        self.conditions = conditions or {}
+        self.calls = []
+
+    def get(self, url: str) -> None:
+        self.calls.append(("get", url))
+
+    def wait(self, amount: float) -> "FakeDriver":
+        self.calls.append(("wait", amount))
+        return self
+
+    def wait_any(self, *conditions, timeout: float | None = None):
+        self.calls.append(("wait_any", conditions, timeout))
+        if conditions[0] not in self.conditions:
+            raise TimeoutError(conditions[0])
+        return 0, self.conditions[conditions[0]]
+
+
+def test_run_only_subclasses_keep_their_logic_in_run_steps():
+    class OpenAndRead(OpeningDriverScript):
+        def run(self) -> str:
+            super().run()
+            return "read"
+
+    driver = FakeDriver()
+    steps = OpenAndRead(driver, "https://example.com").run_steps()
+
+    with pytest.raises(StopIteration) as stop:
+        next(steps)
+    assert stop.value.value == "read"
+    assert driver.calls == [("get", "https://example.com")]
+
+
+def test_opening_scripts_yield_the_load():
+    driver = FakeDriver()
+
+    assert next(OpeningDriverScript(driver, "https://example.com").run_steps()) == Load("https://example.com")
+    assert driver.calls == []
+
+
+def test_run_shares_the_steps():
+    google = FakeDriver({("q", "name", "clickable"): "element"})
+    assert OpenGoogle(google).run() is google
+    assert google.calls[0] == ("get", "https://google.com")
+    assert google.calls[1][0] == "wait_any"
+
+    script = GrabTempMail(FakeDriver())
+    steps = script.run_steps()
+    assert next(steps) == Load("https://temp-mail.io")
+    condition = next(steps).conditions[0]
+
+    mail = FakeDriver({condition: "someone@example.com"})
+    assert GrabTempMail(mail).run() == "someone@example.com"
+
+
+def test_run_blocking_throws_errors_into_the_steps():
+    class Retrying(DriverScript):
+        def run_steps(self, *args, **kwargs):
+            yield Sleep(0.5)
+            try:
+                yield WaitFor("return missing")
+            except TimeoutError:
+                return "gave up"
+
+    driver = FakeDriver()
+    script = Retrying(driver)
+
+    assert script.run_blocking(script.run_steps()) == "gave up"
+    assert driver.calls[0] == ("wait", 0.5)
+
+
+def test_wait_budgets_of_scripts_sharing_a_driver_are_independent():
+    class Budgeted(DriverScript):
+        wait_budget = 0.5
+
+        def run(self, started: Event, proceed: Event) -> float:
+            started.set()
+            proceed.wait(5)
+            return self.driver.wait_policy.timeout()
+
+    driver = FakeDriver()
+    driver.wait_policy.default_timeout = 10
+    started, proceed, results = Event(), Event(), []
+
+    thread = Thread(target=lambda: results.append(Budgeted(driver).run(started, proceed)))
+    thread.start()
+    started.wait(5)
+
+    # The budget of the script running in the other thread does not limit this one
+    assert driver.wait_policy.timeout() == 10
+    proceed.set()
+    thread.join()
+
+    assert 0 < results[0] <= 0.5
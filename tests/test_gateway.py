@@ -0,0 +1,221 @@
+import socket
+import socketserver
+import threading
+
+import pytest
+
+from WebDriverPy.subpackages.PyProxies.gateway import ProxyGateway
+from WebDriverPy.subpackages.PyProxies.proxy import Proxy
+
+
+class EchoHandler(socketserver.BaseRequestHandler):
+    def handle(self) -> None:
+        while data := self.request.recv(4096):
+            self.request.sendall(data)
+
+
+class ConnectProxyHandler(socketserver.StreamRequestHandler):
+    """
+    A minimal HTTP proxy standing in for an upstream proxy: It answers CONNECT requests and tunnels the connection
+    """
+
+    def handle(self) -> None:
+        request_line = self.rfile.readline().decode("latin-1")
+        while self.rfile.readline() not in (b"\r\n", b""):
+            pass
+
+        method, target, _ = request_line.split(" ", maxsplit=2)
+        assert method == "CONNECT"
+
+        host, port = target.rsplit(":", maxsplit=1)
+        target_socket = socket.create_connection((host, int(port)))
+        self.server.tunnels += 1
+        self.wfile.write(b"HTTP/1.1 200 Connection Established\r\n\r\n")
+
+        def forward(source: socket.socket, destination: socket.socket) -> None:
+            try:
+                while data := source.recv(4096):
+                    destination.sendall(data)
+            except OSError:
+                pass
+            finally:
+                destination.close()
+
+        threading.Thread(target=forward, args=(target_socket, self.request), daemon=True).start()
+        forward(self.connection, target_socket)
+
+
+class BrokenSocks5Handler(socketserver.BaseRequestHandler):
+    """
+    A SOCKS5 upstream replying with an invalid address type
+    """
+
+    def handle(self) -> None:
+        self.request.recv(3)
+        self.request.sendall(b"\x05\x00")
+        self.request.recv(4096)
+        self.request.sendall(b"\x05\x00\x00\x09")
+
+
+class OversizedReplyHandler(socketserver.BaseRequestHandler):
+    """
+    An HTTP upstream answering CONNECT with a reply head exceeding the gateway's read limit
+    """
+
+    def handle(self) -> None:
+        self.request.recv(4096)
+        try:
+            self.request.sendall(b"HTTP/1.1 200 OK\r\nX-Padding: " + b"x" * 200_000)
+            self.request.recv(1)
+        except OSError:
+            pass
+
+
+class Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, handler: type[socketserver.BaseRequestHandler]):
+        super().__init__(("127.0.0.1", 0), handler)
+        self.tunnels = 0
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def address(self) -> str:
+        return f"127.0.0.1:{self.server_address[1]}"
+
+
+@pytest.fixture
+def echo():
+    server = Server(EchoHandler)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def upstream():
+    server = Server(ConnectProxyHandler)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def dead_upstream() -> Proxy:
+    # A port nothing listens on anymore
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    return Proxy(f"127.0.0.1:{port}", "http")
+
+
+def open_tunnel(gateway: ProxyGateway, target: str) -> tuple[socket.socket, bytes]:
+    client = socket.create_connection((gateway.host, gateway.port), timeout=5)
+    client.sendall(f"CONNECT {target} HTTP/1.1\r\nHost: {target}\r\n\r\n".encode())
+
+    response = b""
+    while b"\r\n\r\n" not in response:
+        data = client.recv(4096)
+        if not data:
+            break
+        response += data
+    return client, response
+
+
+def test_forwards_through_upstream(echo, upstream):
+    gateway = ProxyGateway([Proxy(upstream.address, "http")], pool_size=0).start()
+
+    try:
+        client, response = open_tunnel(gateway, echo.address)
+        assert response.startswith(b"HTTP/1.1 200")
+
+        client.sendall(b"Hello World!")
+        assert client.recv(4096) == b"Hello World!"
+        client.close()
+    finally:
+        gateway.stop()
+
+    assert upstream.tunnels == 1
+
+
+def test_fails_over_to_next_upstream(echo, upstream, dead_upstream):
+    failures = []
+    live = Proxy(upstream.address, "http")
+    gateway = ProxyGateway([dead_upstream, live], pool_size=0, on_failure=failures.append).start()
+
+    try:
+        client, response = open_tunnel(gateway, echo.address)
+        assert response.startswith(b"HTTP/1.1 200")
+
+        client.sendall(b"ping")
+        assert client.recv(4096) == b"ping"
+        client.close()
+
+        # Sticky mode keeps using the upstream, which worked
+        assert gateway.current == live
+    finally:
+        gateway.stop()
+
+    assert failures == [dead_upstream]
+
+
+def test_fails_over_on_invalid_socks5_reply(echo, upstream):
+    failures = []
+    broken = Server(BrokenSocks5Handler)
+    broken_upstream = Proxy(broken.address, "socks5")
+    gateway = ProxyGateway([broken_upstream, Proxy(upstream.address, "http")], pool_size=0,
+                           on_failure=failures.append).start()
+
+    try:
+        client, response = open_tunnel(gateway, echo.address)
+        assert response.startswith(b"HTTP/1.1 200")
+        client.close()
+    finally:
+        gateway.stop()
+        broken.shutdown()
+        broken.server_close()
+
+    assert failures == [broken_upstream]
+
+
+def test_fails_over_on_oversized_connect_reply(echo, upstream):
+    failures = []
+    oversized = Server(OversizedReplyHandler)
+    oversized_upstream = Proxy(oversized.address, "http")
+    gateway = ProxyGateway([oversized_upstream, Proxy(upstream.address, "http")], pool_size=0,
+                           on_failure=failures.append).start()
+
+    try:
+        client, response = open_tunnel(gateway, echo.address)
+        assert response.startswith(b"HTTP/1.1 200")
+        client.close()
+    finally:
+        gateway.stop()
+        oversized.shutdown()
+        oversized.server_close()
+
+    assert failures == [oversized_upstream]
+
+
+def test_reports_bad_gateway_when_all_upstreams_fail(echo, dead_upstream):
+    gateway = ProxyGateway([dead_upstream], pool_size=0).start()
+
+    try:
+        client, response = open_tunnel(gateway, echo.address)
+        assert response.startswith(b"HTTP/1.1 502")
+        client.close()
+    finally:
+        gateway.stop()
+
+
+def test_stop_closes_established_connections(echo, upstream):
+    gateway = ProxyGateway([Proxy(upstream.address, "http")], pool_size=0).start()
+
+    client, response = open_tunnel(gateway, echo.address)
+    assert response.startswith(b"HTTP/1.1 200")
+
+    gateway.stop()
+    assert not gateway.running
+    assert client.recv(4096) == b""
+    client.close()
@@ -0,0 +1,88 @@
+from WebDriverPy.subpackages.PyProxies.health import ProxyScoreboard
+from WebDriverPy.subpackages.PyProxies.proxy import Proxy
+
+
+def proxies(n: int) -> list[Proxy]:
+    return [Proxy(f"10.0.0.{i}:8080", "http") for i in range(n)]
+
+
+def test_selects_unmeasured_proxies_in_order_first():
+    pool = proxies(3)
+    scoreboard = ProxyScoreboard(pool)
+
+    assert [scoreboard.next() for _ in range(3)] == pool
+
+
+def test_prefers_faster_proxies():
+    fast, slow = proxies(2)
+    scoreboard = ProxyScoreboard([slow, fast])
+
+    scoreboard.report_success(slow, 2.0)
+    scoreboard.report_success(fast, 0.1)
+
+    assert scoreboard.next() == fast
+
+
+def test_demotes_after_consecutive_failures():
+    failing, healthy = proxies(2)
+    scoreboard = ProxyScoreboard([failing, healthy], demote_after=2)
+
+    scoreboard.report_failure(failing)
+    scoreboard.report_failure(failing)
+
+    assert scoreboard.health(failing).demoted
+    assert scoreboard.next() == healthy
+    assert scoreboard.next() == healthy
+
+
+def test_ignores_reports_about_replaced_proxies():
+    old, new = proxies(2)
+    scoreboard = ProxyScoreboard([old])
+    scoreboard.replace([new])
+
+    scoreboard.report_success(old, 0.1)
+    scoreboard.report_failure(old)
+    scoreboard.demote(old)
+
+    assert old not in scoreboard
+    assert len(scoreboard) == 1
+    assert {scoreboard.next() for _ in range(5)} == {new}
+
+
+def test_ignores_reports_about_removed_proxies():
+    removed, kept = proxies(2)
+    scoreboard = ProxyScoreboard([removed, kept])
+    scoreboard.remove(removed)
+
+    scoreboard.report_failure(removed)
+
+    assert removed not in scoreboard
+    assert scoreboard.next() == kept
+
+
+def test_compacts_outdated_heap_entries():
+    pool = proxies(4)
+    scoreboard = ProxyScoreboard(pool)
+
+    for i in range(1000):
+        scoreboard.report_success(pool[i % len(pool)], 0.1 + i % 7 / 10)
+
+    assert len(scoreboard._heap) + len(scoreboard._demoted) <= 2 * len(pool) + 32
+    assert {scoreboard.next() for _ in range(len(pool))} == set(pool)
+
+
+def test_peek_does_not_mark_proxies_as_used():
+    pool = proxies(3)
+    scoreboard = ProxyScoreboard(pool)
+
+    assert scoreboard.peek(exclude=pool[0]) == pool[1]
+    assert scoreboard.peek(exclude=pool[0]) == pool[1]
+    assert [scoreboard.next() for _ in range(3)] == pool
+
+
+def test_mark_used_rotates_past_the_proxy():
+    pool = proxies(3)
+    scoreboard = ProxyScoreboard(pool)
+
+    scoreboard.mark_used(scoreboard.peek())
+    assert scoreboard.next() == pool[1]
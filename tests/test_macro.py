@@ -0,0 +1,134 @@
+import pytest
+
+from selenium.common import JavascriptException
+from selenium.webdriver.common.by import By
+
+from WebDriverPy.driver import WebDriver
+from WebDriverPy.exceptions import DriverMacroException
+from WebDriverPy.macro import DriverMacro
+from WebDriverPy.wait_policy import WaitPolicy
+
+
+class FakeOutput:
+    def log(self, *args, **kwargs) -> None:
+        pass
+
+
+class FakeDriver:
+    def __init__(self, spoofing: bool = False, outcomes=None):
+        self.output = FakeOutput()
+        self.wait_policy = WaitPolicy()
+        self.try_spoofing = spoofing
+        self.mouse_spoofing = spoofing
+        self.keyboard_spoofing = spoofing
+        self.outcomes = outcomes
+        self.calls = []
+        self.cached = []
+
+    @staticmethod
+    def resolve_by(by: str) -> str:
+        return WebDriver.resolve_by(by)
+
+    def ensure_script_timeout(self, timeout: float) -> None:
+        pass
+
+    def execute_async_script(self, script: str, program: list[dict]) -> list[dict]:
+        self.calls.append(("program", [step["op"] for step in program]))
+
+        if isinstance(self.outcomes, Exception):
+            raise self.outcomes
+        return [{"duration": 10, "value": f"element {i}" if step["op"] == "wait" else None, "error": None}
+                for i, step in enumerate(program)]
+
+    def cache_element(self, element, value: str, by: str = "id") -> None:
+        self.cached.append((by, value, element))
+
+    def invalidate_element_cache(self) -> None:
+        self.calls.append(("invalidate",))
+
+    def get(self, url: str) -> None:
+        self.calls.append(("get", url))
+
+    def wait_and_find(self, value: str, by: str = "id", timeout: float | None = None) -> str:
+        self.calls.append(("wait", value))
+        return f"element {value}"
+
+    wait_clickable_and_find = wait_and_find
+
+    def click(self, value: str, by: str = "id") -> "FakeDriver":
+        self.calls.append(("click", value))
+        return self
+
+    def write_to(self, text: str, value: str, by: str = "id") -> "FakeDriver":
+        self.calls.append(("write", value))
+        return self
+
+
+def layout(macro: DriverMacro) -> list[tuple[bool, list[str]]]:
+    return [(segment.in_page, [step.name.split(" (")[0] for step in segment.steps]) for segment in macro.segments()]
+
+
+def test_segments_end_at_navigating_steps():
+    macro = DriverMacro(FakeDriver()) \
+        .get("https://example.com") \
+        .wait_until_clickable("q", by="name") \
+        .click("q", by="name") \
+        .write_to("text", "q", by="name") \
+        .submit_element("q", by="name") \
+        .wait(0.1)
+
+    assert layout(macro) == [
+        (False, ["get https://example.com"]),
+        (True, ["wait until clickable", "click"]),
+        (True, ["write", "submit"]),
+        (True, ["wait 0.1s"]),
+    ]
+
+
+def test_locators_pages_cannot_evaluate_run_natively():
+    macro = DriverMacro(FakeDriver()).wait(0.1).click("Home", by="link text").wait(0.1)
+
+    assert layout(macro) == [(True, ["wait 0.1s"]), (False, ["click"]), (True, ["wait 0.1s"])]
+
+
+@pytest.mark.parametrize("spoofing, trusted_input, in_page", [
+    (False, None, True),
+    (True, None, False),
+    (True, False, True),
+    (False, True, False),
+])
+def test_trusted_input_falls_back_to_native_steps(spoofing, trusted_input, in_page):
+    macro = DriverMacro(FakeDriver(spoofing), trusted_input).click("q").click_js("q").write_to("text", "q")
+
+    assert all(segment.in_page == in_page for segment in macro.segments())
+
+
+def test_native_fallback_runs_the_native_commands():
+    driver = FakeDriver(spoofing=True)
+    DriverMacro(driver).click("q").write_to("text", "q").run()
+
+    # Clicks may leave the page, so the element cache is invalidated after them
+    assert driver.calls == [("click", "q"), ("invalidate",), ("write", "q")]
+
+
+def test_maps_program_outcomes_to_step_results():
+    driver = FakeDriver()
+    results = DriverMacro(driver).wait_and_find("q", by="name").click("q", by="name").run()
+
+    assert driver.calls == [("program", ["wait", "click"]), ("invalidate",)]
+    assert [(result.in_page, result.duration, result.value) for result in results] == \
+           [(True, 0.01, "element 0"), (True, 0.01, None)]
+    assert driver.cached == [(By.NAME, "q", "element 0")]
+
+
+def test_failed_programs_report_a_single_error():
+    driver = FakeDriver(outcomes=JavascriptException("page unloaded"))
+
+    with pytest.raises(DriverMacroException) as raised:
+        DriverMacro(driver).get("https://example.com").wait(0.1).wait_and_find("q").wait(0.1).run()
+
+    results = raised.value.results
+    assert len(results) == 2
+    assert results[0].error is None
+    assert results[1].name == "wait 0.1s"
+    assert results[1].error == "page unloaded (in-page program of 3 steps)"
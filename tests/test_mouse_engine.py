@@ -0,0 +1,56 @@
+import pytest
+
+from WebDriverPy import mouse_engine
+from WebDriverPy.mouse_engine import MouseEngine
+
+
+@pytest.fixture(params=["numpy", "python"])
+def engine(request, monkeypatch) -> MouseEngine:
+    if request.param == "python":
+        monkeypatch.setattr(mouse_engine, "np", None)
+    elif mouse_engine.np is None:
+        pytest.skip("NumPy is not installed")
+    return MouseEngine()
+
+
+@pytest.mark.parametrize("start, end", [
+    ((640, 360), (15, 12)),
+    ((5, 5), (1270, 710)),
+    ((1279, 0), (0, 719)),
+    ((640, 700), (660, 715)),
+])
+def test_paths_stay_inside_the_viewport(engine, start, end):
+    width, height = 1280, 720
+
+    for seed in range(500):
+        engine.seed(seed)
+        path = engine.path(start, end, 20, (width, height))
+
+        assert all(0 <= x <= width - 1 and 0 <= y <= height - 1 for x, y, _ in path), seed
+
+
+def test_paths_end_on_the_target(engine):
+    for seed in range(50):
+        engine.seed(seed)
+        assert engine.path((0, 0), (300.4, 200.6), 20, (1280, 720))[-1][:2] == (300, 201)
+
+
+def test_paths_are_reproducible(engine):
+    engine.seed(42)
+    first = engine.path((0, 0), (500, 300))
+    engine.seed(42)
+
+    assert engine.path((0, 0), (500, 300)) == first
+
+
+def test_duration_grows_with_difficulty():
+    engine = MouseEngine(seed=1)
+
+    near = sum(engine.duration(50, 50) for _ in range(100))
+    far = sum(engine.duration(1000, 10) for _ in range(100))
+    assert far > near
+
+
+def test_clamp():
+    assert MouseEngine.clamp((-5, 800), (1280, 720)) == (0, 719)
+    assert MouseEngine.clamp((100.5, 200.5), (1280, 720)) == (100.5, 200.5)
@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from WebDriverPy.subpackages.PyProxies import proxy as proxy_module
+from WebDriverPy.subpackages.PyProxies.proxy import Proxy, ProxyTable
+
+
+@pytest.fixture(params=["numpy", "python"])
+def use_numpy(request, monkeypatch) -> None:
+    if request.param == "python":
+        monkeypatch.setattr(proxy_module, "np", None)
+    elif proxy_module.np is None:
+        pytest.skip("NumPy is not installed")
+
+
+def table(scores: list[float]) -> ProxyTable:
+    return ProxyTable((Proxy(f"10.0.{i // 256}.{i % 256}:8080", "http"), score) for i, score in enumerate(scores))
+
+
+@pytest.mark.parametrize("n", [1, 50, 249, 250, 1000])
+def test_top_matches_the_full_ranking_with_ties(use_numpy, n):
+    rng = random.Random(0)
+    scores = [rng.choice((0, 1, 2)) for _ in range(1000)]
+
+    assert table(scores).top(n) == table(scores).order()[:n]
+
+
+def test_top_matches_the_full_ranking_with_distinct_scores(use_numpy):
+    rng = random.Random(1)
+    scores = [rng.random() for _ in range(1000)]
+
+    assert table(scores).top(100) == table(scores).order()[:100]
+
+
+def test_equal_scores_keep_insertion_order(use_numpy):
+    assert table([1, 0, 1, 0]).order() == [1, 3, 0, 2]
+    assert table([1, 0, 1, 0]).top(3) == [1, 3, 0]
+
+
+def test_upsert_replaces_proxies_with_the_same_key():
+    proxies = table([3, 2])
+    proxies.upsert(Proxy("10.0.0.0:8080", "http"), 1)
+
+    assert len(proxies) == 2
+    assert proxies.top(1) == [0]
+    assert proxies.score(Proxy("10.0.0.0:8080", "http")) == 1
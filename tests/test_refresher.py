@@ -0,0 +1,35 @@
+from threading import Event
+
+from WebDriverPy.subpackages.PyProxies.proxy import Proxy, RankedProxies
+from WebDriverPy.subpackages.PyProxies.refresher import ProxyRefresher
+from WebDriverPy.subpackages.PyProxies.store import ProxyStore
+
+
+def test_start_does_not_fetch_with_an_empty_store():
+    release = Event()
+    fetched = Event()
+
+    def fetch() -> RankedProxies:
+        fetched.set()
+        release.wait(5)
+        return RankedProxies(alt_data=[(Proxy("10.0.0.1:8080", "http"), 1.0)], saves=False)
+
+    refresher = ProxyRefresher(store=ProxyStore(":memory:"), fetch=fetch).start()
+
+    # A fetch during start() would only return once released and then publish its pool
+    assert refresher.current is None
+
+    assert fetched.wait(5)
+    release.set()
+    assert refresher.wait(5).count == 1
+    refresher.stop()
+
+
+def test_start_serves_stored_proxies_right_away():
+    store = ProxyStore(":memory:")
+    store.add_ranked(RankedProxies(alt_data=[(Proxy("10.0.0.1:8080", "http"), 1.0)], saves=False))
+
+    refresher = ProxyRefresher(store=store, fetch=lambda: RankedProxies(alt_data=[], saves=False)).start()
+
+    assert refresher.current is not None and refresher.current.count == 1
+    refresher.stop()
@@ -0,0 +1,19 @@
+from WebDriverPy.subpackages.PyProxies.utils import get_session
+
+
+def test_proxied_sessions_ignore_environment_proxies(monkeypatch):
+    monkeypatch.setenv("HTTP_PROXY", "http://10.9.9.9:3128")
+    monkeypatch.setenv("HTTPS_PROXY", "http://10.9.9.9:3128")
+
+    session = get_session("https://example.com", "10.0.0.1:8080", "socks5")
+    settings = session.merge_environment_settings("https://example.com", {}, None, None, None)
+
+    assert settings["proxies"]["https"] == "socks5://10.0.0.1:8080"
+
+
+def test_sessions_are_cached_per_proxy_and_host():
+    session = get_session("https://example.com/a", "10.0.0.2:8080", "http")
+
+    assert get_session("https://example.com/b", "10.0.0.2:8080", "http") is session
+    assert get_session("https://example.org", "10.0.0.2:8080", "http") is not session
+    assert get_session("https://example.com", "10.0.0.3:8080", "http") is not session
@@ -0,0 +1,68 @@
+import time
+
+from itertools import islice
+
+import pytest
+
+from WebDriverPy.subpackages.PyProxies.proxy import FetchedProxy
+from WebDriverPy.subpackages.PyProxies.sources import ProxySource, fetch_from_sources
+
+
+class StubSource(ProxySource):
+    def __init__(self, name: str, ips: list[str], delay: float = 0, error: Exception | None = None):
+        self.name = name
+        self.ips = ips
+        self.delay = delay
+        self.error = error
+        self.fetched = 0
+
+    def fetch(self) -> list[FetchedProxy]:
+        self.fetched += 1
+        time.sleep(self.delay)
+
+        if self.error is not None:
+            raise self.error
+        return [FetchedProxy(ip=ip, protocol="http", average_timeout=0) for ip in self.ips]
+
+
+def ips(proxies) -> list[str]:
+    return [proxy.ip for proxy in proxies]
+
+
+def test_source_requires_fetch():
+    class Incomplete(ProxySource):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_merges_and_deduplicates_sources():
+    first = StubSource("first", ["1.1.1.1:80", "2.2.2.2:80"])
+    second = StubSource("second", ["2.2.2.2:80", "3.3.3.3:80"], delay=0.2)
+
+    assert ips(fetch_from_sources([first, second])) == ["1.1.1.1:80", "2.2.2.2:80", "3.3.3.3:80"]
+
+
+def test_islice_stops_before_slow_sources_answer():
+    fast = StubSource("fast", [f"10.0.0.{i}:80" for i in range(10)])
+    slow = StubSource("slow", ["9.9.9.9:80"], delay=5)
+
+    start = time.monotonic()
+    assert ips(islice(fetch_from_sources([fast, slow]), 3)) == ["10.0.0.0:80", "10.0.0.1:80", "10.0.0.2:80"]
+    assert time.monotonic() - start < 2
+
+
+def test_skips_failing_sources_with_a_warning():
+    failing = StubSource("failing", [], error=OSError("unreachable"))
+    working = StubSource("working", ["1.1.1.1:80"], delay=0.1)
+
+    with pytest.warns(RuntimeWarning, match="failing"):
+        assert ips(fetch_from_sources([failing, working])) == ["1.1.1.1:80"]
+
+
+def test_raises_if_all_sources_fail():
+    sources = [StubSource(name, [], error=OSError(name)) for name in ("a", "b")]
+
+    with pytest.raises(OSError), pytest.warns(RuntimeWarning):
+        list(fetch_from_sources(sources))
@@ -0,0 +1,24 @@
+import pytest
+
+from WebDriverPy.subpackages.PyProxies.thread_manager import ThreadManager
+
+
+def divide(a: int, b: int) -> float:
+    return a / b
+
+
+def test_join_does_not_raise_task_exceptions_by_default():
+    manager = ThreadManager(divide, [(1, 0), (4, 2)]).join()
+
+    with pytest.raises(ZeroDivisionError):
+        manager.join(raise_exceptions=True)
+
+
+def test_results_in_submission_order():
+    manager = ThreadManager(divide, [(1, 0), (4, 2)])
+
+    results = manager.results(raise_exceptions=False)
+    assert isinstance(results[0], ZeroDivisionError) and results[1] == 2
+
+    with pytest.raises(ZeroDivisionError):
+        manager.results()
@@ -0,0 +1,116 @@
+import pytest
+
+from selenium.webdriver.common.by import By
+
+from WebDriverPy.utils import (css_escape_identifier, css_string, compile_tag_locator, compile_in_page_locator,
+                               compile_extraction_field)
+
+
+@pytest.mark.parametrize("identifier, escaped", [
+    ("main", "main"),
+    ("main-content_2", "main-content_2"),
+    ("1st", "\\31 st"),
+    ("a1", "a1"),
+    ("a.b", "a\\.b"),
+    ("a:b", "a\\:b"),
+    ("a b", "a\\ b"),
+    ("übersicht", "übersicht"),
+])
+def test_css_escape_identifier(identifier, escaped):
+    assert css_escape_identifier(identifier) == escaped
+
+
+@pytest.mark.parametrize("value, quoted", [
+    ("search", '"search"'),
+    ('say "hi"', '"say \\"hi\\""'),
+    ("back\\slash", '"back\\\\slash"'),
+    ("two\nlines", '"two\\a lines"'),
+])
+def test_css_string(value, quoted):
+    assert css_string(value) == quoted
+
+
+@pytest.mark.parametrize("tag, by, value, compiled", [
+    ("input", By.ID, "q", (By.CSS_SELECTOR, 'input[id="q"]')),
+    ("input", By.ID, "1st", (By.CSS_SELECTOR, 'input[id="1st"]')),
+    ("input", By.NAME, "q", (By.CSS_SELECTOR, 'input[name="q"]')),
+    ("div", By.CLASS_NAME, "card", (By.CSS_SELECTOR, "div.card")),
+    ("div", By.CLASS_NAME, "a:b", (By.CSS_SELECTOR, "div.a\\:b")),
+    ("div", By.TAG_NAME, "DIV", (By.CSS_SELECTOR, "div")),
+    ("div", By.TAG_NAME, "span", (By.CSS_SELECTOR, "div:not(div)")),
+    ("div", By.TAG_NAME, "*", (By.CSS_SELECTOR, "div")),
+    ("a", By.XPATH, "//nav/*",
+     (By.XPATH, "(//nav/*)[translate(local-name(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')='a']")),
+    ("a", By.LINK_TEXT, "Home", (By.LINK_TEXT, "Home")),
+    ("custom-element", By.ID, "x", (By.CSS_SELECTOR, 'custom-element[id="x"]')),
+])
+def test_compile_tag_locator(tag, by, value, compiled):
+    assert compile_tag_locator(tag, by, value) == compiled
+
+
+@pytest.mark.parametrize("tag, by, value", [
+    # Compound class names are left to Selenium
+    ("div", By.CLASS_NAME, "a b"),
+    ("div", By.CLASS_NAME, "a\tb"),
+    ("div", By.CLASS_NAME, ""),
+    # Invalid selectors would silently match nothing inside :is()
+    ("a", By.CSS_SELECTOR, ".nav > *"),
+    ("a", By.CSS_SELECTOR, "a[href"),
+    # Link texts only match links
+    ("span", By.LINK_TEXT, "Home"),
+    ("span", By.PARTIAL_LINK_TEXT, "Ho"),
+    # Invalid tag names
+    ("1div", By.ID, "x"),
+    ("div]", By.ID, "x"),
+])
+def test_compile_tag_locator_falls_back(tag, by, value):
+    assert compile_tag_locator(tag, by, value) is None
+
+
+@pytest.mark.parametrize("by, value, compiled", [
+    (By.CSS_SELECTOR, "#main > a", ("css", "#main > a")),
+    (By.XPATH, "//a", ("xpath", "//a")),
+    (By.ID, "q", ("css", '[id="q"]')),
+    (By.NAME, "q", ("css", '[name="q"]')),
+    (By.CLASS_NAME, "card", ("css", ".card")),
+    (By.TAG_NAME, "div", ("css", "div")),
+    (By.TAG_NAME, "*", ("css", "*")),
+    (By.CLASS_NAME, "a b", None),
+    (By.LINK_TEXT, "Home", None),
+    (By.PARTIAL_LINK_TEXT, "Ho", None),
+])
+def test_compile_in_page_locator(by, value, compiled):
+    assert compile_in_page_locator(by, value) == compiled
+
+
+@pytest.mark.parametrize("spec, kind, selector, value, attribute", [
+    ("h2", "css", "h2", "text", None),
+    ("h2::html", "css", "h2", "html", None),
+    ("a::attr(href)", "css", "a", "attr", "href"),
+    ("::attr(data-id)", "self", "", "attr", "data-id"),
+    ("::attrs", "self", "", "attrs", None),
+    ("./span", "xpath", "./span", "text", None),
+    (".//span::attr(title)", "xpath", ".//span", "attr", "title"),
+    ("../h1", "xpath", "../h1", "text", None),
+    ("(.//span)[2]", "xpath", "(.//span)[2]", "text", None),
+])
+def test_compile_extraction_field(spec, kind, selector, value, attribute):
+    compiled = compile_extraction_field(spec)
+
+    assert (compiled["kind"], compiled["selector"], compiled["value"], compiled["attribute"]) == \
+           (kind, selector, value, attribute)
+    assert compiled["all"] is False
+
+
+def test_compile_extraction_field_lists_and_nested_records():
+    assert compile_extraction_field([".tag"])["all"] is True
+
+    nested = compile_extraction_field({"selector": ".offer", "all": True, "fields": {"price": ".price"}})
+    assert (nested["kind"], nested["selector"], nested["value"], nested["all"]) == ("css", ".offer", "record", True)
+    assert nested["fields"]["price"]["selector"] == ".price"
+
+
+@pytest.mark.parametrize("spec", ["//span", "/html/body", "h2::unknown", [".a", ".b"]])
+def test_compile_extraction_field_rejects_invalid_specs(spec):
+    with pytest.raises(ValueError):
+        compile_extraction_field(spec)
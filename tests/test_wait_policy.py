@@ -0,0 +1,159 @@
+import time
+
+from itertools import islice
+from threading import Thread
+
+import pytest
+
+from selenium.common import NoSuchElementException, TimeoutException
+
+from WebDriverPy.wait_policy import WaitPolicy
+
+
+def trained(policy: WaitPolicy, key, elapsed: float, samples: int = 3) -> WaitPolicy:
+    for _ in range(samples):
+        policy.record(key, elapsed)
+    return policy
+
+
+def test_poll_intervals_back_off_up_to_max_poll():
+    policy = WaitPolicy(initial_poll=0.05, max_poll=0.2, backoff=2, jitter=0)
+
+    assert list(islice(policy.poll_intervals(), 5)) == pytest.approx([0.05, 0.1, 0.2, 0.2, 0.2])
+
+
+def test_poll_intervals_jitter_stays_within_bounds():
+    policy = WaitPolicy(initial_poll=0.1, max_poll=0.1, jitter=0.2)
+
+    assert all(0.08 <= interval <= 0.12 for interval in islice(policy.poll_intervals(), 100))
+
+
+def test_uses_default_timeout_until_enough_samples():
+    policy = trained(WaitPolicy(default_timeout=6, min_samples=3), "key", 5, samples=2)
+
+    assert policy.learned_timeout("key") is None
+    assert policy.timeout("key") == 6
+
+
+def test_learns_longer_timeouts_for_slow_locators():
+    policy = trained(WaitPolicy(default_timeout=6, timeout_factor=3), "slow", 4)
+
+    # No deviation between equal samples: 3 * 4s
+    assert policy.learned_timeout("slow") == pytest.approx(12)
+    assert policy.timeout("slow") == pytest.approx(12)
+
+
+def test_learned_timeouts_are_limited():
+    policy = trained(WaitPolicy(timeout_factor=3, min_learned_timeout=3, max_learned_timeout=30), "slow", 20)
+    trained(policy, "fast", 0.1)
+
+    assert policy.learned_timeout("slow") == 30
+    assert policy.learned_timeout("fast") == 3
+
+
+def test_learned_timeouts_do_not_shorten_the_default_by_default():
+    policy = trained(WaitPolicy(default_timeout=6), "fast", 0.1)
+
+    assert policy.timeout("fast") == 6
+
+
+def test_learned_timeouts_shorten_the_default_if_enabled():
+    policy = trained(WaitPolicy(default_timeout=6, min_learned_timeout=3, shorten_timeouts=True), "fast", 0.1)
+
+    assert policy.timeout("fast") == 3
+
+
+def test_explicit_timeouts_take_precedence():
+    policy = trained(WaitPolicy(), "slow", 5)
+
+    assert policy.timeout("slow", 1) == 1
+    assert policy.timeout(None, 2) == 2
+
+
+def test_deviation_raises_the_learned_timeout():
+    steady = trained(WaitPolicy(timeout_factor=1, min_learned_timeout=0), "key", 2, samples=4)
+    varying = WaitPolicy(timeout_factor=1, min_learned_timeout=0)
+    for elapsed in (1, 3, 1, 3):
+        varying.record("key", elapsed)
+
+    assert varying.learned_timeout("key") > steady.learned_timeout("key")
+
+
+def test_forget_and_disabled_learning():
+    policy = trained(WaitPolicy(default_timeout=6), "slow", 5)
+    policy.forget("slow")
+    assert policy.learned_timeout("slow") is None
+
+    disabled = trained(WaitPolicy(default_timeout=6, learn_timeouts=False), "slow", 5)
+    assert disabled.timeout("slow") == 6
+
+
+def test_budget_limits_timeouts():
+    policy = WaitPolicy(default_timeout=6)
+
+    with policy.budget(2):
+        assert policy.timeout() <= 2
+        assert policy.timeout(None, 10) <= 2
+
+    assert policy.remaining_budget() is None
+    assert policy.timeout() == 6
+
+
+def test_nested_budgets_can_only_shorten():
+    policy = WaitPolicy(default_timeout=6)
+
+    with policy.budget(2):
+        with policy.budget(10):
+            assert policy.timeout() <= 2
+
+        with policy.budget(1):
+            assert policy.timeout() <= 1
+
+        assert 1 < policy.timeout() <= 2
+
+
+def test_budgets_do_not_affect_other_threads():
+    policy = WaitPolicy(default_timeout=6)
+    seen = []
+
+    with policy.budget(1):
+        thread = Thread(target=lambda: seen.append((policy.remaining_budget(), policy.timeout())))
+        thread.start()
+        thread.join()
+
+        assert policy.timeout() <= 1
+
+    assert seen == [(None, 6)]
+
+
+def test_exhausted_budget_fails_immediately():
+    policy = WaitPolicy()
+
+    with policy.budget(0.01):
+        time.sleep(0.02)
+
+        with pytest.raises(TimeoutException):
+            policy.timeout()
+
+
+def test_until_returns_the_condition_value():
+    policy = WaitPolicy(initial_poll=0.001)
+    calls = []
+
+    def condition(_):
+        calls.append(None)
+        if len(calls) < 3:
+            raise NoSuchElementException()
+        return "found"
+
+    assert policy.until(None, condition, 1) == "found"
+    assert len(calls) == 3
+
+
+def test_until_reverse_and_timeout():
+    policy = WaitPolicy(initial_poll=0.001, max_poll=0.01)
+
+    assert policy.until(None, lambda _: False, 1, reverse=True) is False
+
+    with pytest.raises(TimeoutException, match="never"):
+        policy.until(None, lambda _: False, 0.05, message="never")